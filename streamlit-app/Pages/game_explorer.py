@@ -4,6 +4,7 @@ import math
 
 from utils import load_and_clean_data
 from views.explorer import game_explorer
+from views.readiness import require_stages
 
 st.set_page_config(page_title="Steam Explorer - Game Explorer", layout="wide")
 
@@ -19,6 +20,7 @@ st.markdown(
     unsafe_allow_html=True
 )
 
+require_stages("dataset", "name_search", "sort_orders", "facets")
 steam_games = load_and_clean_data()
 
 # Calling function from Views/explorer
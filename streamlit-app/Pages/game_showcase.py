@@ -1,9 +1,8 @@
 import streamlit as st
 import pandas as pd
-import altair as alt
 
 from utils import load_and_clean_data, COLOR_SCHEMES
-from views.showcase import *
+from views.readiness import require_stages
 
 # Reducing top and bottom padding (Very hacky implementation for a sidebar)
 st.markdown(
@@ -21,8 +20,13 @@ st.markdown(
 st.set_page_config(page_title="Steam Explorer - Game Showcase", layout="wide")
 
 # Loading Dataset
+require_stages("dataset", "range_topk", "pricing_cube")
 steam_games = load_and_clean_data()
 
+# Imported once the page can draw, altair is only needed for the charts and the warm-up progress paints faster
+# without it
+from views.showcase import *
+
 sidebar, main, buff = st.columns([1,4,1])
 with main:
     st.header("Game Showcase Page")
@@ -1,15 +1,17 @@
 import pandas as pd
-import seaborn as sns
-import matplotlib.pyplot as plt
 import streamlit as st
 
 from utils import load_and_clean_data
-from views.genre import *
+from views.readiness import require_stages
 
 st.set_page_config(page_title="Steam Explorer - Genre Selector", layout="wide")
 
+require_stages("dataset", "genres", "genre_cube", "leaderboards")
 steam_games = load_and_clean_data()
 
+# Imported once the page can draw, see Pages/game_showcase.py
+from views.genre import *
+
 # Reducing top padding
 st.markdown(
     """
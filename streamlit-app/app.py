@@ -1,11 +1,9 @@
 import streamlit as st
-import seaborn as sns
-import matplotlib.pyplot as plt
-import pandas as pd
-import numpy as np
 import os
 
-from utils import load_and_clean_data, get_unique_genres
+from utils import get_warmup, get_setting
+from data_utils.spans import span, record_spans, configure_span_logging
+from views.debug import profiled_rerun, perf_panel
 
 # Page Config
 st.set_page_config(
@@ -19,19 +17,30 @@ logo_path = os.path.join(current_dir, "..", "assets", "logo.png")
 
 st.logo(logo_path, size="large")
 
-with st.spinner("Loading the steam dataset and preparing dashboard..."):
-    # Loading cleaned dataset for caching
-    steam_games = load_and_clean_data()
-
-    # Loading unique genres for caching
-    get_unique_genres(steam_games)
-
-pages = [
-    st.Page("Pages/landing.py", title="Steam Explorer", default=True),
-    st.Page("Pages/game_explorer.py", title="Game Explorer"),
-    st.Page("Pages/game_showcase.py", title="Game Showcase"),
-    st.Page("Pages/genre_selector.py", title="Genre Selector")
-]
-
-pg = st.navigation(pages, position="top")
-pg.run()
\ No newline at end of file
+# -- Performance Instrumentation --
+# Every rerun is timed as nested spans. PERF_LOG writes them to stderr as JSON lines, ?debug=1 (or PERF_PANEL)
+# shows them in the sidebar and ?profile=1 profiles one rerun.
+def setting_enabled(name):
+    return str(get_setting(name, "false")).lower() in ("1", "true", "yes")
+
+if setting_enabled("PERF_LOG"):
+    configure_span_logging()
+
+with profiled_rerun(), record_spans() as rerun_spans, span("rerun"):
+    # Loading, cleaning and building the indexes run on a background thread, started once per process. Pages that
+    # need none of it render right away, data pages show the warm-up's progress until their stages are done.
+    get_warmup()
+
+    pages = [
+        st.Page("Pages/landing.py", title="Steam Explorer", default=True),
+        st.Page("Pages/game_explorer.py", title="Game Explorer"),
+        st.Page("Pages/game_showcase.py", title="Game Showcase"),
+        st.Page("Pages/genre_selector.py", title="Genre Selector")
+    ]
+
+    pg = st.navigation(pages, position="top")
+    with span("page", page=pg.title):
+        pg.run()
+
+if st.query_params.get("debug") == "1" or setting_enabled("PERF_PANEL"):
+    perf_panel(rerun_spans)
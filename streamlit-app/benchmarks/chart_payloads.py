@@ -0,0 +1,76 @@
+# Vega-Lite payload size and build time of the game charts, full frame versus projected fields
+# Run from streamlit-app/: python -m benchmarks.chart_payloads --csv data/games.csv
+import argparse
+import json
+import time
+
+import altair as alt
+import pandas as pd
+
+from data_utils.cleaning import clean_data
+from views.showcase import top_ccu_positions, top_value_positions, sleeper_positions
+from visualization_utils.altair_chart_helpers import game_chart_data, game_tooltip, price_color_getter, steam_url_calculation
+from visualization_utils.chart_cache import ChartSpecCache
+
+def bar_chart(data, metric):
+    return alt.Chart(data).transform_calculate(**steam_url_calculation()).mark_bar().encode(
+        x=alt.X(f"{metric}:Q"),
+        y=alt.Y("Name:N", sort="-x"),
+        href="Steam_URL:N",
+        color=price_color_getter(),
+        tooltip=game_tooltip()
+    )
+
+def measure(build_chart):
+    start = time.perf_counter()
+    spec = build_chart().to_dict()
+    return {
+        "payload_bytes": len(json.dumps(spec, default=str)),
+        "build_seconds": round(time.perf_counter() - start, 4)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure chart payloads with and without field projection")
+    parser.add_argument("--csv", default="data/games.csv")
+    parser.add_argument("--json", help="Optional path to write the results to")
+    args = parser.parse_args()
+
+    steam_games = clean_data(pd.read_csv(args.csv))
+    steam_games.attrs["dataset_fingerprint"] = "benchmark"
+    min_year, max_year = int(steam_games["Release Year"].min()), int(steam_games["Release Year"].max())
+
+    charts = {
+        "top_games_ccu": ("Peak CCU", top_ccu_positions(steam_games, min_year, max_year, 0, 100)),
+        "top_value_games": ("Weighted Value", top_value_positions(steam_games, min_year, max_year, 0, 0, 100, 0, 100)),
+        "sleeper_games": ("Reviews", sleeper_positions(steam_games, min_year, max_year)),
+    }
+
+    results = {}
+    for name, (metric, positions) in charts.items():
+        rows = steam_games.iloc[positions]
+        projected = game_chart_data(rows, [metric, "Price Category"])
+
+        cache = ChartSpecCache()
+        cache.spec(name, (), lambda: bar_chart(projected, metric))
+        start = time.perf_counter()
+        cache.spec(name, (), lambda: bar_chart(projected, metric))
+        hit_seconds = time.perf_counter() - start
+
+        results[name] = {
+            "full_frame": measure(lambda: bar_chart(rows, metric)),
+            "projected": measure(lambda: bar_chart(projected, metric)),
+            "cache_hit_seconds": round(hit_seconds, 6)
+        }
+
+    print(f"{'chart':<18}{'full bytes':>12}{'projected':>12}{'full s':>9}{'proj s':>9}{'hit s':>10}")
+    for name, result in results.items():
+        full, projected = result["full_frame"], result["projected"]
+        print(f"{name:<18}{full['payload_bytes']:>12}{projected['payload_bytes']:>12}"
+              f"{full['build_seconds']:>9}{projected['build_seconds']:>9}{result['cache_hit_seconds']:>10}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+# Before/after benchmark of the ingest hot path
+# Run from streamlit-app/: python -m benchmarks.ingest_benchmark --csv data/games.csv
+import argparse
+import json
+import time
+import tracemalloc
+
+import pandas as pd
+
+from data_utils.cleaning import (
+    clean_data, is_game_mask, contains_mask, split_genre_list, genre_exclusion_mask, RAW_COLUMN_NAMES,
+    DROPPED_COLUMNS, GENRES_TO_EXCLUDE
+)
+from data_utils.incremental import raw_row_hashes
+from utils import ingest_games_csv
+
+# -- Previous per-row implementations, kept for comparison --
+def legacy_is_game(df):
+    return df["Categories"].fillna('').apply(
+        lambda x: "single-player" in x.lower() or "multi-player" in x.lower()
+    )
+
+def legacy_is_indie(df):
+    return df["Genres"].fillna('').apply(
+        lambda x: 'Indie' if "Indie" in x else "Non-Indie"
+    )
+
+def legacy_genre_list(df):
+    genre_list = df["Genres"].fillna('').apply(
+        lambda x: [
+            genre.strip() for genre in x.split(',') if genre.strip()
+        ]
+    )
+    exclude_genre_set = set(GENRES_TO_EXCLUDE)
+    keep = genre_list.apply(lambda game_genres: set(game_genres).isdisjoint(exclude_genre_set))
+    renamed = genre_list.apply(
+        lambda genres: [
+            "Free To Play" if genre == "Free to Play" else genre
+            for genre in genres
+        ]
+    )
+    return keep, renamed
+
+def legacy_release_date(df):
+    return pd.to_datetime(df["Release date"], errors='coerce')
+
+# Hashes of the columns the ingest reads, every row hashed on every ingest for the incremental refresh
+READ_COLUMNS = [column for column in RAW_COLUMN_NAMES if column not in DROPPED_COLUMNS]
+
+def legacy_row_hashes(df):
+    return pd.util.hash_pandas_object(df[READ_COLUMNS], index=False, categorize=False)
+
+# -- Vectorized implementations --
+def vectorized_is_game(df):
+    return is_game_mask(df["Categories"])
+
+def vectorized_is_indie(df):
+    return contains_mask(df["Genres"], "Indie")
+
+def vectorized_genre_list(df):
+    genre_list = split_genre_list(df["Genres"])
+    return ~genre_exclusion_mask(genre_list, GENRES_TO_EXCLUDE), genre_list
+
+def vectorized_release_date(df):
+    return pd.to_datetime(df["Release date"], format="%b %d, %Y", errors='coerce')
+
+def vectorized_row_hashes(df):
+    return raw_row_hashes(df[READ_COLUMNS])
+
+STAGES = {
+    "is_game": (legacy_is_game, vectorized_is_game),
+    "is_indie": (legacy_is_indie, vectorized_is_indie),
+    "genre_list_and_exclusion": (legacy_genre_list, vectorized_genre_list),
+    "release_date": (legacy_release_date, vectorized_release_date),
+    "row_hashes": (legacy_row_hashes, vectorized_row_hashes),
+}
+
+# Best of several runs for time, a separate traced run for peak memory
+def measure(func, *args, repeat=3):
+    seconds = best_seconds(func, *args, repeat=repeat)
+
+    tracemalloc.start()
+    func(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {"seconds": seconds, "peak_mb": round(peak / 2**20, 2)}
+
+def best_seconds(func, *args, repeat=3):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - start)
+    return round(min(timings), 4)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the vectorized ingest against the per-row version")
+    parser.add_argument("--csv", default="data/games.csv")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--workers", type=int, nargs="+", default=[],
+                        help="Also time the ingest with these worker counts, e.g. 1 2 4 8")
+    parser.add_argument("--json", help="Optional path to write the results to")
+    args = parser.parse_args()
+
+    raw = pd.read_csv(args.csv)
+
+    # Stages run on the renamed frame, the same input clean_data sees
+    renamed = raw.copy()
+    renamed.columns = RAW_COLUMN_NAMES
+
+    results = {"rows": len(raw), "stages": {}}
+    for name, (legacy, vectorized) in STAGES.items():
+        results["stages"][name] = {
+            "before": measure(legacy, renamed, repeat=args.repeat),
+            "after": measure(vectorized, renamed, repeat=args.repeat),
+        }
+
+    results["clean_data"] = measure(lambda: clean_data(raw.copy()), repeat=args.repeat)
+    del raw, renamed
+
+    # Every column read with inferred dtypes and cleaned at once, against the pruned, chunked ingest
+    results["read_and_clean"] = {
+        "before": measure(lambda: clean_data(pd.read_csv(args.csv)), repeat=args.repeat),
+        "after": measure(lambda: ingest_games_csv(args.csv), repeat=args.repeat),
+    }
+
+    print(f"{'stage':<28}{'before s':>10}{'after s':>10}{'before MB':>12}{'after MB':>11}")
+    for name, stage in results["stages"].items():
+        before, after = stage["before"], stage["after"]
+        print(f"{name:<28}{before['seconds']:>10}{after['seconds']:>10}{before['peak_mb']:>12}{after['peak_mb']:>11}")
+    print(f"clean_data total: {results['clean_data']['seconds']} s, peak {results['clean_data']['peak_mb']} MB")
+    before, after = results["read_and_clean"]["before"], results["read_and_clean"]["after"]
+    print(f"{'read_and_clean':<28}{before['seconds']:>10}{after['seconds']:>10}{before['peak_mb']:>12}{after['peak_mb']:>11}")
+
+    # Speedup of the parallel ingest over one worker, best of the runs for every worker count
+    if args.workers:
+        results["workers"] = {
+            workers: best_seconds(lambda: ingest_games_csv(args.csv, workers=workers), repeat=args.repeat)
+            for workers in args.workers
+        }
+        baseline = results["workers"].get(1)
+        for workers, seconds in results["workers"].items():
+            speedup = f"{baseline / seconds:.2f}x" if baseline else ""
+            print(f"ingest with {workers:>2} workers {seconds:>10} s {speedup:>8}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+# Regression check of the streaming ingest on a synthetic games.csv with empty numeric cells. An empty cell makes
+# the typed read fail, the fallback then infers the numbers of every chunk on its own, so only the cells' chunk
+# reads them as floats. The ingest has to come out with the dtypes and values of cleaning the whole file at once.
+# Exits with status 1 on a mismatch. Run from streamlit-app/: python -m benchmarks.ingest_check
+import argparse
+import csv
+import os
+import sys
+import tempfile
+
+import pandas as pd
+
+from benchmarks.synthetic_games import write_synthetic_games
+from data_utils.cleaning import clean_data, RAW_COLUMN_NAMES
+from utils import ingest_games_csv
+
+# Cells emptied in one row past the first chunk
+EMPTIED_COLUMNS = ["Peak CCU", "Discount", "User score", "Achievements", "Windows"]
+
+def empty_cells(path, row):
+    with open(path, newline="") as f:
+        lines = list(csv.reader(f))
+    # AppID comes first in every row, the header names one column less
+    for column in EMPTIED_COLUMNS:
+        lines[row + 1][RAW_COLUMN_NAMES.index(column) + 1] = ""
+    with open(path, "w", newline="") as f:
+        csv.writer(f).writerows(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the chunked ingest against a full read on empty numeric cells")
+    parser.add_argument("--rows", type=int, default=20_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = write_synthetic_games(os.path.join(directory, "games.csv"), args.rows)
+        empty_cells(path, args.rows - 10)
+
+        # A small budget, so the file is read in several chunks
+        os.environ["INGEST_MEMORY_BUDGET_MB"] = "4"
+        ingested, _ = ingest_games_csv(path, workers=1)
+        expected = clean_data(pd.read_csv(path, low_memory=False))
+
+    failures = [] if ingested["Peak CCU"].isna().any() else ["the row with the empty cells was not kept"]
+    for column in expected.columns:
+        if column not in ingested.columns:
+            failures.append(f"{column} is missing")
+        elif str(ingested[column].dtype) != str(expected[column].dtype):
+            failures.append(f"{column} is {ingested[column].dtype}, a full read gives {expected[column].dtype}")
+    if not failures and not ingested.reset_index(drop=True).equals(expected.reset_index(drop=True)):
+        failures.append("the cleaned values differ from a full read")
+
+    for failure in failures:
+        print(f"Failed: {failure}")
+    if not failures:
+        print(f"Ingested {len(ingested)} rows with empty {', '.join(EMPTIED_COLUMNS)} cells as a full read does")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
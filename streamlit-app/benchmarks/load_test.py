@@ -0,0 +1,335 @@
+# Concurrent sessions against one server replica, at increasing concurrency, to find where rerun latency degrades
+# Run from streamlit-app/: python -m benchmarks.load_test --sessions 1 2 4 8 16 --actions 20 --json load.json
+#
+# The server is started through serve.py and warmed up before any session connects. Every session is a simulated
+# browser on its own thread: it speaks Streamlit's websocket protocol, sends the widget states a browser would send
+# for each interaction and times the rerun until the server reports the script finished. Images and other media the
+# browser would fetch afterwards over HTTP are not requested.
+import argparse
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import numpy as np
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.NumberInput_pb2 import NumberInput
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+from websockets.sync.client import connect
+
+SESSION_COUNTS = [1, 2, 4, 8, 16]
+ACTIONS_PER_SESSION = 20
+# Mean pause between a session's interactions, a user reading the page. 0 sends the next one right away.
+THINK_SECONDS = 1.0
+RERUN_TIMEOUT_SECONDS = 300
+STARTUP_TIMEOUT_SECONDS = 600
+
+PAGES = {"explorer": "game_explorer", "showcase": "game_showcase", "genre": "genre_selector"}
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+# Resident memory of a process on this host
+def rss_bytes(pid):
+    with open(f"/proc/{pid}/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+# -- Server --
+# serve.py starts the warm-up with the process, the readiness probe tells when it is done
+def start_server(port, readiness_port, log):
+    env = {**os.environ, "READINESS_PORT": str(readiness_port)}
+    return subprocess.Popen(
+        [sys.executable, "serve.py", "--server.port", str(port), "--server.headless", "true",
+         "--browser.gatherUsageStats", "false"],
+        env=env, stdout=log, stderr=subprocess.STDOUT
+    )
+
+def wait_until_ready(server, readiness_port, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"Server exited with status {server.returncode} while warming up")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{readiness_port}/ready", timeout=5) as response:
+                return json.load(response)
+        except urllib.error.HTTPError as e:
+            status = json.load(e)
+            if status["error"]:
+                raise RuntimeError(f"Warm-up failed: {status['error']}")
+        except OSError:
+            pass
+        time.sleep(1)
+    raise RuntimeError(f"Server not ready after {timeout} seconds")
+
+# -- Simulated Browser --
+# Keeps what the browser keeps: the page it is on, the widgets last rendered (with the fragment each belongs to, a
+# widget inside a fragment reruns only that fragment) and the widget values the user set, sent along with every
+# rerun. Button clicks are triggers and only go with the rerun they cause.
+class BrowserSession:
+    def __init__(self, websocket, page, timeout):
+        self.websocket = websocket
+        self.page = page
+        self.page_hash = ""
+        self.timeout = timeout
+        self.widgets = {}
+        self.states = {}
+        self.latencies = []
+        self.errors = []
+
+    # Sends the rerun and reads the page back until the script has finished, returns the seconds it took
+    def rerun(self, triggers=(), fragment_id=""):
+        message = BackMsg()
+        client_state = message.rerun_script
+        client_state.page_name = self.page if not self.page_hash else ""
+        client_state.page_script_hash = self.page_hash
+        client_state.fragment_id = fragment_id
+        client_state.widget_states.widgets.extend([*self.states.values(), *triggers])
+
+        # What the rerun redraws is rendered anew, a fragment's rerun leaves the rest of the page as it was
+        self.widgets = {name: widget for name, widget in self.widgets.items() if fragment_id and widget[2] != fragment_id}
+
+        start = time.perf_counter()
+        self.websocket.send(message.SerializeToString())
+        while True:
+            forward = ForwardMsg()
+            forward.ParseFromString(self.websocket.recv(timeout=self.timeout))
+            kind = forward.WhichOneof("type")
+            if kind == "delta":
+                self.read_delta(forward.delta)
+            elif kind == "navigation":
+                self.page_hash = forward.navigation.page_script_hash
+            elif kind == "script_finished":
+                return time.perf_counter() - start
+
+    def read_delta(self, delta):
+        if delta.WhichOneof("type") != "new_element":
+            return
+        element_type = delta.new_element.WhichOneof("type")
+        if element_type == "exception":
+            self.errors.append(delta.new_element.exception.message)
+            return
+        element = getattr(delta.new_element, element_type)
+        if "id" in element.DESCRIPTOR.fields_by_name and element.id:
+            widget = (element_type, element, delta.fragment_id)
+            # Found by label like a user would, or by key (the end of the widget id) where labels repeat
+            key = element.id.rsplit("-", 1)[-1]
+            if key != "None":
+                self.widgets[key] = widget
+            if "label" in element.DESCRIPTOR.fields_by_name:
+                self.widgets[element.label] = widget
+
+    def widget(self, name):
+        return self.widgets[name][1]
+
+    def has_widget(self, name):
+        return name in self.widgets
+
+    def set_value(self, name, value):
+        element_type, element, _ = self.widgets[name]
+        state = WidgetState(id=element.id)
+        if element_type == "multiselect":
+            state.string_array_value.data[:] = value
+        elif element_type == "slider":
+            state.double_array_value.data[:] = value if isinstance(value, (tuple, list)) else [value]
+        elif element_type == "number_input" and element.data_type == NumberInput.INT:
+            state.int_value = value
+        elif element_type == "number_input":
+            state.double_value = value
+        elif element_type == "vega_lite_chart":
+            # A chart's selection travels as a JSON string
+            state.string_value = json.dumps(value)
+        else:
+            state.string_value = value
+        self.states[element.id] = state
+
+    # The widget's interaction reruns the app, or only its fragment when it is inside one
+    def interact(self, name, value=None):
+        _, element, fragment_id = self.widgets[name]
+        triggers = []
+        if value is None:
+            triggers.append(WidgetState(id=element.id, trigger_value=True))
+        else:
+            self.set_value(name, value)
+        self.latencies.append(self.rerun(triggers, fragment_id))
+
+# -- User Flows --
+# One interaction per step. Values are drawn from the options and bounds the page rendered.
+def random_range(rng, low, high):
+    start, end = sorted(rng.sample(range(int(low), int(high) + 1), 2))
+    return [start, end]
+
+def explorer_action(session, rng, step):
+    # A new search every few steps, a developer picked or cleared and page flips in between. Form values only
+    # count with the submit, the facets apply right away.
+    if step % 4 == 2:
+        options = list(session.widget("facet_Developers").options)
+        session.interact("facet_Developers", rng.sample(options, min(len(options), rng.randint(0, 1))))
+        return
+    if step % 4 and session.has_widget("Next"):
+        session.interact("Next")
+        return
+
+    session.set_value("Select Genres", rng.sample(list(session.widget("Select Genres").options), rng.randint(0, 2)))
+    session.set_value("Reviews Percentage", random_range(rng, 0, 100))
+    session.set_value("Minimum Reviews", rng.choice([0, 100, 1000]))
+    session.set_value("Sort by", rng.choice(list(session.widget("Sort by").options)))
+    session.set_value("Order", rng.choice(list(session.widget("Order").options)))
+    session.interact("Apply Filters")
+
+SHOWCASE_SLIDERS = ["peak_ccu_year", "peak_ccu_review_percentage", "value_year", "value_review",
+                    "value_review_percentage", "sleeper_year", "pricing_year"]
+
+def showcase_action(session, rng, step):
+    name = SHOWCASE_SLIDERS[step % len(SHOWCASE_SLIDERS)]
+    slider = session.widget(name)
+    if len(slider.default) == 2:
+        session.interact(name, random_range(rng, slider.min, slider.max))
+    else:
+        session.interact(name, rng.randint(int(slider.min), int(slider.max)))
+
+# Genres first, then clicks on the pricing and indie charts, which send the clicked point as the chart's selection
+def genre_action(session, rng, step):
+    genres = "Select 1 or More Genres"
+    if step % 3 == 0 or not session.has_widget("genre_pricing_chart"):
+        session.interact(genres, rng.sample(list(session.widget(genres).options), rng.randint(1, 3)))
+    elif step % 3 == 1:
+        category = rng.choice(["Free", "$0.01 - $4.99", "$5.00 - $9.99"])
+        session.interact("genre_pricing_chart", {"selection": {"price_category_selection": [
+            {"Price Category": category}
+        ]}})
+    else:
+        session.interact("genre_indie_chart", {"selection": {"year_selection": [
+            {"Release Year": rng.randint(2010, 2024)}
+        ]}})
+
+FLOWS = {"explorer": explorer_action, "showcase": showcase_action, "genre": genre_action}
+
+# -- Load Levels --
+def percentiles_ms(latencies):
+    if not latencies:
+        return {"p50_ms": None, "p95_ms": None, "p99_ms": None}
+    p50, p95, p99 = np.percentile(np.asarray(latencies) * 1000, [50, 95, 99])
+    return {"p50_ms": round(p50, 1), "p95_ms": round(p95, 1), "p99_ms": round(p99, 1)}
+
+# N sessions at once, the flows handed out in turn. Every session opens its page first, timing starts once all of
+# them have. Memory is read while they are all still connected, compared with before they connected.
+def run_level(url, server_pid, count, args):
+    baseline_rss = rss_bytes(server_pid)
+    flows = [args.flows[i % len(args.flows)] for i in range(count)]
+    sessions = [None] * count
+    start_barrier = threading.Barrier(count + 1)
+    done_barrier = threading.Barrier(count + 1)
+    failures = []
+
+    def target(i):
+        rng = random.Random(args.seed * 1000 + i)
+        try:
+            with connect(url, subprotocols=["streamlit"], max_size=None, open_timeout=args.timeout) as websocket:
+                session = sessions[i] = BrowserSession(websocket, PAGES[flows[i]], args.timeout)
+                session.rerun()
+                start_barrier.wait()
+                for step in range(args.actions):
+                    time.sleep(rng.uniform(0.5, 1.5) * args.think_seconds)
+                    FLOWS[flows[i]](session, rng, step)
+                # Connected until every session is done, so the memory read covers all of them
+                done_barrier.wait()
+        except Exception as e:
+            failures.append(e)
+            start_barrier.abort()
+            done_barrier.abort()
+
+    threads = [threading.Thread(target=target, args=(i,), name=f"load-session-{i}") for i in range(count)]
+    for thread in threads:
+        thread.start()
+    try:
+        start_barrier.wait()
+        start = time.perf_counter()
+        done_barrier.wait()
+        wall_seconds = time.perf_counter() - start
+        rss = rss_bytes(server_pid)
+    except threading.BrokenBarrierError:
+        pass
+    for thread in threads:
+        thread.join()
+    if failures:
+        raise failures[0]
+
+    latencies = [latency for session in sessions for latency in session.latencies]
+    return {
+        "sessions": count,
+        "reruns": len(latencies),
+        "errors": sum(len(session.errors) for session in sessions),
+        "error_messages": sorted({error for session in sessions for error in session.errors}),
+        **percentiles_ms(latencies),
+        "reruns_per_second": round(len(latencies) / wall_seconds, 2),
+        "rss_mb": round(rss / 1024 ** 2, 1),
+        "rss_mb_per_session": round((rss - baseline_rss) / count / 1024 ** 2, 2),
+        "flows": {
+            flow: percentiles_ms([latency for session, session_flow in zip(sessions, flows) if session_flow == flow
+                                  for latency in session.latencies])
+            for flow in dict.fromkeys(flows)
+        },
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Rerun latency, throughput and memory of concurrent sessions")
+    parser.add_argument("--sessions", type=int, nargs="+", default=SESSION_COUNTS,
+                        help="Concurrent sessions of every level")
+    parser.add_argument("--actions", type=int, default=ACTIONS_PER_SESSION, help="Timed interactions per session")
+    parser.add_argument("--flows", nargs="+", choices=list(FLOWS), default=list(FLOWS),
+                        help="Flows handed out to the sessions in turn")
+    parser.add_argument("--think-seconds", type=float, default=THINK_SECONDS,
+                        help="Mean pause between a session's interactions")
+    parser.add_argument("--timeout", type=float, default=RERUN_TIMEOUT_SECONDS, help="Timeout of one rerun")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="Optional path to write the results to")
+    args = parser.parse_args()
+
+    if not os.path.exists("serve.py"):
+        parser.error("run from streamlit-app/")
+
+    port, readiness_port = free_port(), free_port()
+    with tempfile.TemporaryFile() as log:
+        server = start_server(port, readiness_port, log)
+        try:
+            try:
+                status = wait_until_ready(server, readiness_port, STARTUP_TIMEOUT_SECONDS)
+            except RuntimeError:
+                log.seek(0)
+                print(log.read().decode(errors="replace")[-4000:], file=sys.stderr)
+                raise
+            print(f"Server warmed up in {status['uptime_seconds']} s, "
+                  f"{rss_bytes(server.pid) / 1024 ** 2:.1f} MB resident")
+
+            url = f"ws://127.0.0.1:{port}/_stcore/stream"
+            columns = ["sessions", "reruns", "errors", "p50_ms", "p95_ms", "p99_ms", "reruns_per_second",
+                       "rss_mb_per_session"]
+            print("".join(f"{column:>20}" for column in columns))
+            results = []
+            for count in args.sessions:
+                result = run_level(url, server.pid, count, args)
+                results.append(result)
+                print("".join(f"{result[column]:>20}" for column in columns))
+                for flow, flow_percentiles in result["flows"].items():
+                    print(f"{flow:>60}" + "".join(f"{flow_percentiles[column]:>20}"
+                                                  for column in ["p50_ms", "p95_ms", "p99_ms"]), flush=True)
+        finally:
+            server.terminate()
+            server.wait()
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"think_seconds": args.think_seconds, "actions": args.actions, "levels": results}, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+# Per-column memory of the cleaned frame, as stored before and after compact_columns
+# Run from streamlit-app/: python -m benchmarks.memory_report --csv data/games.csv
+import argparse
+import json
+
+import pandas as pd
+
+from data_utils.cleaning import clean_data
+from utils import compact_columns, memory_report
+
+def main():
+    parser = argparse.ArgumentParser(description="Report the memory of every column of the cleaned dataset")
+    parser.add_argument("--csv", default="data/games.csv")
+    parser.add_argument("--json", help="Optional path to write the results to")
+    args = parser.parse_args()
+
+    df = clean_data(pd.read_csv(args.csv))
+    before = memory_report(df)
+    after = memory_report(compact_columns(df))
+
+    report = before.merge(after, on="Column", suffixes=(" before", " after"))
+    print(report.to_string(index=False))
+    print(f"Total: {before['MB'].sum():.1f} MB before, {after['MB'].sum():.1f} MB after")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report.to_dict(orient="records"), f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+# Stage timings of the whole pipeline on synthetic datasets, written as JSON to track regressions between versions
+# Run from streamlit-app/: python -m benchmarks.pipeline_benchmark --rows 100000 1000000 --json results.json
+import argparse
+import json
+import os
+import platform
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+import utils
+from constants.data_configs import PIPELINE_VERSION
+from benchmarks.synthetic_games import write_synthetic_games
+from data_utils.cleaning import clean_data
+from data_utils.spans import record_spans
+from views.explorer import build_results
+from views.showcase import top_ccu_positions, top_value_positions, sleeper_positions, pricing_counts
+from views.genre import (
+    yearly_peak_ccu, price_category_counts, price_category_genre_counts, indie_yearly_counts,
+    saturation_yearly_counts, top_year_positions
+)
+
+# Best and median of several runs
+def measure(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return {"best_seconds": round(min(timings), 6), "median_seconds": round(float(np.median(timings)), 6)}
+
+def timed_once(func):
+    start = time.perf_counter()
+    result = func()
+    return result, round(time.perf_counter() - start, 6)
+
+# -- Loading --
+def load_stages(csv_path):
+    raw, read_seconds = timed_once(lambda: pd.read_csv(csv_path))
+    csv_rows = len(raw)
+
+    # clean_data's own spans break its time down by stage, whatever they do not cover is reported as "other"
+    with record_spans() as records:
+        df, clean_seconds = timed_once(lambda: clean_data(raw))
+    stages = {record["span"].split("/", 1)[1]: record["seconds"] for record in records if record["depth"] == 1}
+    stages["other"] = round(clean_seconds - sum(stages.values()), 6)
+
+    compacted, compact_seconds = timed_once(lambda: utils.compact_columns(df))
+    # Every cached index is keyed by this, a unique one keeps runs on different files apart
+    compacted.attrs["dataset_fingerprint"] = f"benchmark-{os.path.abspath(csv_path)}-{csv_rows}"
+
+    return compacted, csv_rows, {
+        "read_csv_seconds": read_seconds,
+        "clean_data_seconds": clean_seconds,
+        "clean_data_stages": stages,
+        "compact_columns_seconds": compact_seconds,
+    }
+
+# First call of every cached index builder, what a cold start spends on them
+def index_stages(df):
+    builders = {
+        "name_search": lambda: utils.get_name_search_index(df),
+        "sort_orders": lambda: utils.get_sort_orders(df),
+        "developer_facets": lambda: utils.get_facet_index(df, "Developers"),
+        "publisher_facets": lambda: utils.get_facet_index(df, "Publishers"),
+        "leaderboards": lambda: utils.get_leaderboards(df),
+        "genre_cube": lambda: utils.get_genre_cube(df),
+        "pricing_cube": lambda: utils.get_pricing_cube(df),
+    }
+    for metric, tiebreak in utils.RANGE_TOPK_METRICS:
+        builders[f"range_topk {metric} {tiebreak}"] = lambda metric=metric, tiebreak=tiebreak: (
+            utils.get_range_topk(df, metric, tiebreak)
+        )
+    return {name: timed_once(build)[1] for name, build in builders.items()}
+
+# -- Queries --
+# Name searches on their own, short terms scan every name instead of intersecting trigram postings
+SEARCH_TERMS = ["star", "war", "zombie", "dark knight", "simulator", "a", "st"]
+
+def search_queries(df):
+    index = utils.get_name_search_index(df)
+    return {term: lambda term=term: index.search(term) for term in SEARCH_TERMS}
+
+# Explorer searches as the form submits them, each followed by reading the first page
+def explorer_queries(df):
+    defaults = dict(sort_column="Reviews", ascending=False, game_name="", selected_genres=[], min_rating=0,
+                    max_rating=100, min_reviews=0, min_price=0.0, max_price=100.0)
+    scenarios = {
+        "default": {},
+        "genres": {"selected_genres": ["Action", "Indie"]},
+        "narrow_filters": {"min_rating": 80, "min_reviews": 1000, "max_price": 20.0},
+        "price_ascending": {"sort_column": "Price", "ascending": True},
+        "name_search": {"game_name": "dark", "sort_column": None},
+        "name_search_sorted": {"game_name": "knight", "sort_column": "Peak CCU"},
+        # The most common developer and publisher, with the counts of both facets
+        "facets": {"facet_selections": {
+            "Developers": utils.get_facet_index(df, "Developers").names_for([0]),
+            "Publishers": utils.get_facet_index(df, "Publishers").names_for([0]),
+        }},
+    }
+    return {
+        name: lambda options=options: build_results(df, **{**defaults, **options}).page(0, 20)
+        for name, options in scenarios.items()
+    }
+
+def showcase_queries(df):
+    min_year, max_year = int(df["Release Year"].min()), int(df["Release Year"].max())
+    return {
+        "top_games_ccu": lambda: top_ccu_positions(df, min_year, max_year, 0, 100),
+        "top_value_games": lambda: top_value_positions(df, min_year, max_year, 100, 0, 100, 0, 100),
+        "sleeper_games": lambda: sleeper_positions(df, min_year, max_year),
+        "games_pricing": lambda: pricing_counts(utils.get_pricing_cube(df), min_year, max_year, 0, 100),
+    }
+
+def genre_queries(df, genre_selections):
+    year = int(df["Release Year"].max())
+    return {
+        "yearly_picks_peak_ccu": lambda: yearly_peak_ccu(df, genre_selections),
+        "yearly_picks_top_10": lambda: top_year_positions(df, genre_selections, year),
+        "pricing_categories": lambda: price_category_counts(df, genre_selections),
+        "pricing_category_genres": lambda: price_category_genre_counts(df, genre_selections, "Free"),
+        "indie_yearly": lambda: indie_yearly_counts(df, genre_selections),
+        "indie_top_10": lambda: top_year_positions(df, genre_selections, year, indie_only=True),
+        "saturation_yearly": lambda: saturation_yearly_counts(df, genre_selections),
+    }
+
+def run(csv_path, repeat):
+    df, csv_rows, loading = load_stages(csv_path)
+    result = {"csv": csv_path, "csv_rows": csv_rows, "rows": len(df), "loading": loading, "indexes": index_stages(df)}
+
+    result["search"] = {name: measure(query, repeat) for name, query in search_queries(df).items()}
+    result["explorer"] = {name: measure(query, repeat) for name, query in explorer_queries(df).items()}
+    result["showcase"] = {name: measure(query, repeat) for name, query in showcase_queries(df).items()}
+    result["genre"] = {
+        ", ".join(selections): {name: measure(query, repeat) for name, query in genre_queries(df, selections).items()}
+        for selections in (["Action"], ["Indie", "RPG"])
+    }
+    return result
+
+def print_run(result):
+    print(f"\n{result['csv']}: {result['csv_rows']} CSV rows, {result['rows']} after cleaning")
+    loading = result["loading"]
+    print(f"  read_csv {loading['read_csv_seconds']:.3f} s, clean_data {loading['clean_data_seconds']:.3f} s, "
+          f"compact_columns {loading['compact_columns_seconds']:.3f} s")
+    for name, seconds in loading["clean_data_stages"].items():
+        print(f"    {name:<40}{seconds:>10.4f} s")
+    for name, seconds in result["indexes"].items():
+        print(f"  index {name:<38}{seconds:>10.4f} s")
+    for section in ("search", "explorer", "showcase"):
+        for name, timing in result[section].items():
+            print(f"  {section} {name:<35}{timing['best_seconds'] * 1000:>10.2f} ms")
+    for selections, queries in result["genre"].items():
+        for name, timing in queries.items():
+            print(f"  genre [{selections}] {name:<25}{timing['best_seconds'] * 1000:>10.2f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the loading, index and query stages on synthetic datasets")
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000],
+                        help="Synthetic dataset sizes, generated into data/synthetic/ when missing")
+    parser.add_argument("--csv", nargs="+", help="Benchmark these CSV files instead of synthetic ones")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", help="Optional path to write the results to")
+    args = parser.parse_args()
+
+    csv_paths = args.csv or []
+    if not args.csv:
+        for rows in args.rows:
+            path = os.path.join("data", "synthetic", f"games-{rows}-seed{args.seed}.csv")
+            if not os.path.exists(path):
+                print(f"Generating {rows} rows into {path}")
+                write_synthetic_games(path, rows, args.seed)
+            csv_paths.append(path)
+
+    results = {
+        "pipeline_version": PIPELINE_VERSION,
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "pyarrow": pa.__version__,
+        "numpy": np.__version__,
+        "cpu_count": os.cpu_count(),
+        "repeat": args.repeat,
+        "runs": [],
+    }
+    for path in csv_paths:
+        result = run(path, args.repeat)
+        print_run(result)
+        results["runs"].append(result)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
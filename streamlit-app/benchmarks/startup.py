@@ -0,0 +1,114 @@
+# Startup report: import time per module and time to first paint of every page, each measured in a fresh
+# interpreter. Exits with status 1 when a budget is exceeded, so CI can fail on startup regressions.
+# Run from streamlit-app/: python -m benchmarks.startup --import-budget-ms 2000 --paint-budget-ms 4000
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+# What a server process imports before its first page runs
+STARTUP_MODULES = ["utils", "views.debug", "views.readiness"]
+PAGES = ["Pages/landing.py", "Pages/game_explorer.py", "Pages/game_showcase.py", "Pages/genre_selector.py"]
+
+IMPORT_BUDGET_MS = 2000
+PAINT_BUDGET_MS = 4000
+TOP_MODULES = 20
+
+# A fresh interpreter, so nothing this process already imported is counted as free. A failing child's
+# traceback is passed on, it usually names the import that broke.
+def run_python(*args):
+    completed = subprocess.run([sys.executable, *args], capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(f"{' '.join(args[:2])} failed:\n{completed.stderr[-2000:]}")
+    return completed
+
+# -- Import Time --
+# python -X importtime writes one line per imported module: self and cumulative microseconds and the module
+# name, indented by how deeply it was imported
+def import_times(modules):
+    completed = run_python("-X", "importtime", "-c", "; ".join(f"import {module}" for module in modules))
+
+    times = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        times.append({
+            "module": name.strip(),
+            "depth": (len(name) - len(name.lstrip()) - 1) // 2,
+            "self_ms": int(self_us) / 1000,
+            "cumulative_ms": int(cumulative_us) / 1000,
+        })
+    return times
+
+# -- First Paint --
+# Every page runs once through app.py in a fresh interpreter, timed from before the interpreter starts until the
+# page's first run returns: imports, warm-up start and the page itself. Data pages paint their readiness state while
+# the warm-up is still running. The child exits right away, it does not wait for the warm-up to finish.
+FIRST_PAINT_SCRIPT = """
+import json, os, sys, time
+from streamlit.testing.v1 import AppTest
+
+at = AppTest.from_file("app.py", default_timeout=120)
+# The landing text streams in character by character on a first visit, that is animation rather than paint
+at.session_state["landing_stream_finished"] = True
+page = sys.argv[1]
+if page != "Pages/landing.py":
+    at.switch_page(page)
+at.run()
+print(json.dumps({"painted_at": time.time(), "exceptions": [str(e.value) for e in at.exception]}), flush=True)
+os._exit(0)
+"""
+
+def first_paint(page):
+    start = time.time()
+    completed = run_python("-c", FIRST_PAINT_SCRIPT, page)
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    return {"paint_ms": round((result["painted_at"] - start) * 1000, 1), "exceptions": result["exceptions"]}
+
+def main():
+    parser = argparse.ArgumentParser(description="Import time and first paint of the app, checked against budgets")
+    parser.add_argument("--import-budget-ms", type=float, default=IMPORT_BUDGET_MS,
+                        help="Budget for importing the startup modules")
+    parser.add_argument("--paint-budget-ms", type=float, default=PAINT_BUDGET_MS,
+                        help="Budget for the first paint of every page")
+    parser.add_argument("--top", type=int, default=TOP_MODULES, help="Slowest modules to list")
+    parser.add_argument("--json", help="Optional path to write the results to")
+    args = parser.parse_args()
+
+    if not os.path.exists("app.py"):
+        parser.error("run from streamlit-app/")
+
+    times = import_times(STARTUP_MODULES)
+    import_ms = round(sum(entry["cumulative_ms"] for entry in times if entry["depth"] == 0), 1)
+    print(f"Imports: {import_ms} ms (budget {args.import_budget_ms:g} ms)")
+    print(f"  {'module':<50}{'self ms':>10}{'cumulative ms':>16}")
+    for entry in sorted(times, key=lambda entry: entry["cumulative_ms"], reverse=True)[:args.top]:
+        print(f"  {'  ' * entry['depth'] + entry['module']:<50}{entry['self_ms']:>10.1f}{entry['cumulative_ms']:>16.1f}")
+
+    paints = {page: first_paint(page) for page in PAGES}
+    print(f"First paint (budget {args.paint_budget_ms:g} ms)")
+    for page, paint in paints.items():
+        print(f"  {page:<50}{paint['paint_ms']:>10.1f} ms" + (" with exceptions" if paint["exceptions"] else ""))
+
+    failures = []
+    if import_ms > args.import_budget_ms:
+        failures.append(f"imports took {import_ms} ms")
+    for page, paint in paints.items():
+        if paint["paint_ms"] > args.paint_budget_ms:
+            failures.append(f"{page} painted after {paint['paint_ms']} ms")
+        if paint["exceptions"]:
+            failures.append(f"{page} raised {paint['exceptions'][0]}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"import_ms": import_ms, "modules": times, "pages": paints, "failures": failures}, f, indent=2)
+
+    for failure in failures:
+        print(f"Failed: {failure}")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
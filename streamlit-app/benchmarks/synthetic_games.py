@@ -0,0 +1,243 @@
+# Writes a synthetic games.csv with the schema of the Kaggle dataset, for benchmarking at any size
+# Run from streamlit-app/: python -m benchmarks.synthetic_games --rows 1000000 --out data/synthetic/games-1000000.csv
+import argparse
+import os
+import time
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+
+# The real header has 39 names for 40 fields ("Discount" and "DLC count" are merged into one name), so pandas
+# turns the first field, AppID, into the index. Kept exactly like that so the cleaning pipeline sees the same quirk.
+HEADER = (
+    "AppID,Name,Release date,Estimated owners,Peak CCU,Required age,Price,DiscountDLC count,About the game,"
+    "Supported languages,Full audio languages,Reviews,Header image,Website,Support url,Support email,Windows,Mac,"
+    "Linux,Metacritic score,Metacritic url,User score,Positive,Negative,Score rank,Achievements,Recommendations,"
+    "Notes,Average playtime forever,Average playtime two weeks,Median playtime forever,Median playtime two weeks,"
+    "Developers,Publishers,Categories,Genres,Tags,Screenshots,Movies"
+)
+
+# Rows generated per write, every chunk has its own seed so the output only depends on --seed and --rows
+CHUNK_ROWS = 100_000
+
+FIRST_APP_ID = 10
+
+# -- Value Pools --
+# Genres with roughly the share of games that carry them on Steam
+GENRE_SHARES = {
+    "Indie": 0.7, "Casual": 0.4, "Action": 0.4, "Adventure": 0.38, "Simulation": 0.2, "Strategy": 0.19,
+    "RPG": 0.18, "Early Access": 0.12, "Free to Play": 0.08, "Sports": 0.05, "Racing": 0.04,
+    "Massively Multiplayer": 0.03, "Violent": 0.02, "Gore": 0.01, "Nudity": 0.01, "Sexual Content": 0.01,
+    "Utilities": 0.01, "Education": 0.005, "Design & Illustration": 0.005, "Animation & Modeling": 0.003,
+    "Software Training": 0.002, "Video Production": 0.002, "Game Development": 0.002, "Audio Production": 0.002,
+    "Photo Editing": 0.001, "Web Publishing": 0.001, "Accounting": 0.0005, "Movie": 0.0005, "Short": 0.0005
+}
+CATEGORY_SHARES = {
+    "Single-player": 0.9, "Steam Achievements": 0.45, "Steam Cloud": 0.25, "Full controller support": 0.2,
+    "Multi-player": 0.18, "Partial Controller Support": 0.15, "Steam Trading Cards": 0.12, "PvP": 0.1,
+    "Online PvP": 0.08, "Co-op": 0.08, "Steam Leaderboards": 0.08, "Online Co-op": 0.06, "Remote Play Together": 0.06,
+    "Family Sharing": 0.5, "In-App Purchases": 0.02, "VR Only": 0.01, "Steam Workshop": 0.02
+}
+TAGS = ["Indie", "Singleplayer", "Action", "Casual", "Adventure", "2D", "Pixel Graphics", "Strategy", "Puzzle",
+        "Atmospheric", "Story Rich", "Simulation", "RPG", "Colorful", "Exploration", "Cute", "First-Person", "Horror"]
+
+OWNER_RANGES = [
+    "0 - 0", "0 - 20000", "20000 - 50000", "50000 - 100000", "100000 - 200000", "200000 - 500000",
+    "500000 - 1000000", "1000000 - 2000000", "2000000 - 5000000", "5000000 - 10000000", "10000000 - 20000000",
+    "20000000 - 50000000", "50000000 - 100000000", "100000000 - 200000000"
+]
+OWNER_SHARES = [0.01, 0.68, 0.1, 0.07, 0.05, 0.04, 0.02, 0.013, 0.01, 0.004, 0.002, 0.0007, 0.0002, 0.0001]
+
+PRICES = [0.0, 0.99, 1.99, 2.99, 4.99, 5.99, 7.99, 9.99, 12.99, 14.99, 19.99, 24.99, 29.99, 39.99, 49.99, 59.99, 69.99]
+PRICE_SHARES = [0.18, 0.1, 0.08, 0.08, 0.14, 0.04, 0.04, 0.1, 0.03, 0.07, 0.06, 0.03, 0.03, 0.01, 0.005, 0.005, 0.002]
+
+LANGUAGES = ["['English']", "['English', 'French', 'German', 'Spanish - Spain']",
+             "['English', 'Simplified Chinese', 'Japanese', 'Korean']", "['English', 'Russian']", "[]"]
+
+NAME_WORDS = [
+    "Dark", "Star", "Legend", "Cyber", "Hero", "World", "Dungeon", "Craft", "Simulator", "Racing", "Space", "Zombie",
+    "Quest", "Tales", "Kingdom", "Shadow", "Lost", "Island", "Farm", "Escape", "Knight", "Dragon", "City", "Tower",
+    "Defense", "Puzzle", "Survival", "Odyssey", "Chronicles", "Rogue", "Neon", "Pixel", "Café", "Ninja", "Götter",
+    "Wars", "Tactics", "Heroes", "Ocean", "Night", "Dream", "Station", "Frontier", "Empire", "Arena", "Monster"
+]
+NAME_SUFFIXES = ["", "", "", "", " 2", " 3", ": Remastered", ": Director's Cut", " - Deluxe Edition", ", Inc.",
+                 ' "Origins"', " VR", " Online", " (Demo)"]
+
+DEVELOPER_WORDS = ["Studio", "Games", "Interactive", "Entertainment", "Software", "Labs", "Works", "Digital"]
+
+# Long descriptions with the commas, quotes and line breaks that make the real file hard to split
+ABOUT_TEMPLATES = [
+    'Explore a {0} world full of secrets.\n\nFeatures:\n- Over {1} levels\n- A "{2}" soundtrack, handmade',
+    "{2} is a game about {0} things, friendship and loss. Play alone, or with friends, in {1} chapters.",
+    'Build, fight and survive.\r\nKey features:\r\n* {1} weapons, "{2}" mode\r\n* {0} bosses',
+    "A short, {0} adventure. No combat; just {1} puzzles and a story told in {2} acts."
+]
+
+# A pool of names drawn with Zipf-like frequencies, a few studios make most of the games like on Steam
+def company_pool(rng, size, suffix):
+    first = rng.choice(NAME_WORDS, size)
+    second = rng.choice(DEVELOPER_WORDS, size)
+    return pa.array([f"{a} {b}{suffix} {i}" for i, (a, b) in enumerate(zip(first, second))])
+
+def zipf_choice(rng, size, pool_size):
+    return (rng.zipf(1.1, size) - 1) % pool_size
+
+# Comma separated labels of every row, each label is present with its share. Rows are encoded as bitmasks and only
+# the distinct masks are turned into strings.
+def label_lists(rng, rows, shares):
+    labels = list(shares)
+    present = rng.random((rows, len(labels))) < np.array(list(shares.values()))
+    masks = present @ (np.uint64(1) << np.arange(len(labels), dtype=np.uint64))
+    unique, inverse = np.unique(masks, return_inverse=True)
+    strings = [",".join(label for bit, label in enumerate(labels) if int(mask) >> bit & 1) for mask in unique]
+    return pa.array(strings).take(pa.array(inverse.ravel()))
+
+def release_dates(rng, rows):
+    # Skewed towards recent years like the store itself
+    years = np.clip(2026 - rng.geometric(0.18, rows), 1997, 2025)
+    days = rng.integers(0, 365, rows)
+    dates = (years - 1970).astype("datetime64[Y]") + days.astype("timedelta64[D]")
+    # Days are not zero padded, "Oct 21, 2008" and "Jul 5, 2020"
+    text = pc.strftime(pa.array(dates.astype("datetime64[s]")), format="%b %d, %Y")
+    text = pc.replace_substring_regex(text, r" 0(\d),", r" \1,")
+
+    # Coming soon entries only have a month, and a few have no date at all
+    kind = rng.random(rows)
+    month_only = pc.strftime(pa.array(dates.astype("datetime64[s]")), format="%b %Y")
+    text = pc.if_else(pa.array(kind < 0.01), month_only, text)
+    return pc.if_else(pa.array(kind > 0.995), pa.scalar(""), text)
+
+def game_names(rng, rows, app_ids):
+    words = np.array(NAME_WORDS)
+    length = rng.integers(1, 4, rows)
+    parts = [pa.array(words[rng.integers(0, len(words), rows)]) for _ in range(3)]
+    two = pc.binary_join_element_wise(parts[0], parts[1], " ")
+    three = pc.binary_join_element_wise(two, parts[2], " ")
+    name = pc.if_else(pa.array(length == 1), parts[0], pc.if_else(pa.array(length == 2), two, three))
+
+    suffix = pa.array(np.array(NAME_SUFFIXES)[rng.integers(0, len(NAME_SUFFIXES), rows)])
+    # Every few names carry a number so the search index sees many distinct trigrams
+    number = pc.if_else(pa.array(rng.random(rows) < 0.2), pc.binary_join_element_wise("", app_ids, " "), "")
+    return pc.binary_join_element_wise(name, number, suffix, "")
+
+# limit keeps counts within the nullable integer types clean_data narrows them to
+def heavy_tail(rng, rows, shape, scale, zero_share=0.0, limit=None):
+    values = np.floor((rng.pareto(shape, rows)) * scale).astype(np.int64)
+    if limit is not None:
+        values = np.minimum(values, limit)
+    if zero_share:
+        values[rng.random(rows) < zero_share] = 0
+    return values
+
+def app_urls(app_ids, prefix, suffix):
+    return pc.binary_join_element_wise(prefix, app_ids, suffix, "")
+
+def generate_chunk(rng, start, rows, developers, publishers):
+    app_ids = np.arange(FIRST_APP_ID + start * 10, FIRST_APP_ID + (start + rows) * 10, 10, dtype=np.int64)
+    app_id_text = pc.cast(pa.array(app_ids), pa.string())
+
+    positive = heavy_tail(rng, rows, 0.9, 8, zero_share=0.2)
+    negative = np.floor(positive * rng.beta(1.5, 6, rows)).astype(np.int64) + heavy_tail(rng, rows, 1.5, 1)
+    playtime = heavy_tail(rng, rows, 1.1, 60, zero_share=0.7, limit=300_000)
+    metacritic = np.where(rng.random(rows) < 0.05, rng.integers(40, 97, rows), 0)
+
+    about = pa.array(np.array(ABOUT_TEMPLATES)[rng.integers(0, len(ABOUT_TEMPLATES), rows)])
+    about = pc.replace_substring(about, "{0}", "strange")
+    about = pc.replace_substring(about, "{1}", "12")
+    about = pc.replace_substring(about, "{2}", "Synthwave")
+
+    developer = developers.take(pa.array(zipf_choice(rng, rows, len(developers))))
+    publisher = publishers.take(pa.array(zipf_choice(rng, rows, len(publishers))))
+    # Self published games name the developer, some have two developers
+    publisher = pc.if_else(pa.array(rng.random(rows) < 0.4), developer, publisher)
+    co_developer = developers.take(pa.array(zipf_choice(rng, rows, len(developers))))
+    developer = pc.if_else(pa.array(rng.random(rows) < 0.05),
+                           pc.binary_join_element_wise(developer, co_developer, ","), developer)
+
+    booleans = np.array(["False", "True"])
+    empty = pa.nulls(rows, pa.string())
+
+    # One entry per data field, the 40 fields of a row
+    columns = [
+        pa.array(app_ids),
+        game_names(rng, rows, app_id_text),
+        release_dates(rng, rows),
+        pa.array(np.array(OWNER_RANGES)[rng.choice(len(OWNER_RANGES), rows, p=OWNER_SHARES)]),
+        heavy_tail(rng, rows, 1.0, 2, zero_share=0.5),
+        rng.choice([0, 0, 0, 0, 0, 0, 13, 17, 18], rows),
+        np.array(PRICES)[rng.choice(len(PRICES), rows, p=np.array(PRICE_SHARES) / sum(PRICE_SHARES))],
+        np.where(rng.random(rows) < 0.1, rng.choice([10, 20, 25, 50, 75, 90], rows), 0),
+        np.where(rng.random(rows) < 0.1, heavy_tail(rng, rows, 1.2, 3, limit=10_000), 0),
+        about,
+        pa.array(np.array(LANGUAGES)[rng.integers(0, len(LANGUAGES), rows)]),
+        pa.array(np.array(LANGUAGES)[rng.integers(3, len(LANGUAGES), rows)]),
+        empty,
+        app_urls(app_id_text, "https://shared.akamai.steamstatic.com/store_item_assets/steam/apps/", "/header.jpg"),
+        pc.if_else(pa.array(rng.random(rows) < 0.4), app_urls(app_id_text, "https://example.com/game/", ""), empty),
+        empty,
+        empty,
+        pa.array(booleans[np.ones(rows, dtype=np.int64)]),
+        pa.array(booleans[(rng.random(rows) < 0.2).astype(np.int64)]),
+        pa.array(booleans[(rng.random(rows) < 0.15).astype(np.int64)]),
+        metacritic,
+        pc.if_else(pa.array(metacritic > 0),
+                   app_urls(app_id_text, "https://www.metacritic.com/game/pc/game-", "?ftag=MCD-06-10aaa1f"), empty),
+        np.zeros(rows, dtype=np.int64),
+        positive,
+        negative,
+        empty,
+        np.where(rng.random(rows) < 0.45, rng.integers(1, 100, rows), 0),
+        np.where(rng.random(rows) < 0.1, heavy_tail(rng, rows, 1.0, 100, limit=10_000), 0),
+        empty,
+        playtime,
+        np.where(playtime > 0, playtime // 10, 0),
+        np.floor(playtime * 0.6).astype(np.int64),
+        np.where(playtime > 0, playtime // 12, 0),
+        developer,
+        publisher,
+        label_lists(rng, rows, CATEGORY_SHARES),
+        label_lists(rng, rows, GENRE_SHARES),
+        label_lists(rng, rows, {tag: 0.3 for tag in TAGS}),
+        app_urls(app_id_text, "https://shared.akamai.steamstatic.com/store_item_assets/steam/apps/",
+                 "/ss_1.1920x1080.jpg"),
+        app_urls(app_id_text, "http://video.akamai.steamstatic.com/store_trailers/", "/movie_max.mp4"),
+    ]
+    return pa.table([pa.array(column) if isinstance(column, np.ndarray) else column for column in columns],
+                    names=[f"f{i}" for i in range(len(columns))])
+
+# Streams the file chunk by chunk, memory stays flat whatever the row count
+def write_synthetic_games(path, rows, seed=0):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    pool_rng = np.random.default_rng(seed)
+    developers = company_pool(pool_rng, max(rows // 3, 10), "")
+    publishers = company_pool(pool_rng, max(rows // 8, 10), " Publishing")
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write((HEADER + "\n").encode())
+        for chunk_index, start in enumerate(range(0, rows, CHUNK_ROWS)):
+            rng = np.random.default_rng([seed, chunk_index])
+            table = generate_chunk(rng, start, min(CHUNK_ROWS, rows - start), developers, publishers)
+            pa_csv.write_csv(table, f, pa_csv.WriteOptions(include_header=False))
+    os.replace(tmp_path, path)
+
+    return path
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic games.csv with the Kaggle dataset's schema")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--out", help="Defaults to data/synthetic/games-<rows>.csv")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    path = args.out or os.path.join("data", "synthetic", f"games-{args.rows}.csv")
+    start = time.perf_counter()
+    write_synthetic_games(path, args.rows, args.seed)
+    print(f"Wrote {args.rows} rows to {path} ({os.path.getsize(path) / 2**20:.1f} MB) "
+          f"in {time.perf_counter() - start:.1f} s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+import os
+
+# -- Dataset Locations --
+DATA_DIR = "data"
+CACHE_DIR = os.path.join(DATA_DIR, "cache")
+
+# -- Cleaning Pipeline Version --
+# Bump whenever the cleaning or feature creation code changes so cached artifacts get rebuilt
+PIPELINE_VERSION = 6
+
+# -- Ingest Memory Budget --
+# Default for the INGEST_MEMORY_BUDGET_MB setting, the peak memory reading and cleaning games.csv may take. The CSV
+# is read in chunks sized to stay within it.
+INGEST_MEMORY_BUDGET_MB = 1024
+
+# -- Ingest Workers --
+# Default for the INGEST_WORKERS setting, the processes cleaning a large CSV in parallel. 1 cleans in process.
+# Every spawned worker imports the server's modules again before it cleans anything, so more workers only pay off
+# with spare cores; python -m benchmarks.ingest_benchmark --workers 1 2 4 shows whether they do.
+INGEST_WORKERS = 1
+
+# -- Steam Store --
+# Store pages are derived from AppID when rendering instead of being stored per row
+STEAM_STORE_URL = "https://store.steampowered.com/app/"
+
+# -- Header Image Cache --
+# Thumbnails of the explorer's header images, downscaled to the width they are displayed at
+IMAGE_CACHE_DIR = os.path.join(CACHE_DIR, "images")
+IMAGE_CACHE_MAX_BYTES = 200 * 1024 * 1024
+THUMBNAIL_WIDTH = 320
@@ -0,0 +1,123 @@
+import numpy as np
+import pandas as pd
+
+from data_utils.filters import compile_filter
+from data_utils.genre_index import genre_bits, genre_counts, MAX_GENRES
+
+# Lower bounds of the review-count buckets, a bucket value of 100 means 100 to 999 reviews
+REVIEW_BUCKET_EDGES = np.array([0, 1, 10, 100, 1000, 10000, 100000])
+
+GENRE_CUBE_DIMENSIONS = ["Genre Mask", "Release Year", "Price Category", "Is_Indie", "Review Bucket"]
+PRICING_CUBE_DIMENSIONS = ["Release Year", "Reviews Percentage", "Price Category", "Is_Indie"]
+MEASURES = ["Count", "Peak CCU Sum", "Peak CCU Count"]
+# The genre cube also keeps, per genre, how many of its games carry every other genre for each value of this one
+GENRE_PAIR_DIMENSION = "Price Category"
+
+# Bucket lower bound of every review count, -1 where the count is missing
+def review_buckets(reviews):
+    reviews = np.asarray(reviews, dtype=np.float64)
+    buckets = REVIEW_BUCKET_EDGES[np.clip(np.searchsorted(REVIEW_BUCKET_EDGES, reviews, side="right") - 1, 0, None)]
+    return np.where(np.isnan(reviews), -1, buckets)
+
+def aggregate(frame, dimensions):
+    return frame.groupby(dimensions, observed=True, sort=False).agg(**{
+        "Count": ("Peak CCU", "size"),
+        "Peak CCU Sum": ("Peak CCU", "sum"),
+        "Peak CCU Count": ("Peak CCU", "count")
+    }).reset_index()
+
+# -- Pre-aggregated Cube --
+# One cell per distinct combination of the dimensions, holding the number of games, the sum of their Peak CCU
+# and how many of them have a Peak CCU. Genre Mask is a dimension as a whole, so cells answer "has all of
+# these genres" exactly with a bits_all predicate. Charts sum cells, their cost follows the number of cells
+# rather than the number of games.
+#
+# Genre combinations grow with the catalogue (about one cell for every two games), so a cube with Genre Mask
+# also keeps per-genre marginal cells: the same measures by the other dimensions for the games of one genre,
+# ordered by genre bit so one genre is a slice whose size does not depend on the number of games. A single
+# genre selection, the common case, reads its slice and its co-genre counts; several genres fall back to
+# the combination cells.
+class AnalyticsCube:
+    def __init__(self, cells, genre_cells=None, genre_offsets=None, genre_pairs=None, pair_values=None):
+        self.cells = cells
+        self.genre_cells = genre_cells
+        self.genre_offsets = genre_offsets
+        self.genre_pairs = genre_pairs
+        self.pair_values = pair_values
+
+    @classmethod
+    def build(cls, df, dimensions):
+        source_columns = [dimension for dimension in dimensions if dimension != "Review Bucket"]
+        frame = df[source_columns + ["Peak CCU"]]
+        if "Review Bucket" in dimensions:
+            frame = frame.assign(**{"Review Bucket": review_buckets(df["Reviews"])})
+
+        cells = aggregate(frame, dimensions)
+        if "Genre Mask" not in dimensions:
+            return cls(cells)
+
+        size = len(df.attrs.get("genre_vocabulary", [])) or MAX_GENRES
+        others = [dimension for dimension in dimensions if dimension != "Genre Mask"]
+        masks = frame["Genre Mask"].to_numpy().astype(np.uint64)
+        pair_codes, pair_values = pd.factorize(frame[GENRE_PAIR_DIMENSION])
+
+        # genre_pairs[g, v, h] is the number of games with genres g and h whose pair dimension is value v
+        genre_cells = []
+        genre_offsets = np.zeros(size + 1, dtype=np.int64)
+        genre_pairs = np.zeros((size, len(pair_values), size), dtype=np.int64)
+        for genre in range(size):
+            in_genre = (masks >> np.uint64(genre)) & np.uint64(1) == 1
+            genre_cells.append(aggregate(frame.loc[in_genre, others + ["Peak CCU"]], others).assign(Genre=genre))
+            genre_offsets[genre + 1] = genre_offsets[genre] + len(genre_cells[-1])
+
+            in_genre &= pair_codes >= 0
+            rows, co_genres = np.nonzero(genre_bits(masks[in_genre], size))
+            genre_pairs[genre] = np.bincount(
+                pair_codes[in_genre][rows] * size + co_genres, minlength=len(pair_values) * size
+            ).reshape(len(pair_values), size)
+
+        genre_cells = pd.concat(genre_cells, ignore_index=True)
+        return cls(cells, genre_cells, genre_offsets, genre_pairs, list(pair_values))
+
+    # The genre bit of a single-genre "bits_all" predicate on Genre Mask and the other predicates, (None,
+    # predicates) when the selection is not a single genre or there are no marginal cells
+    def single_genre(self, predicates):
+        if self.genre_cells is None:
+            return None, predicates
+        for index, (column, op, value) in enumerate(predicates):
+            if column == "Genre Mask" and op == "bits_all" and value is not None:
+                value = int(value)
+                if value and value & (value - 1) == 0 and value.bit_length() < len(self.genre_offsets):
+                    return value.bit_length() - 1, predicates[:index] + predicates[index + 1:]
+        return None, predicates
+
+    # Measures summed over the cells matching the filter predicates, grouped by the given dimensions
+    def query(self, predicates, by):
+        cells = self.cells
+        genre, others = self.single_genre(predicates)
+        if genre is not None and "Genre Mask" not in by:
+            cells = self.genre_cells.iloc[self.genre_offsets[genre]:self.genre_offsets[genre + 1]]
+            predicates = others
+        if predicates:
+            cells = cells.iloc[compile_filter(predicates).evaluate(cells)]
+        return cells.groupby(by, observed=True)[MEASURES].sum().reset_index()
+
+    # The matching cells themselves, e.g. to weight per-genre counts
+    def select(self, predicates):
+        return self.cells.iloc[compile_filter(predicates).evaluate(self.cells)]
+
+    # Number of matching games carrying each genre of the vocabulary. A single genre, optionally with one
+    # GENRE_PAIR_DIMENSION value, is read from the pair counts, anything else weights the matching cells' masks.
+    def genre_counts(self, predicates, vocabulary):
+        genre, others = self.single_genre(predicates)
+        if genre is not None and len(others) <= 1 and all(
+            column == GENRE_PAIR_DIMENSION and op == "==" for column, op, _ in others
+        ):
+            pairs = self.genre_pairs[genre]
+            if others:
+                value = others[0][2]
+                pairs = pairs[[self.pair_values.index(value)]] if value in self.pair_values else pairs[:0]
+            return pd.Series(pairs.sum(axis=0)[:len(vocabulary)], index=vocabulary, name="Count")
+
+        cells = self.select(predicates)
+        return genre_counts(cells["Genre Mask"].to_numpy(), vocabulary, weights=cells["Count"].to_numpy())
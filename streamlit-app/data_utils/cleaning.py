@@ -0,0 +1,279 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from constants.color_schemes import COLOR_SCHEMES
+from data_utils.genre_index import build_genre_masks
+from data_utils.incremental import raw_row_hashes, changed_rows
+from data_utils.spans import span, timed
+
+# The cleaning pipeline of games.csv. Nothing here imports streamlit, the ingest worker processes load this module
+# and not utils.
+
+# Helper function for Color Category
+def apply_categorical_order(df):
+    df['Price Category'] = pd.Categorical(
+        df['Price Category'],
+        categories=COLOR_SCHEMES["price_scale"]["order"],
+        ordered=True
+    )
+
+    return df
+
+# Column names of games.csv once AppID has become the index
+RAW_COLUMN_NAMES = [
+    'Name', 'Release date', 'Estimated owners', 'Peak CCU',
+    'Required age', 'Price', 'Discount', 'DLC count', 'About the game',
+    'Supported languages', 'Full audio languages', 'Reviews',
+    'Header image', 'Website', 'Support url', 'Support email', 'Windows',
+    'Mac', 'Linux', 'Metacritic score', 'Metacritic url', 'User score',
+    'Positive', 'Negative', 'Score rank', 'Achievements', 'Recommendations',
+    'Notes', 'Average playtime forever', 'Average playtime two weeks',
+    'Median playtime forever', 'Median playtime two weeks', 'Developers',
+    'Publishers', 'Categories', 'Genres', 'Tags', 'Screenshots', 'Movies'
+]
+
+# Unneeded columns, dropped by clean_data and never read from the CSV in the first place
+DROPPED_COLUMNS = [
+    "Screenshots", "Movies", "Tags", "Website", "Support email",
+    "About the game", "Metacritic url", "Support url",
+    "Score rank", "Notes", "Reviews"
+]
+
+# Declared dtypes of the columns that are read, the ones pandas infers for them on the full dataset
+TEXT_COLUMN_DTYPES = {
+    column: "str" for column in [
+        'Name', 'Release date', 'Estimated owners', 'Supported languages', 'Full audio languages', 'Header image',
+        'Developers', 'Publishers', 'Categories', 'Genres'
+    ]
+}
+INGEST_DTYPES = {
+    **TEXT_COLUMN_DTYPES,
+    **{column: "int64" for column in [
+        'Peak CCU', 'Required age', 'Discount', 'DLC count', 'Metacritic score', 'User score', 'Positive',
+        'Negative', 'Achievements', 'Recommendations', 'Average playtime forever', 'Average playtime two weeks',
+        'Median playtime forever', 'Median playtime two weeks'
+    ]},
+    'Price': "float64",
+    'Windows': "bool", 'Mac': "bool", 'Linux': "bool"
+}
+
+# -- Vectorized String Helpers --
+# These run on Arrow arrays so the work happens in pyarrow compute kernels instead of per-row Python
+GENRES_TO_EXCLUDE = ['Short', 'Movie', 'Accounting', 'Photo Editing', 'Web Publishing', 'Video Production', 'Software Training', 'Audio Production', 'Game Development', 'Design & Illustration', 'Animation & Modeling', 'Education', 'Utilities']
+
+def to_arrow_strings(series):
+    return pa.array(series.fillna(''), type=pa.string(), from_pandas=True)
+
+def is_game_mask(categories):
+    categories = pc.utf8_lower(to_arrow_strings(categories))
+    is_game = pc.or_(
+        pc.match_substring(categories, "single-player"),
+        pc.match_substring(categories, "multi-player")
+    )
+    return is_game.to_numpy(zero_copy_only=False)
+
+def contains_mask(series, substring):
+    return pc.match_substring(to_arrow_strings(series), substring).to_numpy(zero_copy_only=False)
+
+# Same as [genre.strip() for genre in x.split(',') if genre.strip()] with "Free to Play" renamed to "Free To Play",
+# returned as an Arrow list column
+def split_genre_list(genres):
+    tokens = pc.split_pattern(to_arrow_strings(genres), ",")
+    values = pc.utf8_trim_whitespace(tokens.flatten())
+    values = pc.if_else(pc.equal(values, "Free to Play"), "Free To Play", values)
+
+    keep = pc.not_equal(values, "")
+    parents = pc.list_parent_indices(tokens).filter(keep).to_numpy()
+    offsets = np.zeros(len(tokens) + 1, dtype=np.int32)
+    np.cumsum(np.bincount(parents, minlength=len(tokens)), out=offsets[1:])
+
+    genre_list = pa.ListArray.from_arrays(pa.array(offsets), values.filter(keep))
+    return pd.Series(pd.arrays.ArrowExtensionArray(genre_list), index=genres.index)
+
+# True for rows whose Genre List holds any of the given genres
+def genre_exclusion_mask(genre_list, excluded_genres):
+    genre_list = pa.array(genre_list.array)
+    hits = pc.is_in(genre_list.flatten(), value_set=pa.array(excluded_genres, type=pa.string()))
+    parents = pc.list_parent_indices(genre_list).filter(hits).to_numpy()
+
+    mask = np.zeros(len(genre_list), dtype=bool)
+    mask[parents] = True
+    return mask
+
+# Function to be used in load_and_clean_data for creating features used for filtering
+@timed("clean.feature_creation")
+def feature_creation(df):
+    #  -- Reviews --
+    df["Reviews"] = df["Positive"] + df["Negative"]
+    df["Reviews Percentage"] = (df["Positive"] / df["Reviews"]) * 100
+
+    df.loc[df["Reviews"] == 0, "Reviews Percentage"] = 0
+
+    df["Reviews Percentage"] = df["Reviews Percentage"].round(0).astype(int)
+
+    # -- Value / Weighted Value --
+    df.loc[df["Price"] > 0, "Value"] = df["Average playtime forever"] / df["Price"]
+
+    valid_mask = (
+        (df["Price"] > 0) &
+        np.isfinite(df["Value"]) &
+        df["Metacritic score"].notna() &
+        (df["Metacritic score"] > 0)
+    )
+
+    df.loc[valid_mask, "Weighted Value"] = df.loc[valid_mask, "Value"] * df.loc[valid_mask, "Metacritic score"]
+
+    # -- Release Year --
+    df["Release Year"] = df["Release date"].dt.year
+    
+    # -- Price Category --
+    price_conditions = [
+        (df['Price'] == 0),
+        (df['Price'] > 0) & (df['Price'] <= 4.99),
+        (df['Price'] > 4.99) & (df['Price'] <= 9.99),
+        (df['Price'] > 9.99) & (df['Price'] <= 19.99),
+        (df['Price'] > 19.99) & (df['Price'] <= 39.99),
+        (df['Price'] > 39.99) & (df['Price'] <= 59.99),
+        (df['Price'] > 59.99)
+    ]
+
+    choices = [
+        'Free',
+        '$0.01 - $4.99',
+        '$5.00 - $9.99',
+        '$10.00 - $19.99',
+        '$20.00 - $39.99',
+        '$40.00 - $59.99',
+        '$60.00+'
+    ]
+
+    df['Price Category'] = np.select(price_conditions, choices, default="Unknown")
+
+    # -- Indie Or Not --
+    df["Is_Indie"] = np.where(contains_mask(df["Genres"], "Indie"), "Indie", "Non-Indie")
+
+    # -- Genre List --
+    # "Free to Play" is written as "Free To Play" to match the genre selector labels
+    df["Genre List"] = split_genre_list(df["Genres"])
+
+    return df
+
+# The header names one column less than every row has, so the names are given and AppID becomes the index
+INGEST_READ_OPTIONS = dict(
+    names=["AppID"] + RAW_COLUMN_NAMES, index_col="AppID",
+    usecols=["AppID"] + [column for column in RAW_COLUMN_NAMES if column not in DROPPED_COLUMNS]
+)
+
+# One chunk of the CSV, cleaned as an Arrow table along with the hashes of its raw rows. Runs in the ingest worker
+# processes.
+def clean_chunk(chunk, known_keys=None):
+    row_hashes = raw_row_hashes(chunk)
+    if known_keys is not None:
+        chunk = chunk.iloc[np.flatnonzero(changed_rows(row_hashes, known_keys))]
+    return pa.Table.from_pandas(clean_data(chunk), preserve_index=False), row_hashes
+
+# -- Cleaning Pipeline --
+@timed("dataset.clean")
+def clean_data(df):
+    # -- Working with columns --
+
+    # Renaming columns, a full read of games.csv has every column under shifted names
+    if len(df.columns) == len(RAW_COLUMN_NAMES):
+        df.columns = RAW_COLUMN_NAMES
+
+    # Dropping unneeded columns
+    cols_to_drop_existing = [col for col in DROPPED_COLUMNS if col in df.columns]
+    df.drop(cols_to_drop_existing, axis=1, inplace=True)
+
+    # -- Is a Game or Not --
+    with span("clean.is_game"):
+        df = df[is_game_mask(df["Categories"])]
+
+    # -- Index Reset --
+    df = df.reset_index(names=['AppID'])
+
+    # -- Type Conversions and Initial Cleaning --
+
+    # Date Conversion
+    # An explicit format keeps parsing on the vectorized path instead of per element dateutil fallbacks
+    with span("clean.release_date"):
+        df["Release date"] = pd.to_datetime(df["Release date"], format="%b %d, %Y", errors='coerce')
+        df.dropna(subset=["Release date"], inplace=True)
+
+    # Cleaning Estimated Owners
+    with span("clean.owners"):
+        df['Estimated owners_str'] = df['Estimated owners'].copy()
+        owners_split = df["Estimated owners"].astype(str).str.split(' - ', expand=True)
+        owners_split_numeric = owners_split.apply(pd.to_numeric, errors='coerce')
+        df["Estimated owners avg"] = owners_split_numeric.mean(axis=1)
+
+        number_to_reduced_number = {
+            '0 - 20000': '0 - 20K', '20000 - 50000': '20K - 50K',
+            '50000 - 100000': '50K - 100K', '100000 - 200000': '100K - 200K',
+            '200000 - 500000': '200K - 500K', '500000 - 1000000': '500K - 1M',
+            '1000000 - 2000000': '1M - 2M', '2000000 - 5000000': '2M - 5M',
+            '5000000 - 10000000': '5M - 10M', '10000000 - 20000000': '10M - 20M',
+            '20000000 - 50000000': '20M - 50M', '50000000 - 100000000': '50M - 100M',
+            '100000000 - 200000000': '100M - 200M'
+        }
+        df['Estimated owners_category'] = df['Estimated owners_str'].map(number_to_reduced_number)
+        df.drop('Estimated owners', axis=1, inplace=True)
+
+
+    # Convert other numerical columns
+    with span("clean.numeric_types"):
+        numerical_cols_to_convert = [
+            "Peak CCU", "Price", "Discount", "DLC count", "Metacritic score",
+            "User score", "Positive", "Negative", "Achievements", "Recommendations",
+            "Average playtime forever", "Average playtime two weeks",
+            "Median playtime forever", "Median playtime two weeks"
+        ]
+        for col in numerical_cols_to_convert:
+            if col in df.columns:
+                df[col] = pd.to_numeric(df[col], errors='coerce')
+
+
+        # -- Type optimization --
+        # Every numeric column gets a fixed dtype, so chunks whose numbers were inferred differently (an empty cell
+        # reads as float) still concatenate
+        df["Peak CCU"] = df["Peak CCU"].astype('Int32')
+        df["Discount"] = df["Discount"].astype('Int8')
+        df["User score"] = df["User score"].astype('Int8')
+        df["Positive"] = df["Positive"].astype('Int32')
+        df["Negative"] = df["Negative"].astype('Int32')
+        df["Required age"] = df["Required age"].astype('Int8')
+        df["Price"] = df["Price"].astype('float32')
+        df["DLC count"] = df["DLC count"].astype('Int16')
+        df["Metacritic score"] = df["Metacritic score"].astype('Int8')
+        df["Achievements"] = df["Achievements"].astype('Int16')
+        df["Recommendations"] = df["Recommendations"].astype('Int32')
+        df["Average playtime forever"] = df["Average playtime forever"].astype('Int32')
+        df["Average playtime two weeks"] = df["Average playtime two weeks"].astype('Int16')
+        df["Median playtime forever"] = df["Median playtime forever"].astype('Int32')
+        df["Median playtime two weeks"] = df["Median playtime two weeks"].astype('Int16')
+
+        # Floating point optimization
+        df['Price'] = df['Price'].round(2)
+
+        # An empty platform cell reads as NaN next to the booleans
+        for col in ["Windows", "Mac", "Linux"]:
+            df[col] = df[col].astype('boolean')
+
+    # -- Feature Creation for Filtering --
+    df = feature_creation(df)
+
+    # -- Category Order for Coloring --
+    df = apply_categorical_order(df)
+
+    # Cleaning Genre List
+    with span("clean.genre_exclusion"):
+        df = df[~genre_exclusion_mask(df["Genre List"], GENRES_TO_EXCLUDE)].copy()
+
+    # -- Genre Bitmask --
+    # Genre filters and counts run on this column instead of walking the lists
+    with span("clean.genre_masks"):
+        df["Genre Mask"], df.attrs["genre_vocabulary"] = build_genre_masks(df["Genre List"])
+
+    return df
@@ -0,0 +1,226 @@
+import glob
+import hashlib
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+HASH_BLOCK_SIZE = 1024 * 1024
+
+# -- Source Checksum --
+# The sha256 of the raw CSV is remembered in a sidecar file so it is only recomputed when size or mtime change
+def file_checksum(path):
+    stat = os.stat(path)
+    sidecar_path = path + ".sha256.json"
+
+    try:
+        with open(sidecar_path) as f:
+            sidecar = json.load(f)
+        if sidecar["size"] == stat.st_size and sidecar["mtime_ns"] == stat.st_mtime_ns:
+            return sidecar["sha256"]
+    except (OSError, ValueError, KeyError):
+        pass
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    checksum = digest.hexdigest()
+
+    try:
+        with open(sidecar_path, "w") as f:
+            json.dump({"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": checksum}, f)
+    except OSError:
+        pass
+
+    return checksum
+
+# A variant (e.g. "compact") separates artifacts the same input and pipeline produce with different options
+def dataset_fingerprint(checksum, pipeline_version, variant=None):
+    fingerprint = f"{checksum[:16]}-v{pipeline_version}"
+    return f"{fingerprint}-{variant}" if variant else fingerprint
+
+# Pandas values wrapping the mapped Arrow buffers, list columns stay Arrow backed
+def arrow_column_values(column):
+    if pa.types.is_nested(column.type):
+        return pd.arrays.ArrowExtensionArray(column)
+    return column.to_pandas()
+
+# -- Memory-Mapped Dataset Store --
+# The cleaned frame is stored as one file per column in a directory per fingerprint. Numeric columns are .npy files
+# opened with mmap_mode="r", nullable ones as data plus mask, categoricals as their codes, and text and list columns
+# go into one Arrow IPC file that is memory mapped as well. Every server process maps the same files read-only,
+# so the OS page cache holds a single copy and opening the store parses nothing.
+STORE_MANIFEST = "manifest.json"
+STORE_ARROW_FILE = "columns.arrow"
+STORE_INDEX_DIR = "indexes"
+
+# Nullable columns made of a numpy data array and a missing value mask
+MASKED_ARRAY_TYPES = (pd.arrays.IntegerArray, pd.arrays.FloatingArray, pd.arrays.BooleanArray)
+
+def cached_frame_path(cache_dir, fingerprint):
+    return os.path.join(cache_dir, f"games-{fingerprint}")
+
+def write_arrays(directory, arrays):
+    for name, values in arrays.items():
+        np.save(os.path.join(directory, f"{name}.npy"), np.ascontiguousarray(values), allow_pickle=False)
+
+# A plain ndarray view of the read-only memmap, the mapping stays open as its base
+def map_array(directory, name):
+    return np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r", allow_pickle=False).view(np.ndarray)
+
+# Writes into a temporary directory that is renamed into place, so a concurrent reader never sees a half written
+# store. When another process got there first its copy is kept.
+def publish_directory(tmp_path, path):
+    try:
+        os.rename(tmp_path, path)
+    except OSError:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+
+def save_cached_frame(df, cache_dir, fingerprint):
+    os.makedirs(cache_dir, exist_ok=True)
+    path = cached_frame_path(cache_dir, fingerprint)
+    if os.path.isdir(path):
+        return path
+
+    tmp_path = path + f".{os.getpid()}.tmp"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+
+    write_arrays(tmp_path, {"index": df.index.to_numpy()})
+
+    columns, arrow_columns = [], {}
+    for i, (name, series) in enumerate(df.items()):
+        column = {"name": name, "dtype": str(series.dtype)}
+        dtype = series.dtype
+
+        if isinstance(dtype, np.dtype):
+            column["kind"] = "numpy"
+            write_arrays(tmp_path, {f"{i}": series.to_numpy()})
+        elif isinstance(dtype, pd.CategoricalDtype):
+            column.update(kind="categorical", categories=dtype.categories.tolist(), ordered=bool(dtype.ordered))
+            write_arrays(tmp_path, {f"{i}.codes": series.cat.codes.to_numpy()})
+        elif isinstance(series.array, MASKED_ARRAY_TYPES):
+            column["kind"] = "masked"
+            write_arrays(tmp_path, {
+                f"{i}": series.to_numpy(dtype=dtype.numpy_dtype, na_value=0),
+                f"{i}.mask": series.isna().to_numpy()
+            })
+        else:
+            column["kind"] = "arrow"
+            arrow_columns[name] = pa.array(series.array, from_pandas=True)
+        columns.append(column)
+
+    table = pa.table(arrow_columns)
+    with pa.OSFile(os.path.join(tmp_path, STORE_ARROW_FILE), "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+    with open(os.path.join(tmp_path, STORE_MANIFEST), "w") as f:
+        json.dump({"rows": len(df), "columns": columns, "attrs": df.attrs}, f)
+
+    publish_directory(tmp_path, path)
+    prune_cached_frames(cache_dir, keep=path)
+
+    return path
+
+def load_cached_frame(cache_dir, fingerprint):
+    path = cached_frame_path(cache_dir, fingerprint)
+    if not os.path.isdir(path):
+        return None
+
+    try:
+        with open(os.path.join(path, STORE_MANIFEST)) as f:
+            manifest = json.load(f)
+        table = pa.ipc.open_file(pa.memory_map(os.path.join(path, STORE_ARROW_FILE))).read_all()
+
+        data = {}
+        for i, column in enumerate(manifest["columns"]):
+            kind, dtype = column["kind"], column["dtype"]
+            if kind == "numpy":
+                values = map_array(path, f"{i}")
+            elif kind == "categorical":
+                values = pd.Categorical.from_codes(
+                    map_array(path, f"{i}.codes"),
+                    dtype=pd.CategoricalDtype(column["categories"], ordered=column["ordered"])
+                )
+            elif kind == "masked":
+                array_type = pd.api.types.pandas_dtype(dtype).construct_array_type()
+                values = array_type(map_array(path, f"{i}"), map_array(path, f"{i}.mask"))
+            else:
+                values = arrow_column_values(table.column(column["name"]))
+                if str(values.dtype) != dtype:
+                    values = values.astype(dtype)
+            data[column["name"]] = pd.Series(values, copy=False)
+    except (OSError, ValueError, KeyError, TypeError, pa.ArrowException):
+        # A truncated or corrupt store is treated as a cache miss and rebuilt
+        return None
+
+    # copy=False keeps every column backed by its mapped file
+    df = pd.DataFrame(data, copy=False)
+    df.index = pd.Index(map_array(path, "index"), copy=False)
+    df.attrs.update(manifest["attrs"])
+
+    return df
+
+# The newest other store built by the same pipeline and variant, what a refresh of the dataset starts from
+def previous_cached_fingerprint(cache_dir, fingerprint):
+    suffix = fingerprint.split("-", 1)[1]
+    candidates = []
+    for path in glob.glob(os.path.join(cache_dir, "games-*")):
+        candidate = os.path.basename(path)[len("games-"):]
+        if candidate == fingerprint or path.endswith(".tmp") or not os.path.isdir(path):
+            continue
+        if candidate.split("-", 1)[1:] == [suffix]:
+            candidates.append((os.path.getmtime(path), candidate))
+    return max(candidates)[1] if candidates else None
+
+# -- Index Arrays --
+# Indexes built from the dataset are stored next to it as .npy arrays and mapped the same way
+def cached_index_path(cache_dir, fingerprint, name):
+    return os.path.join(cached_frame_path(cache_dir, fingerprint), STORE_INDEX_DIR, name.replace(" ", "_"))
+
+def save_cached_index(cache_dir, fingerprint, name, arrays):
+    # Only stored beside a dataset store, never on their own
+    if not os.path.isdir(cached_frame_path(cache_dir, fingerprint)):
+        return None
+
+    path = cached_index_path(cache_dir, fingerprint, name)
+    if os.path.isdir(path):
+        return path
+
+    tmp_path = path + f".{os.getpid()}.tmp"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+
+    write_arrays(tmp_path, arrays)
+    with open(os.path.join(tmp_path, STORE_MANIFEST), "w") as f:
+        json.dump({"arrays": list(arrays)}, f)
+
+    publish_directory(tmp_path, path)
+    return path
+
+def load_cached_index(cache_dir, fingerprint, name):
+    path = cached_index_path(cache_dir, fingerprint, name)
+    try:
+        with open(os.path.join(path, STORE_MANIFEST)) as f:
+            names = json.load(f)["arrays"]
+        return {array_name: map_array(path, array_name) for array_name in names}
+    except (OSError, ValueError, KeyError):
+        return None
+
+# Removing stores left behind by older inputs or pipeline versions
+def prune_cached_frames(cache_dir, keep):
+    for path in glob.glob(os.path.join(cache_dir, "games-*")):
+        if os.path.abspath(path) == os.path.abspath(keep) or path.endswith(".tmp"):
+            continue
+        try:
+            if os.path.isdir(path):
+                shutil.rmtree(path)
+            else:
+                os.remove(path)
+        except OSError:
+            pass
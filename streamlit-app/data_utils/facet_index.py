@@ -0,0 +1,122 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# Columns the explorer offers as facets, comma separated lists of names
+FACET_COLUMNS = ["Developers", "Publishers"]
+
+# A company suffix after a comma ("Studio, Inc.") belongs to the name before it rather than being a name itself.
+# Its comma is swapped for a placeholder while splitting and put back afterwards.
+COMPANY_SUFFIX_PATTERN = r",(\s*(?:Inc|LLC|Ltd|Co|Corp|GmbH|S\.A)\.?\s*)(,|$)"
+SUFFIX_COMMA = "\x1f"
+
+# Trimmed, non-empty names of every row as an Arrow list array
+def split_names(values):
+    values = pa.array(values.astype(pd.StringDtype("pyarrow")), type=pa.string(), from_pandas=True)
+    values = pc.replace_substring_regex(pc.fill_null(values, ""), COMPANY_SUFFIX_PATTERN, SUFFIX_COMMA + r"\1\2")
+
+    tokens = pc.split_pattern(values, ",")
+    names = pc.utf8_trim_whitespace(pc.replace_substring(tokens.flatten(), SUFFIX_COMMA, ","))
+    keep = pc.not_equal(names, "")
+    parents = pc.list_parent_indices(tokens).filter(keep).to_numpy()
+
+    offsets = np.zeros(len(tokens) + 1, dtype=np.int32)
+    np.cumsum(np.bincount(parents, minlength=len(tokens)), out=offsets[1:])
+    return pa.ListArray.from_arrays(pa.array(offsets), names.filter(keep))
+
+# -- Facet Index --
+# Every distinct name gets an integer ID, the most common name 0. Postings are kept both ways: (rows, ids) holds
+# one entry per (row, name) sorted by row, for counting the names of any set of rows with one bincount; the rows
+# of name i are name_rows[name_offsets[i]:name_offsets[i + 1]], ascending, for filtering by name. Names are one
+# Arrow string array, stored as its UTF-8 bytes and offsets.
+class FacetIndex:
+    def __init__(self, names, rows, ids, name_offsets, name_rows):
+        self.names = names
+        self.rows = rows
+        self.ids = ids
+        self.name_offsets = name_offsets
+        self.name_rows = name_rows
+
+    @classmethod
+    def build(cls, values):
+        lists = split_names(values)
+        encoded = pc.dictionary_encode(lists.flatten())
+        codes = encoded.indices.to_numpy().astype(np.int64)
+        rows = pc.list_parent_indices(lists).to_numpy().astype(np.int64)
+
+        # A name listed twice for one game counts once
+        pairs = np.unique(rows * len(encoded.dictionary) + codes)
+        rows, codes = pairs // max(len(encoded.dictionary), 1), pairs % max(len(encoded.dictionary), 1)
+
+        # IDs by number of games, ties alphabetical
+        counts = np.bincount(codes, minlength=len(encoded.dictionary))
+        alphabetical = np.empty(len(counts), dtype=np.int64)
+        alphabetical[pc.sort_indices(encoded.dictionary).to_numpy()] = np.arange(len(counts))
+        order = np.lexsort((alphabetical, -counts))
+        new_ids = np.empty(len(order), dtype=np.int32)
+        new_ids[order] = np.arange(len(order), dtype=np.int32)
+
+        ids = new_ids[codes]
+        names = encoded.dictionary.take(pa.array(order)).cast(pa.large_string())
+        name_offsets = np.zeros(len(order) + 1, dtype=np.int64)
+        np.cumsum(counts[order], out=name_offsets[1:])
+        # Rows are ascending already, a stable sort keeps them so within every name
+        name_rows = rows[np.argsort(ids, kind="stable")].astype(np.int32)
+
+        return cls(names, rows.astype(np.int32), ids, name_offsets, name_rows)
+
+    def to_arrays(self):
+        names = pa.concat_arrays([self.names])
+        offsets = np.frombuffer(names.buffers()[1], dtype=np.int64)[:len(names) + 1]
+        data = np.frombuffer(names.buffers()[2], dtype=np.uint8)[:offsets[-1]] if len(names) else np.zeros(0, np.uint8)
+        return {
+            "name_data": data, "name_text_offsets": offsets, "rows": self.rows, "ids": self.ids,
+            "name_offsets": self.name_offsets, "name_rows": self.name_rows
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        text_offsets = arrays["name_text_offsets"]
+        names = pa.LargeStringArray.from_buffers(
+            len(text_offsets) - 1, pa.py_buffer(text_offsets), pa.py_buffer(arrays["name_data"])
+        )
+        return cls(names, arrays["rows"], arrays["ids"], arrays["name_offsets"], arrays["name_rows"])
+
+    def __len__(self):
+        return len(self.names)
+
+    # Games per name among the rows of mask, all rows without one
+    def counts(self, mask=None):
+        if mask is None:
+            return np.diff(self.name_offsets)
+        return np.bincount(self.ids[mask[self.rows]], minlength=len(self))
+
+    # Rows listing any of the names, as a mask over n_rows rows
+    def rows_with_any(self, ids, n_rows):
+        mask = np.zeros(n_rows, dtype=bool)
+        for i in ids:
+            mask[self.name_rows[self.name_offsets[i]:self.name_offsets[i + 1]]] = True
+        return mask
+
+    # IDs of the names, names that are not in the index are left out
+    def ids_for(self, names):
+        if not names:
+            return np.array([], dtype=np.int64)
+        ids = pc.index_in(pa.array(names, type=pa.large_string()), value_set=self.names)
+        return ids.drop_null().to_numpy().astype(np.int64)
+
+    # Names containing text, ignoring case, as a mask over IDs
+    def name_mask(self, text):
+        return pc.match_substring(self.names, text, ignore_case=True).to_numpy(zero_copy_only=False)
+
+    def names_for(self, ids):
+        return self.names.take(pa.array(np.asarray(ids, dtype=np.int64))).to_pylist()
+
+    # IDs of the limit names with the most games in counts, fewer when fewer have any
+    def top(self, counts, limit):
+        present = np.flatnonzero(counts)
+        if len(present) > limit:
+            present = present[np.argpartition(-counts[present], limit - 1)[:limit]]
+        # IDs order ties by overall popularity
+        return present[np.lexsort((present, -counts[present]))]
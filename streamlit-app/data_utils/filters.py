@@ -0,0 +1,170 @@
+import time
+
+import numpy as np
+
+# numexpr is optional (it ships with most pandas installs), plain numpy is used without it
+try:
+    import numexpr
+except ImportError:
+    numexpr = None
+
+# -- Declarative Filter Specs --
+# A spec is a list of (column, op, value) predicates that are all ANDed together, e.g.
+#   [("Release Year", "between", (2010, 2020)), ("Reviews", ">=", 100), ("Weighted Value", "notna", None)]
+# "between" is inclusive on both ends and "bits_all" keeps rows whose uint64 mask has every bit of value set, no
+# rows with None (e.g. a genre that is not in the vocabulary).
+COMPARISON_OPS = {">=", ">", "<=", "<", "==", "!="}
+NUMEXPR_OPS = COMPARISON_OPS | {"between", "notna"}
+
+# Plain numpy view of a column (or of the given rows of it), nullable numeric columns become float with NaN
+# for missing values and categorical or string columns become object arrays
+def column_values(df, column, positions=None):
+    series = df[column]
+    if isinstance(series.dtype, np.dtype):
+        values = series.to_numpy()
+        return values if positions is None else values[positions]
+
+    array = series.array if positions is None else series.array[positions]
+    if series.dtype.kind in "iuf":
+        return array.to_numpy(dtype=np.float64, na_value=np.nan)
+    return np.asarray(array, dtype=object)
+
+# numexpr only knows bool, int32, int64, float32 and float64
+def numexpr_compatible(values):
+    if values.dtype.kind == "b" or values.dtype in (np.int32, np.int64, np.float32, np.float64):
+        return values
+    if values.dtype.kind in "iu":
+        return values.astype(np.int64)
+    return values.astype(np.float64)
+
+# Float constants take the column's precision, matching numpy's comparison of a float32 column with 4.99
+def constant_like(values, value):
+    if values.dtype.kind == "f":
+        return np.asarray(value, dtype=values.dtype)
+    return value
+
+def predicate_label(column, op, value):
+    if op == "notna":
+        return f"{column} notna"
+    return f"{column} {op} {value}"
+
+COMPARISON_UFUNCS = {
+    ">=": np.greater_equal, ">": np.greater, "<=": np.less_equal,
+    "<": np.less, "==": np.equal, "!=": np.not_equal
+}
+
+# ANDs one predicate into mask in place, scratch is a reusable bool buffer so no temporaries are allocated
+def apply_predicate(mask, values, op, value, scratch):
+    if op == "between":
+        low, high = value
+        mask &= np.greater_equal(values, low, out=scratch)
+        mask &= np.less_equal(values, high, out=scratch)
+    elif op == "notna":
+        if values.dtype.kind == "f":
+            mask &= np.equal(values, values, out=scratch)
+    elif op == "bits_all" and value is None:
+        mask[:] = False
+    elif op == "bits_all":
+        value = np.uint64(value)
+        mask &= np.equal(values & value, value, out=scratch)
+    else:
+        mask &= COMPARISON_UFUNCS[op](values, value, out=scratch)
+    return mask
+
+# -- Compiled Filter --
+# Predicates are ANDed into a single mask in place. On large frames the numexpr-compatible ones are fused into
+# one numexpr expression instead, which evaluates in a single multithreaded pass; with one core or below
+# NUMEXPR_MIN_ROWS its per-call overhead outweighs that. Timings of the last run are kept in self.timings, and profile=True times
+# each predicate on its own to show which ones cost the most.
+NUMEXPR_MIN_ROWS = 1_000_000
+
+class CompiledFilter:
+    def __init__(self, predicates):
+        for column, op, value in predicates:
+            if op not in NUMEXPR_OPS and op != "bits_all":
+                raise ValueError(f"Unknown filter op: {op}")
+
+        self.predicates = list(predicates)
+        self.timings = {}
+
+        self.fused = [predicate for predicate in self.predicates if predicate[1] in NUMEXPR_OPS]
+        self.residual = [predicate for predicate in self.predicates if predicate[1] not in NUMEXPR_OPS]
+        self.expression, self.expression_columns = self.build_expression(self.fused)
+
+    @staticmethod
+    def build_expression(predicates):
+        terms, columns = [], {}
+        for i, (column, op, value) in enumerate(predicates):
+            name = columns.setdefault(column, f"c{len(columns)}")
+            if op == "between":
+                terms.append(f"({name} >= lo{i}) & ({name} <= hi{i})")
+            elif op == "notna":
+                # NaN is the only value not equal to itself
+                terms.append(f"({name} == {name})")
+            else:
+                terms.append(f"({name} {op} v{i})")
+        return " & ".join(terms), columns
+
+    def expression_values(self, df):
+        local_dict = {
+            name: numexpr_compatible(column_values(df, column)) for column, name in self.expression_columns.items()
+        }
+        for i, (column, op, value) in enumerate(self.fused):
+            values = local_dict[self.expression_columns[column]]
+            if op == "between":
+                local_dict[f"lo{i}"] = constant_like(values, value[0])
+                local_dict[f"hi{i}"] = constant_like(values, value[1])
+            elif op != "notna":
+                local_dict[f"v{i}"] = constant_like(values, value)
+        return local_dict
+
+    def evaluate_mask(self, df, profile=False):
+        start = time.perf_counter()
+        self.timings = {}
+
+        use_numexpr = (
+            numexpr is not None and numexpr.nthreads > 1 and self.expression and
+            len(df) >= NUMEXPR_MIN_ROWS and not profile
+        )
+        if use_numexpr:
+            mask = numexpr.evaluate(self.expression, local_dict=self.expression_values(df))
+            remaining = self.residual
+        else:
+            mask = np.ones(len(df), dtype=bool)
+            remaining = self.predicates
+
+        scratch = np.empty(len(df), dtype=bool)
+        for column, op, value in remaining:
+            predicate_start = time.perf_counter()
+            apply_predicate(mask, column_values(df, column), op, value, scratch)
+            if profile:
+                self.timings[predicate_label(column, op, value)] = time.perf_counter() - predicate_start
+
+        self.timings["total"] = time.perf_counter() - start
+        return mask
+
+    # iloc positions of the matching rows, nothing is copied out of df
+    def evaluate(self, df, profile=False):
+        return np.flatnonzero(self.evaluate_mask(df, profile=profile))
+
+    # Mask over a handful of candidate rows, only those rows of each column are read
+    def evaluate_positions(self, df, positions):
+        mask = np.ones(len(positions), dtype=bool)
+        scratch = np.empty(len(positions), dtype=bool)
+        for column, op, value in self.predicates:
+            apply_predicate(mask, column_values(df, column, positions), op, value, scratch)
+        return mask
+
+def compile_filter(predicates):
+    return CompiledFilter(predicates)
+
+# -- Top Rows of a Result --
+# The k best positions ordered by the given columns (descending by default), missing values last
+def top_positions(df, positions, columns, k, ascending=False):
+    keys = []
+    for column in reversed(columns):
+        values = column_values(df, column, positions).astype(np.float64)
+        keys.append(values if ascending else -values)
+
+    order = np.lexsort(keys) if keys else np.arange(len(positions))
+    return positions[order[:k]]
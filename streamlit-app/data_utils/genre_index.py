@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# Every genre gets one bit of a uint64, Steam has well under this many genres
+MAX_GENRES = 64
+
+# -- Building --
+# Dictionary-encodes an Arrow list column of genres into one uint64 bitmask per row.
+# An existing vocabulary keeps its bit positions and new genres are appended after it.
+def build_genre_masks(genre_list, vocabulary=None):
+    genre_list = pa.array(genre_list.array)
+    # Concatenated frames hand out one Arrow chunk per piece
+    if isinstance(genre_list, pa.ChunkedArray):
+        genre_list = genre_list.combine_chunks()
+    flat = genre_list.flatten()
+
+    vocabulary = list(vocabulary or [])
+    known = set(vocabulary)
+    vocabulary += sorted(genre for genre in pc.unique(flat).to_pylist() if genre not in known)
+
+    if len(vocabulary) > MAX_GENRES:
+        raise ValueError(f"Genre bitmask supports at most {MAX_GENRES} genres, found {len(vocabulary)}")
+
+    codes = pc.index_in(flat, value_set=pa.array(vocabulary, type=pa.string())).to_numpy().astype(np.uint64)
+    parents = pc.list_parent_indices(genre_list).to_numpy()
+
+    masks = np.zeros(len(genre_list), dtype=np.uint64)
+    np.bitwise_or.at(masks, parents, np.left_shift(np.uint64(1), codes))
+
+    return masks, vocabulary
+
+# -- Querying --
+def genre_query_mask(vocabulary, genre_selections):
+    positions = {genre: bit for bit, genre in enumerate(vocabulary)}
+
+    query = np.uint64(0)
+    for genre in genre_selections:
+        if genre not in positions:
+            return None
+        query |= np.left_shift(np.uint64(1), np.uint64(positions[genre]))
+
+    return query
+
+# Rows that have every selected genre
+def genre_filter_mask(masks, vocabulary, genre_selections):
+    query = genre_query_mask(vocabulary, genre_selections)
+    if query is None:
+        return np.zeros(len(masks), dtype=bool)
+
+    return (masks & query) == query
+
+# One row of 0/1 per mask, one column per genre bit
+def genre_bits(masks, size):
+    masks = np.ascontiguousarray(masks, dtype="<u8")
+    return np.unpackbits(masks.view(np.uint8).reshape(-1, 8), axis=1, bitorder="little")[:, :size]
+
+# Number of rows carrying each genre, as a column sum over the unpacked bits.
+# With weights (e.g. cube cell counts) every row counts as its weight.
+def genre_counts(masks, vocabulary, weights=None):
+    bits = genre_bits(masks, len(vocabulary))
+
+    if weights is None:
+        counts = bits.sum(axis=0, dtype=np.int64)
+    else:
+        counts = np.asarray(weights, dtype=np.int64) @ bits.astype(np.int64)
+
+    return pd.Series(counts, index=vocabulary, name="Count")
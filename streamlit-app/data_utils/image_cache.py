@@ -0,0 +1,134 @@
+import hashlib
+import io
+import os
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+IMAGE_TIMEOUT_SECONDS = 10
+PREFETCH_WORKERS = 4
+# A URL that could not be fetched is not tried again for this long
+FAILURE_RETRY_SECONDS = 300
+
+def fetch_url(url):
+    with urllib.request.urlopen(url, timeout=IMAGE_TIMEOUT_SECONDS) as response:
+        return response.read()
+
+# Downscaled to the displayed width and re-encoded as JPEG, header images are 460px wide on Steam.
+# Pillow is imported on the first thumbnail rather than with the app, most reruns never make one.
+def make_thumbnail(data, width):
+    from PIL import Image
+
+    image = Image.open(io.BytesIO(data))
+    if image.width > width:
+        image.thumbnail((width, image.height))
+
+    output = io.BytesIO()
+    image.convert("RGB").save(output, format="JPEG", quality=85, optimize=True)
+    return output.getvalue()
+
+# -- On-disk Thumbnail Cache --
+# Thumbnails are files named after the hash of their URL. A hit refreshes the file's mtime, and once the files
+# add up to more than max_bytes the least recently used ones are removed. Downloads run on a small thread pool,
+# so a page's images are fetched in parallel and the next page can be prefetched while the current one is read.
+# Nothing waits for them: until a thumbnail is stored the browser loads the original URL. Failed URLs are
+# remembered for FAILURE_RETRY_SECONDS, so an unreachable CDN is not asked again on every rerun.
+class ImageCache:
+    def __init__(self, cache_dir, max_bytes, width, fetch=fetch_url):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.width = width
+        self.fetch = fetch
+
+        self.lock = threading.Lock()
+        self.pending = {}
+        self.failed = {}
+        self.executor = ThreadPoolExecutor(max_workers=PREFETCH_WORKERS, thread_name_prefix="image-prefetch")
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self.total_bytes = sum(size for _, size, _ in self.entries())
+
+    def path_for(self, url):
+        return os.path.join(self.cache_dir, hashlib.sha1(url.encode()).hexdigest() + ".jpg")
+
+    # (path, size, mtime) of every stored thumbnail
+    def entries(self):
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith(".jpg"):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((entry.path, stat.st_size, stat.st_mtime_ns))
+        return entries
+
+    def store(self, url):
+        path = self.path_for(url)
+        thumbnail = make_thumbnail(self.fetch(url), self.width)
+
+        tmp_path = path + f".{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(thumbnail)
+        os.replace(tmp_path, path)
+
+        with self.lock:
+            self.total_bytes += len(thumbnail)
+            over_budget = self.total_bytes > self.max_bytes
+        if over_budget:
+            self.evict(keep=path)
+
+        return path
+
+    def evict(self, keep):
+        with self.lock:
+            entries = sorted(self.entries(), key=lambda entry: entry[2])
+            total = sum(size for _, size, _ in entries)
+            for path, size, _ in entries:
+                if total <= self.max_bytes:
+                    break
+                if path == keep:
+                    continue
+                try:
+                    os.remove(path)
+                    total -= size
+                except OSError:
+                    pass
+            self.total_bytes = total
+
+    def download(self, url):
+        try:
+            return self.store(url)
+        except Exception:
+            # A broken or unreachable image only means the browser loads the original URL
+            with self.lock:
+                self.failed[url] = time.monotonic()
+            return None
+        finally:
+            with self.lock:
+                self.pending.pop(url, None)
+
+    # Starts downloading every URL that is neither stored, already on its way nor recently failed
+    def prefetch(self, urls):
+        for url in urls:
+            if not url or os.path.exists(self.path_for(url)):
+                continue
+            with self.lock:
+                failed_at = self.failed.get(url)
+                if failed_at is not None and time.monotonic() - failed_at < FAILURE_RETRY_SECONDS:
+                    continue
+                self.failed.pop(url, None)
+                if url not in self.pending:
+                    self.pending[url] = self.executor.submit(self.download, url)
+
+    # Local path of the thumbnail when it is stored. Otherwise its download is started and None returned right
+    # away, the caller shows the original URL until a later rerun finds the thumbnail.
+    def get(self, url):
+        path = self.path_for(url)
+        try:
+            os.utime(path)
+            return path
+        except OSError:
+            self.prefetch([url])
+            return None
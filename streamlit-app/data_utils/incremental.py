@@ -0,0 +1,111 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from data_utils.genre_index import build_genre_masks
+
+# Stored next to every dataset, the AppID and content hash of each raw CSV row (dropped ones included) over the
+# columns that are read
+ROW_HASH_INDEX = "row_hashes"
+
+# -- Row Hashes --
+# One uint64 per raw row over all of its fields, in pandas' vectorized hashing. Hashing a text column converts it to
+# Python strings first, which costs more than the hashing itself, so the text fields of a row are joined into one
+# string in Arrow and converted and hashed once. Most of them are close to unique per row, so they are hashed
+# directly instead of being factorized first.
+# Separators no field holds, a missing field gets its own marker
+FIELD_SEPARATOR, NULL_FIELD = "\x1f", "\x1e"
+HASH_BATCH_ROWS = 8_192
+
+def joined_text(raw, columns):
+    fields = [
+        pc.fill_null(pa.array(raw[column].array, type=pa.large_string(), from_pandas=True), NULL_FIELD)
+        for column in columns
+    ]
+    return pc.binary_join_element_wise(*fields, pa.scalar(FIELD_SEPARATOR, pa.large_string()))
+
+def raw_row_hashes(raw):
+    text = [column for column in raw.columns if raw[column].dtype == object
+            or isinstance(raw[column].dtype, pd.StringDtype)]
+    hashes = pd.util.hash_pandas_object(raw.drop(columns=text), index=False, categorize=False).to_numpy()
+    if text:
+        # In batches, so only a batch of the joined text is held as Python strings at a time
+        joined = joined_text(raw, text)
+        text_hashes = [
+            pd.util.hash_array(joined.slice(start, HASH_BATCH_ROWS).to_numpy(zero_copy_only=False), categorize=False)
+            for start in range(0, len(joined), HASH_BATCH_ROWS)
+        ]
+        hashes = hashes * np.uint64(0x100000001B3) ^ np.concatenate(text_hashes)
+    return {"app_ids": raw.index.to_numpy(dtype=np.int64), "hashes": hashes}
+
+# AppID and content folded into one key, a row is unchanged when its key was there before
+def row_keys(row_hashes):
+    app_ids = np.asarray(row_hashes["app_ids"]).astype(np.uint64)
+    return np.asarray(row_hashes["hashes"]) ^ (app_ids * np.uint64(0x9E3779B97F4A7C15))
+
+# Raw rows whose key is not among known_keys, the ones that have to be cleaned
+def changed_rows(row_hashes, known_keys):
+    return ~np.isin(row_keys(row_hashes), known_keys)
+
+# -- Refreshing a Cleaned Dataset --
+# Cleaning is row by row, so a row that did not change cleans to the same values as before. Only the raw rows
+# that are new or changed are cleaned (delta, see changed_rows); the cleaned rows of games that are gone or changed
+# are dropped. Kept rows stay in their order and the freshly cleaned ones are appended after them.
+class DatasetRefresh:
+    def __init__(self, df, remap, touched_years, cleaned_rows, removed_rows):
+        self.df = df
+        self.remap = remap
+        self.touched_years = touched_years
+        self.cleaned_rows = cleaned_rows
+        self.removed_rows = removed_rows
+        # Arrays of the stored indexes updated for df, by index name
+        self.indexes = {}
+
+    # remap is every old row's new position, -1 for dropped rows.
+    # touched_years are the Release Years that lost or gained rows.
+    @classmethod
+    def build(cls, base, base_hashes, delta, raw_hashes):
+        unchanged = ~changed_rows(raw_hashes, row_keys(base_hashes))
+        unchanged_ids = raw_hashes["app_ids"][unchanged]
+
+        delta, base = align_columns(delta, base)
+
+        keep = np.isin(base["AppID"].to_numpy(), unchanged_ids)
+        kept_rows = np.flatnonzero(keep)
+        remap = np.full(len(base), -1, dtype=np.int64)
+        remap[kept_rows] = np.arange(len(kept_rows))
+
+        # Old bit positions stay valid, genres first seen in the new rows get the next free bits
+        vocabulary = base.attrs["genre_vocabulary"]
+        delta["Genre Mask"], vocabulary = build_genre_masks(delta["Genre List"], vocabulary)
+
+        df = pd.concat([base.iloc[kept_rows], delta], ignore_index=True)
+        df.attrs.update(base.attrs)
+        df.attrs["genre_vocabulary"] = vocabulary
+
+        touched_years = np.union1d(
+            base["Release Year"].to_numpy()[~keep], delta["Release Year"].to_numpy()
+        ).astype(np.int64)
+
+        return cls(df, remap, touched_years, len(delta), int(np.count_nonzero(~keep)))
+
+# The cleaned new rows in the dtypes of the stored frame. Categoricals keep their categories and codes, values
+# they have not seen before are added as new categories. Returns the new rows and a view of the stored frame with
+# the same categories, so both halves concatenate as one categorical.
+def align_columns(delta, base):
+    delta = delta[base.columns.tolist()]
+    base = base.copy(deep=False)
+    for column in base.columns:
+        dtype = base[column].dtype
+        if isinstance(dtype, pd.CategoricalDtype):
+            if not dtype.ordered:
+                known = set(dtype.categories)
+                new_values = sorted(value for value in delta[column].dropna().unique() if value not in known)
+                dtype = pd.CategoricalDtype(list(dtype.categories) + new_values)
+                if new_values:
+                    base[column] = base[column].cat.set_categories(dtype.categories)
+            delta[column] = delta[column].astype(dtype)
+        elif delta[column].dtype != dtype:
+            delta[column] = delta[column].astype(dtype)
+    return delta, base
@@ -0,0 +1,232 @@
+import io
+import math
+import mmap
+import multiprocessing
+import os
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+# Rows of the first chunk, the one whose memory is traced to size the others
+PROBE_ROWS = 5_000
+MIN_CHUNK_ROWS = 1_000
+MAX_CHUNK_ROWS = 1_000_000
+
+# Below this a CSV is read in process, starting the worker processes would cost more than they save
+PARALLEL_MIN_BYTES = 64 * 1024 * 1024
+# Bytes of the probe range and the smallest range handed to a worker
+PROBE_BYTES = 4 * 1024 * 1024
+MIN_RANGE_BYTES = 4 * 1024 * 1024
+# Ranges per worker, several so a worker that finishes early picks up more instead of idling
+RANGES_PER_WORKER = 2
+SCAN_BLOCK_BYTES = 16 * 1024 * 1024
+
+QUOTE, NEWLINE = ord('"'), ord("\n")
+
+# Bytes held by a chunk's result, frames counted in full and dicts, tuples and lists summed over their values
+def held_bytes(value):
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True, index=True).sum())
+    if isinstance(value, (np.ndarray, pa.Table)):
+        return value.nbytes
+    if isinstance(value, dict):
+        return sum(held_bytes(item) for item in value.values())
+    if isinstance(value, (tuple, list)):
+        return sum(held_bytes(item) for item in value)
+    return 0
+
+# Peak memory of one call. tracemalloc sees numpy and Python allocations but not Arrow's memory pool, whose peak
+# is added: the pool's high-water mark when the call raised it, otherwise what the call left allocated. Tracing
+# slows allocation heavy code down several times, so only the probe chunk is traced. Under an outer trace (a
+# benchmark measuring the whole ingest) the running trace is reused instead of being stopped.
+def traced_call(func):
+    pool = pa.default_memory_pool()
+    arrow_start, arrow_max = pool.bytes_allocated(), pool.max_memory()
+    outer_trace = tracemalloc.is_tracing()
+    if outer_trace:
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+    else:
+        current = 0
+        tracemalloc.start()
+    try:
+        result = func()
+        _, peak = tracemalloc.get_traced_memory()
+        peak -= current
+    finally:
+        if not outer_trace:
+            tracemalloc.stop()
+    arrow_peak = pool.max_memory() if pool.max_memory() > arrow_max else pool.bytes_allocated()
+    return result, peak + max(arrow_peak - arrow_start, 0)
+
+# Cleaned chunks travel as Arrow tables, which concatenate without copying and cross process boundaries as
+# their raw buffers. Back in pandas the list columns stay Arrow backed, everything else gets its pandas dtype back.
+def table_to_frame(table):
+    return table.to_pandas(types_mapper=lambda arrow_type: pd.ArrowDtype(arrow_type) if pa.types.is_nested(arrow_type)
+                           else None)
+
+# -- Chunked CSV Reading --
+# Reads the CSV chunk by chunk and hands every chunk to process, keeping only what process returns. The first
+# chunk is traced for the working memory a row needs while it is parsed and processed; every later chunk is sized
+# so that the results held so far plus the chunk's working memory stay within budget_bytes. The caller concatenates
+# the results at the end, holding them twice for a moment, which the estimated peak includes. Returns the results
+# and the ingest stats, with the estimated peak and whether the budget could be kept.
+def read_in_chunks(path, process, budget_bytes, **read_options):
+    results = []
+    stats = {"rows": 0, "chunks": 0, "budget_bytes": int(budget_bytes), "peak_bytes": 0, "over_budget": False}
+    held, working_per_row, chunk_rows = 0, 0.0, PROBE_ROWS
+
+    # The header row is skipped, read_options name the columns
+    with pd.read_csv(path, iterator=True, header=0, **read_options) as reader:
+        while True:
+            try:
+                if stats["chunks"] == 0:
+                    (rows, result), working = traced_call(lambda: process_chunk(reader, chunk_rows, process))
+                    working_per_row = working / max(rows, 1)
+                else:
+                    rows, result = process_chunk(reader, chunk_rows, process)
+            except StopIteration:
+                break
+
+            stats["peak_bytes"] = max(stats["peak_bytes"], int(held + working_per_row * rows))
+            held += held_bytes(result)
+            results.append(result)
+            stats["rows"] += rows
+            stats["chunks"] += 1
+
+            # The next chunk gets whatever the budget has left
+            chunk_rows = int((budget_bytes - held) / max(working_per_row, 1))
+            if chunk_rows < MIN_CHUNK_ROWS:
+                stats["over_budget"] = True
+            chunk_rows = min(max(chunk_rows, MIN_CHUNK_ROWS), MAX_CHUNK_ROWS)
+
+    stats["held_bytes"] = int(held)
+    stats["peak_bytes"] = max(stats["peak_bytes"], int(2 * held))
+    stats["over_budget"] |= stats["peak_bytes"] > budget_bytes
+    return results, stats
+
+def process_chunk(reader, rows, process):
+    chunk = reader.get_chunk(rows)
+    return len(chunk), process(chunk)
+
+# -- Row-Aligned Byte Ranges --
+# Byte ranges of about range_bytes, each starting at the beginning of a row, from start (a row start) or from the
+# row after the header. Quoted text fields span lines, so a newline only ends a row where the quotes since the
+# last row start are even in number (an escaped quote is doubled and keeps the count even). The bytes are scanned
+# once, counting quotes block by block, and max_ranges stops the scan early.
+def row_ranges(path, range_bytes, start=None, max_ranges=None):
+    size = os.path.getsize(path)
+    if size == 0:
+        return []
+
+    ranges = []
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        buffer = np.frombuffer(mapped, dtype=np.uint8)
+        position = start if start is not None else next_row_start(buffer, 0, 0)
+        while position < size and (max_ranges is None or len(ranges) < max_ranges):
+            end = next_row_start(buffer, position, position + range_bytes)
+            ranges.append((position, end))
+            position = end
+        # The numpy view has to go before the mapping can be closed
+        del buffer
+
+    return ranges
+
+# The first row start at or after target, position being a row start
+def next_row_start(buffer, position, target):
+    target = min(target, len(buffer))
+    quotes = 0
+    for block_start in range(position, target, SCAN_BLOCK_BYTES):
+        block_end = min(block_start + SCAN_BLOCK_BYTES, target)
+        quotes += int(np.count_nonzero(buffer[block_start:block_end] == QUOTE))
+
+    position = target
+    while position < len(buffer):
+        block = buffer[position:position + SCAN_BLOCK_BYTES]
+        quotes_so_far = quotes + np.cumsum(block == QUOTE)
+        row_ends = np.flatnonzero((block == NEWLINE) & (quotes_so_far % 2 == 0))
+        if len(row_ends):
+            return position + int(row_ends[0]) + 1
+        quotes = int(quotes_so_far[-1])
+        position += len(block)
+    return len(buffer)
+
+# Parses the rows of one byte range and hands them to process, in a worker process
+def process_range(path, start, end, process, read_options):
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+    chunk = pd.read_csv(io.BytesIO(data), header=None, **read_options)
+    del data
+    return len(chunk), process(chunk)
+
+# The process of the running read_in_parallel in a worker process. The pool initializer sets it once per worker,
+# so a partial's arguments (the row keys of the last store) are not pickled again with every range.
+worker_process = None
+
+def init_worker(process):
+    global worker_process
+    worker_process = process
+
+def process_worker_range(path, start, end, read_options):
+    return process_range(path, start, end, worker_process, read_options)
+
+# -- Parallel CSV Reading --
+# Splits the rows into byte ranges that worker processes parse and process on their own cores, see
+# read_in_chunks for process and the stats. process has to be picklable (a module level function or a partial of
+# one) from a module that is cheap to import, every worker imports it, and should return Arrow tables rather than
+# frames. A probe range is processed in this process first and traced for the working memory per CSV byte; the
+# other ranges are sized so that every worker's range plus the results held stay within budget_bytes. Results
+# come back in file order.
+def read_in_parallel(path, process, budget_bytes, workers, **read_options):
+    size = os.path.getsize(path)
+    workers = max(1, min(workers, math.ceil(size / MIN_RANGE_BYTES)))
+    stats = {"rows": 0, "chunks": 0, "budget_bytes": int(budget_bytes), "peak_bytes": 0, "over_budget": False,
+             "workers": workers}
+
+    probe_range = row_ranges(path, PROBE_BYTES, max_ranges=1)[0]
+    (rows, result), working = traced_call(lambda: process_range(path, *probe_range, process, read_options))
+    probe_bytes = probe_range[1] - probe_range[0]
+    working_per_byte = working / probe_bytes
+    held = held_bytes(result) / probe_bytes * (size - probe_range[0])
+    results = [result]
+    stats["rows"] += rows
+    stats["chunks"] += 1
+
+    remaining = size - probe_range[1]
+    if remaining > 0:
+        # What the results of the whole file will hold, twice while they are concatenated, leaves the rest for
+        # the ranges the workers have in flight
+        range_bytes = int((budget_bytes - 2 * held) / (workers * max(working_per_byte, 1)))
+        if range_bytes < MIN_RANGE_BYTES:
+            stats["over_budget"] = True
+        range_bytes = min(max(range_bytes, MIN_RANGE_BYTES), math.ceil(remaining / (workers * RANGES_PER_WORKER)))
+        ranges = row_ranges(path, range_bytes, start=probe_range[1])
+
+        # Spawned rather than forked, the server's other threads may hold locks a fork would copy
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=init_worker,
+                                 initargs=(process,)) as pool:
+            futures = [pool.submit(process_worker_range, path, start, end, read_options) for start, end in ranges]
+            try:
+                for future in futures:
+                    rows, result = future.result()
+                    results.append(result)
+                    stats["rows"] += rows
+                    stats["chunks"] += 1
+            except BaseException:
+                # The ranges still queued would only be thrown away
+                pool.shutdown(cancel_futures=True)
+                raise
+
+        stats["range_bytes"] = range_bytes
+        stats["peak_bytes"] = int(max(held + workers * working_per_byte * range_bytes, 2 * held))
+    else:
+        stats["peak_bytes"] = int(max(working, 2 * held))
+
+    stats["held_bytes"] = int(sum(held_bytes(result) for result in results))
+    stats["over_budget"] |= stats["peak_bytes"] > budget_bytes
+    return results, stats
@@ -0,0 +1,124 @@
+import numpy as np
+
+from data_utils.filters import column_values
+from data_utils.genre_index import MAX_GENRES
+
+# Games kept per (Release Year, group) board
+LEADERBOARD_SIZE = 50
+
+# Board groups: every game, indie games, then one group per genre bit
+ALL_GROUP = 0
+INDIE_GROUP = 1
+GENRE_GROUP_OFFSET = 2
+GROUP_STRIDE = 128
+
+def board_key(year, group):
+    return int(year) * GROUP_STRIDE + group
+
+# -- Per-Year Peak CCU Leaderboards --
+# The top LEADERBOARD_SIZE row positions by Peak CCU for every Release Year, overall, for indie games and for
+# each genre. Boards are stored CSR style: board keys[i] holds positions[offsets[i]:offsets[i + 1]], best first
+# with ties in row order, and group_sizes[i] is the number of games in the group before truncation.
+class Leaderboards:
+    def __init__(self, keys, offsets, positions, group_sizes):
+        self.keys = keys
+        self.offsets = offsets
+        self.positions = positions
+        self.group_sizes = group_sizes
+
+    # rows limits the boards to those row positions, all rows by default
+    @classmethod
+    def build(cls, df, size=LEADERBOARD_SIZE, rows=None):
+        peak_ccu = column_values(df, "Peak CCU").astype(np.float64)
+        years = column_values(df, "Release Year").astype(np.float64)
+        valid = np.flatnonzero(~np.isnan(peak_ccu) & ~np.isnan(years))
+        if rows is not None:
+            valid = np.intersect1d(valid, rows)
+
+        masks = df["Genre Mask"].to_numpy()[valid]
+        indie = column_values(df, "Is_Indie")[valid] == "Indie"
+
+        # One entry per (game, group) membership
+        member_rows = [np.arange(len(valid)), np.flatnonzero(indie)]
+        member_groups = [np.full(len(valid), ALL_GROUP), np.full(len(member_rows[1]), INDIE_GROUP)]
+        for bit in range(len(df.attrs["genre_vocabulary"])):
+            rows = np.flatnonzero((masks >> np.uint64(bit)) & np.uint64(1))
+            member_rows.append(rows)
+            member_groups.append(np.full(len(rows), GENRE_GROUP_OFFSET + bit))
+
+        positions = valid[np.concatenate(member_rows)]
+        keys = years[positions].astype(np.int64) * GROUP_STRIDE + np.concatenate(member_groups)
+
+        order = np.lexsort((positions, -peak_ccu[positions], keys))
+        keys, positions = keys[order], positions[order]
+
+        unique_keys, starts, group_sizes = np.unique(keys, return_index=True, return_counts=True)
+        ranks = np.arange(len(keys)) - np.repeat(starts, group_sizes)
+        positions = positions[ranks < size]
+
+        offsets = np.concatenate([[0], np.cumsum(np.minimum(group_sizes, size))]).astype(np.int64)
+
+        return cls(unique_keys, offsets, positions.astype(np.int32), group_sizes.astype(np.int64))
+
+    def to_arrays(self):
+        return {"keys": self.keys, "offsets": self.offsets, "positions": self.positions, "group_sizes": self.group_sizes}
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        return cls(**arrays)
+
+    # The boards of a refreshed frame, see SortOrders.update for remap. Only the boards of the years that lost
+    # or gained rows are built again, the others just move their rows to the new positions.
+    def update(self, df, remap, touched_years, size=LEADERBOARD_SIZE):
+        touched_years = np.asarray(touched_years, dtype=np.int64)
+        lengths = np.diff(self.offsets)
+        kept_boards = ~np.isin(self.keys // GROUP_STRIDE, touched_years)
+        kept_entries = np.repeat(kept_boards, lengths)
+
+        years = column_values(df, "Release Year").astype(np.float64)
+        rebuilt = Leaderboards.build(df, size, rows=np.flatnonzero(np.isin(years, touched_years)))
+
+        keys = np.concatenate([self.keys[kept_boards], rebuilt.keys])
+        lengths = np.concatenate([lengths[kept_boards], np.diff(rebuilt.offsets)])
+        positions = np.concatenate([remap[self.positions[kept_entries]], rebuilt.positions])
+        group_sizes = np.concatenate([self.group_sizes[kept_boards], rebuilt.group_sizes])
+
+        # Boards back in key order, each board's rows move as one block
+        order = np.argsort(keys, kind="stable")
+        entry_order = np.argsort(np.repeat(np.argsort(order), lengths), kind="stable")
+        offsets = np.concatenate([[0], np.cumsum(lengths[order])]).astype(np.int64)
+
+        return Leaderboards(keys[order], offsets, positions[entry_order].astype(np.int32), group_sizes[order])
+
+    # Positions of one board and the size of its group, an unknown board is an empty group
+    def board(self, year, group):
+        key = board_key(year, group)
+        i = np.searchsorted(self.keys, key)
+        if i == len(self.keys) or self.keys[i] != key:
+            return self.positions[:0], 0
+        return self.positions[self.offsets[i]:self.offsets[i + 1]], int(self.group_sizes[i])
+
+    # The k best games of a year having every genre of genre_query (and indie if asked), or None when the
+    # boards cannot answer it exactly and the caller has to scan
+    def top(self, df, year, genre_query, k, indie_only=False):
+        # A genre outside the vocabulary, no game has it
+        if genre_query is None:
+            return np.array([], dtype=np.int64)
+        genre_query = int(genre_query)
+        groups = [GENRE_GROUP_OFFSET + bit for bit in range(MAX_GENRES) if (genre_query >> bit) & 1]
+        if indie_only:
+            groups.append(INDIE_GROUP)
+
+        # The most selective group's board is the most likely to hold the whole answer
+        positions, group_size = min((self.board(year, group) for group in groups or [ALL_GROUP]), key=lambda b: b[1])
+
+        query = np.uint64(genre_query)
+        keep = (df["Genre Mask"].to_numpy()[positions] & query) == query
+        if indie_only:
+            keep &= column_values(df, "Is_Indie")[positions] == "Indie"
+        candidates = positions[keep]
+
+        # Exact when the board holds its whole group, or when k matches rank above everything cut off
+        if group_size <= len(positions) or len(candidates) >= k:
+            return candidates[:k].astype(np.int64)
+        return None
@@ -0,0 +1,84 @@
+import numpy as np
+
+from data_utils.filters import column_values, compile_filter
+
+# -- Range Top-K Index --
+# Answers "top k rows by a metric within a Release Year range, among rows passing some other filters" without
+# sorting the dataset. Every row with a metric gets a global rank (metric descending, then the tiebreak column
+# descending, then row order, the order top_positions produces). Rows are grouped per year in rank order, stored
+# CSR style: year years[i] holds positions[offsets[i]:offsets[i + 1]] with their ranks and metric values.
+class RangeTopK:
+    def __init__(self, years, offsets, positions, ranks, values):
+        self.years = years
+        self.offsets = offsets
+        self.positions = positions
+        self.ranks = ranks
+        self.values = values
+
+    @classmethod
+    def build(cls, df, metric, tiebreak=None):
+        values = column_values(df, metric).astype(np.float64)
+        release_years = column_values(df, "Release Year").astype(np.float64)
+        valid = np.flatnonzero(~np.isnan(values) & ~np.isnan(release_years))
+
+        keys = [valid]
+        if tiebreak is not None:
+            keys.append(-column_values(df, tiebreak).astype(np.float64)[valid])
+        keys.append(-values[valid])
+        order = valid[np.lexsort(keys)]
+
+        # Grouping by year keeps the rank order inside every year
+        by_year = np.argsort(release_years[order], kind="stable")
+        positions, ranks = order[by_year], by_year
+
+        years, starts = np.unique(release_years[positions].astype(np.int64), return_index=True)
+        offsets = np.append(starts, len(positions)).astype(np.int64)
+
+        return cls(years, offsets, positions.astype(np.int32), ranks.astype(np.int32), values[positions])
+
+    def to_arrays(self):
+        return {
+            "years": self.years, "offsets": self.offsets, "positions": self.positions,
+            "ranks": self.ranks, "values": self.values
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        return cls(**arrays)
+
+    # Positions of the k best rows released in start_year..end_year that pass the predicates, and optionally
+    # have a metric of at most max_value. Each year is read from its best row down, k rows deep at first and
+    # twice as deep on every further round, and the rows of all years are merged by rank. The answer is final
+    # once the k-th result outranks every row left unread, which is the last row read in each cut off year.
+    def top(self, df, start_year, end_year, predicates, k, max_value=None):
+        lo = np.searchsorted(self.years, start_year)
+        hi = np.searchsorted(self.years, end_year, side="right")
+        if lo >= hi:
+            return np.array([], dtype=np.int64)
+
+        starts, ends = self.offsets[lo:hi].copy(), self.offsets[lo + 1:hi + 1]
+        if max_value is not None:
+            # Values run from high to low inside a year, so the capped rows form a prefix that is skipped
+            for i in range(len(starts)):
+                starts[i] += np.searchsorted(-self.values[starts[i]:ends[i]], -max_value)
+
+        residual = compile_filter(predicates)
+        matches, read_to, depth = [], starts, k
+        while True:
+            # Only the rows not read in an earlier round are checked against the predicates
+            stops = np.minimum(starts + depth, ends)
+            entries = np.concatenate([np.arange(start, stop) for start, stop in zip(read_to, stops)])
+            matches.append(entries[residual.evaluate_positions(df, self.positions[entries])])
+            read_to = stops
+
+            entries = np.concatenate(matches)
+            entries = entries[np.argsort(self.ranks[entries])]
+
+            cut_off = stops < ends
+            if not cut_off.any():
+                break
+            if len(entries) >= k and self.ranks[entries[k - 1]] <= self.ranks[stops[cut_off] - 1].min():
+                break
+            depth *= 2
+
+        return self.positions[entries[:k]].astype(np.int64)
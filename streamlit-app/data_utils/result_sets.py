@@ -0,0 +1,30 @@
+import hashlib
+import json
+
+from data_utils.sort_index import page_positions
+
+# Stable key for a set of submitted filter values
+def result_key(*values):
+    payload = json.dumps(values, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+# -- Lazy Result Set --
+# The matching rows of a query as integer positions into the shared dataset, in display order.
+# The first page is found by walking the sort order through the mask; the full position array is only
+# built once a later page is requested, after which every page is a slice and the mask is released.
+# Results that are already in order (e.g. ranked search matches) are passed as positions directly.
+class ResultSet:
+    def __init__(self, mask=None, order=None, positions=None):
+        self.mask = mask
+        self.order = order
+        self.positions = positions
+        self.total = len(positions) if positions is not None else int(mask.sum())
+
+    def page(self, start, stop):
+        if self.positions is None and start == 0:
+            return page_positions(self.order, self.mask, start, stop)
+
+        if self.positions is None:
+            self.positions = self.order[self.mask[self.order]]
+            self.mask = None
+        return self.positions[start:stop]
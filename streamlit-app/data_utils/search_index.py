@@ -0,0 +1,185 @@
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# Code points fit in 21 bits, so a trigram packs into one int64
+CODE_POINT_BITS = 21
+
+def trigram_keys(codes):
+    codes = codes.astype(np.int64)
+    return (codes[:-2] << (2 * CODE_POINT_BITS)) | (codes[1:-1] << CODE_POINT_BITS) | codes[2:]
+
+def encode_code_points(text):
+    return np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+
+# Intersection of two sorted unique position arrays, cheap when the first one is short
+def intersect_sorted(small, large):
+    if len(small) == 0 or len(large) == 0:
+        return small[:0]
+    idx = np.searchsorted(large, small)
+    idx[idx == len(large)] = 0
+    return small[large[idx] == small]
+
+def lowered_names(names):
+    names = pa.array(names.fillna(""), type=pa.large_string(), from_pandas=True)
+    # Frames concatenated by a refresh hand out one Arrow chunk per piece
+    if isinstance(names, pa.ChunkedArray):
+        names = names.combine_chunks()
+    return pc.utf8_lower(names)
+
+# Whether each byte value is an ASCII letter or digit, for the character in front of a match in an ASCII name
+ASCII_ALNUM = np.array([chr(byte).isalnum() and byte < 128 for byte in range(256)])
+
+# -- Trigram Inverted Index over lowercased game names --
+# Postings are stored CSR style: the rows of trigram keys[i] are postings[offsets[i]:offsets[i + 1]],
+# sorted by row position. Positions are iloc positions of the frame the index was built from. The lowercased
+# names are one Arrow string array, candidates are checked and ranked with Arrow kernels and numpy.
+class NameSearchIndex:
+    def __init__(self, names, keys, offsets, postings):
+        self.names = names
+        self.keys = keys
+        self.offsets = offsets
+        self.postings = postings
+        self.ascii = pc.string_is_ascii(names).to_numpy(zero_copy_only=False)
+        self.lengths = pc.utf8_length(names).to_numpy().astype(np.int64)
+
+    @classmethod
+    def build(cls, names):
+        names = lowered_names(names)
+        lowered = names.to_pylist()
+        lengths = np.fromiter(map(len, lowered), dtype=np.int64, count=len(lowered))
+
+        # All names in one code point array, NUL separated, with the owning row of every code point
+        codes = encode_code_points("\0".join(lowered))
+        rows = np.repeat(np.arange(len(lowered), dtype=np.int32), lengths + 1)[:len(codes)]
+
+        if len(codes) < 3:
+            empty = np.array([], dtype=np.int64)
+            return cls(names, empty, np.zeros(1, dtype=np.int64), empty.astype(np.int32))
+
+        # A window is a trigram when it does not run into the separator
+        keys = trigram_keys(codes)
+        valid = (rows[:-2] == rows[2:]) & (codes[2:] != 0)
+        keys, key_rows = keys[valid], rows[:-2][valid]
+
+        order = np.lexsort((key_rows, keys))
+        keys, key_rows = keys[order], key_rows[order]
+        first = np.ones(len(keys), dtype=bool)
+        first[1:] = (keys[1:] != keys[:-1]) | (key_rows[1:] != key_rows[:-1])
+        keys, key_rows = keys[first], key_rows[first]
+
+        unique_keys, starts = np.unique(keys, return_index=True)
+        offsets = np.append(starts, len(keys)).astype(np.int64)
+
+        return cls(names, unique_keys, offsets, key_rows)
+
+    # The postings as plain arrays, names are taken from the frame again when loading
+    def to_arrays(self):
+        return {"keys": self.keys, "offsets": self.offsets, "postings": self.postings}
+
+    @classmethod
+    def from_arrays(cls, arrays, names):
+        return cls(lowered_names(names), arrays["keys"], arrays["offsets"], arrays["postings"])
+
+    # The index of a refreshed frame, see SortOrders.update for remap. Kept postings are moved to their new rows
+    # and the postings of the new rows, which come after all kept ones, are merged in per trigram.
+    def update(self, names, remap):
+        kept_rows = np.flatnonzero(remap >= 0)
+        added = NameSearchIndex.build(names.iloc[len(kept_rows):])
+
+        keys = np.repeat(self.keys, np.diff(self.offsets))
+        rows = remap[self.postings]
+        keep = rows >= 0
+        keys = np.concatenate([keys[keep], np.repeat(added.keys, np.diff(added.offsets))])
+        rows = np.concatenate([rows[keep], added.postings.astype(np.int64) + len(kept_rows)])
+
+        # A stable sort of two sorted runs, rows stay ascending within every trigram
+        order = np.argsort(keys, kind="stable")
+        keys, rows = keys[order], rows[order]
+
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]]) if len(keys) else np.array([], dtype=np.int64)
+        offsets = np.append(starts, len(keys)).astype(np.int64)
+
+        names = pa.concat_arrays([self.names.take(pa.array(kept_rows)), added.names])
+        return NameSearchIndex(names, keys[starts], offsets, rows.astype(np.int32))
+
+    def postings_for(self, key):
+        i = np.searchsorted(self.keys, key)
+        if i == len(self.keys) or self.keys[i] != key:
+            return None
+        return self.postings[self.offsets[i]:self.offsets[i + 1]]
+
+    def candidates(self, query):
+        lists = []
+        for key in np.unique(trigram_keys(encode_code_points(query))):
+            postings = self.postings_for(key)
+            if postings is None:
+                return np.array([], dtype=np.int32)
+            lists.append(postings)
+
+        lists.sort(key=len)
+        result = lists[0]
+        for postings in lists[1:]:
+            result = intersect_sorted(result, postings)
+            if len(result) == 0:
+                break
+        return result
+
+    # Case-insensitive substring search. Returns positions ranked exact match, prefix, word start, then
+    # anywhere, with earlier and shorter matches first. Returns None for an empty query.
+    def search(self, query):
+        query = query.lower()
+        if not query:
+            return None
+
+        if len(query) < 3:
+            # Too short for trigrams, every name is scanned
+            positions, names, ascii, lengths = None, self.names, self.ascii, self.lengths
+        else:
+            positions = self.candidates(query).astype(np.int64)
+            names, ascii, lengths = self.names.take(pa.array(positions)), self.ascii[positions], self.lengths[positions]
+
+        # Postings only guarantee the trigrams occur, one pass checks the candidates against the full query
+        found = pc.find_substring(names, query).to_numpy()
+        matched = np.flatnonzero(found >= 0)
+        order = rank_matches(names, ascii[matched], lengths[matched], matched, found[matched], len(query))
+        return (matched if positions is None else positions[matched])[order].astype(np.int64)
+
+def string_buffers(names):
+    offsets = np.frombuffer(names.buffers()[1], dtype=np.int64)[names.offset:names.offset + len(names) + 1]
+    data = names.buffers()[2]
+    return offsets, np.frombuffer(data, dtype=np.uint8) if data is not None else np.zeros(0, dtype=np.uint8)
+
+# Order of the matches: exact match, prefix, word start, then anywhere, earlier and shorter matches first. matched indexes names, ascii and lengths describe the matched names and found holds the
+# byte offset of the query in each of them.
+def rank_matches(names, ascii, lengths, matched, found, query_length):
+    if len(matched) == 0:
+        return matched
+
+    offsets, data = string_buffers(names)
+    starts = offsets[matched]
+    places = found.astype(np.int64)
+
+    # Byte offsets are character offsets in ASCII names. In the others the bytes that start a character are
+    # counted up to the match.
+    other = np.flatnonzero(~ascii)
+    if len(other):
+        other_offsets, other_data = string_buffers(names.take(pa.array(matched[other])))
+        lead_bytes = np.concatenate([[0], np.cumsum((other_data & 0xC0) != 0x80)])
+        places[other] = lead_bytes[other_offsets[:-1] + found[other]] - lead_bytes[other_offsets[:-1]]
+
+    before = data[np.maximum(starts + found - 1, 0)]
+    word_start = ~ASCII_ALNUM[before]
+    # A multi-byte character in front of the match, rare enough to look at in Python
+    for i in np.flatnonzero((found > 0) & (before >= 128)):
+        name = names[int(matched[i])].as_py()
+        word_start[i] = not name[places[i] - 1].isalnum()
+
+    tiers = np.where(found == 0, np.where(lengths == query_length, 0, 1), np.where(word_start, 2, 3))
+    # Tier, place, length and the match itself packed into one key, unique so a plain sort does. Names long enough
+    # for the key not to fit in 63 bits take a slower sort on the separate keys.
+    length_bits, index_bits = int(lengths.max()).bit_length(), len(matched).bit_length()
+    if 2 + 2 * length_bits + index_bits > 63:
+        return np.lexsort((lengths, places, tiers))
+    keys = (tiers << (2 * length_bits) | places << length_bits | lengths) << index_bits | np.arange(len(matched))
+    return np.sort(keys) & ((1 << index_bits) - 1)
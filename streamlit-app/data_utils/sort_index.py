@@ -0,0 +1,87 @@
+import numpy as np
+
+# Columns the explorer can sort by
+SORTABLE_COLUMNS = ["Reviews", "Reviews Percentage", "Price", "Peak CCU"]
+
+# Rows checked by the first step of a permutation walk, each later step doubles it
+WALK_CHUNK_SIZE = 4096
+
+# Stable argsort with missing values last in both directions, like sort_values(na_position="last")
+def sort_permutation(values, ascending):
+    values = np.asarray(values, dtype=np.float64)
+    keys = values if ascending else -values
+    return np.argsort(keys, kind="stable").astype(np.int32)
+
+# -- Precomputed Sort Orders --
+# One permutation of iloc positions per (column, direction)
+class SortOrders:
+    def __init__(self, permutations):
+        self.permutations = permutations
+
+    @classmethod
+    def build(cls, df, columns=SORTABLE_COLUMNS):
+        permutations = {}
+        for column in columns:
+            values = df[column].to_numpy(dtype=np.float64, na_value=np.nan)
+            for ascending in (True, False):
+                permutations[(column, ascending)] = sort_permutation(values, ascending)
+        return cls(permutations)
+
+    def to_arrays(self):
+        return {
+            f"{column}-{'asc' if ascending else 'desc'}": permutation
+            for (column, ascending), permutation in self.permutations.items()
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        permutations = {}
+        for name, permutation in arrays.items():
+            column, direction = name.rsplit("-", 1)
+            permutations[(column, direction == "asc")] = permutation
+        return cls(permutations)
+
+    # The orders of a refreshed frame. remap gives every old row's new position (-1 for dropped rows), the rows
+    # after the last kept one are new. Kept rows stay in order and the sorted new rows are merged in after their
+    # equals, the same order a stable argsort of the refreshed frame gives.
+    def update(self, df, remap):
+        added = np.arange(np.count_nonzero(remap >= 0), len(df))
+
+        permutations = {}
+        for (column, ascending), permutation in self.permutations.items():
+            values = df[column].to_numpy(dtype=np.float64, na_value=np.nan)
+            keys = values if ascending else -values
+
+            kept = remap[permutation]
+            kept = kept[kept >= 0]
+            new = added[sort_permutation(values[added], ascending)]
+
+            insert_at = np.searchsorted(keys[kept], keys[new], side="right")
+            permutations[(column, ascending)] = np.insert(kept, insert_at, new).astype(np.int32)
+        return SortOrders(permutations)
+
+    def permutation(self, column, ascending):
+        return self.permutations[(column, ascending)]
+
+# Positions start:stop of the rows selected by mask, in permutation order.
+# Walks the permutation chunk by chunk and stops once the page is full, so early pages never touch most rows.
+def page_positions(permutation, mask, start, stop):
+    found = []
+    found_count = 0
+
+    chunk_start, chunk_size = 0, WALK_CHUNK_SIZE
+    while chunk_start < len(permutation):
+        chunk = permutation[chunk_start:chunk_start + chunk_size]
+        chunk_start += chunk_size
+        chunk_size *= 2
+
+        hits = chunk[mask[chunk]]
+        found.append(hits)
+        found_count += len(hits)
+        if found_count >= stop:
+            break
+
+    if not found:
+        return np.array([], dtype=np.int64)
+
+    return np.concatenate(found)[start:stop].astype(np.int64)
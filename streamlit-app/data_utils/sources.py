@@ -0,0 +1,231 @@
+import json
+import os
+import shutil
+import tempfile
+import urllib.request
+import zipfile
+
+from data_utils.dataset_cache import file_checksum
+
+CSV_NAME = "games.csv"
+MANIFEST_NAME = ".dataset_manifest.json"
+HTTP_TIMEOUT_SECONDS = 30
+
+class DatasetSourceError(Exception):
+    pass
+
+# Copies games.csv out of a file that is either the CSV itself or a zip archive holding it
+def install_csv(source_path, data_dir):
+    os.makedirs(data_dir, exist_ok=True)
+    tmp_fd, tmp_path = tempfile.mkstemp(dir=data_dir, suffix=".csv.tmp")
+
+    try:
+        with os.fdopen(tmp_fd, "wb") as out:
+            if zipfile.is_zipfile(source_path):
+                with zipfile.ZipFile(source_path) as archive:
+                    member = next(
+                        (name for name in archive.namelist() if os.path.basename(name) == CSV_NAME),
+                        None
+                    )
+                    if member is None:
+                        raise DatasetSourceError(f"{source_path} does not contain {CSV_NAME}")
+                    # Only the CSV is extracted, the archive also ships a large games.json
+                    with archive.open(member) as src:
+                        shutil.copyfileobj(src, out)
+            else:
+                with open(source_path, "rb") as src:
+                    shutil.copyfileobj(src, out)
+
+        os.replace(tmp_path, os.path.join(data_dir, CSV_NAME))
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+# -- Kaggle --
+class KaggleSource:
+    kind = "kaggle"
+
+    def __init__(self, dataset="fronkongames/steam-games-dataset"):
+        self.dataset = dataset
+        self._api = None
+
+    @property
+    def key(self):
+        return f"kaggle:{self.dataset}"
+
+    def api(self):
+        if self._api is None:
+            # Importing the client authenticates, so it waits until a download is actually considered. Missing
+            # credentials end in sys.exit() inside the client, caught so the local copy can still be used.
+            try:
+                from kaggle.api.kaggle_api_extended import KaggleApi
+
+                api = KaggleApi()
+                api.authenticate()
+            except (Exception, SystemExit) as e:
+                raise DatasetSourceError(f"Could not authenticate with Kaggle: {e}") from e
+            self._api = api
+        return self._api
+
+    def remote_version(self):
+        owner, slug = self.dataset.split("/")
+        try:
+            datasets = self.api().dataset_list(search=slug, user=owner) or []
+        except Exception as e:
+            raise DatasetSourceError(f"Could not reach Kaggle: {e}") from e
+
+        for dataset in datasets:
+            if dataset is not None and getattr(dataset, "ref", None) == self.dataset:
+                # Newer clients expose snake_case attributes, older ones camelCase
+                for attr in ("current_version_number", "currentVersionNumber", "last_updated", "lastUpdated"):
+                    value = getattr(dataset, attr, None)
+                    if value:
+                        return str(value)
+        return None
+
+    def download(self, data_dir):
+        with tempfile.TemporaryDirectory(dir=data_dir) as tmp_dir:
+            try:
+                self.api().dataset_download_files(self.dataset, path=tmp_dir, unzip=False, quiet=True)
+            except Exception as e:
+                raise DatasetSourceError(f"Kaggle download failed: {e}") from e
+
+            archive_path = os.path.join(tmp_dir, self.dataset.split("/")[1] + ".zip")
+            install_csv(archive_path, data_dir)
+
+# -- Local Directory / Mirror --
+class LocalMirrorSource:
+    kind = "local"
+
+    def __init__(self, path):
+        self.path = path
+
+    @property
+    def key(self):
+        return f"local:{os.path.abspath(self.path)}"
+
+    def mirror_file(self):
+        if os.path.isdir(self.path):
+            for name in (CSV_NAME, "steam-games-dataset.zip"):
+                candidate = os.path.join(self.path, name)
+                if os.path.exists(candidate):
+                    return candidate
+            raise DatasetSourceError(f"No {CSV_NAME} or dataset archive in mirror {self.path}")
+        if os.path.exists(self.path):
+            return self.path
+        raise DatasetSourceError(f"Mirror path {self.path} does not exist")
+
+    def remote_version(self):
+        return file_checksum(self.mirror_file())
+
+    def download(self, data_dir):
+        install_csv(self.mirror_file(), data_dir)
+
+# -- HTTP (local stand-in or internal mirror) --
+class HttpSource:
+    kind = "http"
+
+    def __init__(self, url):
+        self.url = url
+
+    @property
+    def key(self):
+        return f"http:{self.url}"
+
+    def remote_version(self):
+        request = urllib.request.Request(self.url, method="HEAD")
+        try:
+            with urllib.request.urlopen(request, timeout=HTTP_TIMEOUT_SECONDS) as response:
+                headers = response.headers
+        except OSError as e:
+            raise DatasetSourceError(f"Could not reach {self.url}: {e}") from e
+
+        etag = headers.get("ETag")
+        if etag:
+            return etag
+        last_modified = headers.get("Last-Modified")
+        if last_modified:
+            return f"{last_modified}|{headers.get('Content-Length', '')}"
+        return None
+
+    def download(self, data_dir):
+        with tempfile.TemporaryDirectory(dir=data_dir) as tmp_dir:
+            download_path = os.path.join(tmp_dir, "download")
+            try:
+                with urllib.request.urlopen(self.url, timeout=HTTP_TIMEOUT_SECONDS) as response, \
+                        open(download_path, "wb") as out:
+                    shutil.copyfileobj(response, out)
+            except OSError as e:
+                raise DatasetSourceError(f"Download from {self.url} failed: {e}") from e
+
+            install_csv(download_path, data_dir)
+
+# "kaggle", "kaggle:owner/slug", "local:/path/to/mirror" or an http(s) URL
+def source_from_spec(spec):
+    spec = (spec or "kaggle").strip()
+
+    if spec.startswith(("http://", "https://")):
+        return HttpSource(spec)
+    if spec.startswith("local:"):
+        return LocalMirrorSource(spec[len("local:"):])
+    if spec == "kaggle":
+        return KaggleSource()
+    if spec.startswith("kaggle:"):
+        return KaggleSource(spec[len("kaggle:"):])
+
+    raise ValueError(f"Unknown dataset source: {spec}")
+
+# -- Manifest of the installed snapshot --
+def read_manifest(data_dir):
+    try:
+        with open(os.path.join(data_dir, MANIFEST_NAME)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def write_manifest(data_dir, manifest):
+    path = os.path.join(data_dir, MANIFEST_NAME)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, path)
+
+# -- Sync --
+# Returns (csv_path, status). The download is skipped when the remote version and the local checksum both
+# match the manifest, and an existing local copy is used whenever the source cannot be reached.
+def sync_dataset(source, data_dir):
+    os.makedirs(data_dir, exist_ok=True)
+    csv_path = os.path.join(data_dir, CSV_NAME)
+    has_local_copy = os.path.exists(csv_path)
+    manifest = read_manifest(data_dir)
+
+    try:
+        version = source.remote_version()
+    except DatasetSourceError:
+        if has_local_copy:
+            return csv_path, "offline"
+        raise
+
+    if (
+        has_local_copy and version is not None and
+        manifest.get("source") == source.key and
+        manifest.get("version") == version and
+        manifest.get("sha256") == file_checksum(csv_path)
+    ):
+        return csv_path, "unchanged"
+
+    try:
+        source.download(data_dir)
+    except (DatasetSourceError, OSError, zipfile.BadZipFile):
+        if has_local_copy:
+            return csv_path, "offline"
+        raise
+
+    write_manifest(data_dir, {
+        "source": source.key,
+        "version": version,
+        "sha256": file_checksum(csv_path)
+    })
+
+    return csv_path, "downloaded"
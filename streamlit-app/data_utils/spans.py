@@ -0,0 +1,77 @@
+import contextlib
+import contextvars
+import functools
+import json
+import logging
+import sys
+import time
+
+# -- Timing Spans --
+# A span times one block of work. Spans nest, a span's name is the path of the spans it runs inside, e.g.
+# "rerun/page/showcase.top_games_ccu/chart.build". Every finished span is logged, and while record_spans() is active it
+# is also added to that rerun's records. The state lives in context variables, so concurrent sessions (every
+# rerun runs on its own thread) never see each other's spans.
+span_records = contextvars.ContextVar("span_records", default=None)
+span_path = contextvars.ContextVar("span_path", default=())
+
+logger = logging.getLogger("steam_explorer.spans")
+
+@contextlib.contextmanager
+def span(name, **fields):
+    path = span_path.get() + (name,)
+    token = span_path.set(path)
+
+    # Added when the span starts, so records read in start order with parents before their children
+    record = {"span": "/".join(path), "depth": len(path) - 1, "seconds": None, **fields}
+    records = span_records.get()
+    if records is not None:
+        records.append(record)
+
+    # The block gets the record, for fields only known once the work is done
+    start = time.perf_counter()
+    try:
+        yield record
+    finally:
+        record["seconds"] = round(time.perf_counter() - start, 6)
+        span_path.reset(token)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(record["span"], extra={"span_record": record})
+
+# The decorated function runs inside a span
+def timed(name):
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+# Collects the spans run inside the block, in the order they started
+@contextlib.contextmanager
+def record_spans():
+    records = []
+    token = span_records.set(records)
+    try:
+        yield records
+    finally:
+        span_records.reset(token)
+
+# -- Structured Logs --
+# One JSON object per line with the span fields, for log shippers to pick up
+class JsonSpanFormatter(logging.Formatter):
+    def format(self, record):
+        payload = {"time": round(record.created, 3), "level": record.levelname, "logger": record.name}
+        payload.update(getattr(record, "span_record", {"message": record.getMessage()}))
+        return json.dumps(payload, default=str)
+
+def configure_span_logging(stream=sys.stderr, level=logging.INFO):
+    # The app script runs again on every rerun, the handler is only added once
+    if any(isinstance(handler.formatter, JsonSpanFormatter) for handler in logger.handlers):
+        return
+
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(JsonSpanFormatter())
+    logger.addHandler(handler)
+    logger.setLevel(level)
+    logger.propagate = False
@@ -0,0 +1,98 @@
+import json
+import logging
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from data_utils.spans import span
+
+logger = logging.getLogger("steam_explorer.warmup")
+
+# -- Background Warm-Up --
+# Runs the stages one after the other on a daemon thread, so nothing waits for them unless it needs their result.
+# A stage is (name, label, func): func gets the results of the stages before it by name and its own result is kept
+# under name. The first stage that raises stops the warm-up and its error is kept for the pages to show.
+class Warmup:
+    def __init__(self, stages):
+        self.stages = stages
+        self.results = {}
+        self.seconds = {}
+        self.current = None
+        self.error = None
+        self.started = None
+        self.finished = threading.Event()
+        self.thread = threading.Thread(target=self.run, name="dataset-warmup", daemon=True)
+
+    def start(self):
+        self.started = time.time()
+        self.thread.start()
+        return self
+
+    def run(self):
+        try:
+            for name, _, func in self.stages:
+                self.current = name
+                start = time.perf_counter()
+                with span(f"warmup.{name}"):
+                    self.results[name] = func(self.results)
+                self.seconds[name] = round(time.perf_counter() - start, 6)
+            self.current = None
+        except (Exception, SystemExit) as e:
+            # SystemExit too, a library exiting must not leave the pages waiting for a warm-up that is gone
+            self.error = e
+        finally:
+            self.finished.set()
+
+    # Every stage in names is done, all of them without names
+    def ready(self, names=None):
+        names = names if names is not None else [name for name, _, _ in self.stages]
+        return all(name in self.seconds for name in names)
+
+    def label(self, name):
+        return next(label for stage, label, _ in self.stages if stage == name)
+
+    def status(self):
+        return {
+            "ready": self.ready(),
+            "current": self.current,
+            "error": str(self.error) if self.error is not None else None,
+            "uptime_seconds": round(time.time() - self.started, 3) if self.started else 0,
+            "stages": {
+                name: {"ready": name in self.seconds, "seconds": self.seconds.get(name)} for name, _, _ in self.stages
+            },
+        }
+
+# -- Readiness Probe --
+# GET /ready answers 200 once every stage is done and 503 while warming up or after a failure, with the status as
+# JSON. Load balancers poll it before sending traffic to a fresh replica. The probe reports server.warmup, one
+# probe serves the process while a retry swaps in a new warm-up. A port that is taken (another server process on
+# the same host) leaves this process without a probe instead of failing it.
+def serve_readiness(warmup, port, host="0.0.0.0"):
+    class ReadinessHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] not in ("/", "/ready"):
+                self.send_error(404)
+                return
+
+            status = self.server.warmup.status()
+            body = json.dumps(status).encode()
+            self.send_response(200 if status["ready"] else 503)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        # Polled every few seconds, one access log line per poll would drown the server log
+        def log_message(self, format, *args):
+            pass
+
+    try:
+        server = ThreadingHTTPServer((host, port), ReadinessHandler)
+    except OSError as e:
+        logger.warning("Readiness probe not started, port %s: %s", port, e)
+        return None
+
+    server.warmup = warmup
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="readiness-probe", daemon=True).start()
+    return server
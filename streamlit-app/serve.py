@@ -0,0 +1,14 @@
+# Starts the dataset warm-up and the readiness probe with the server process rather than with the first session,
+# then runs the Streamlit server in this same process so the app finds the warm-up already running.
+# Run from streamlit-app/: READINESS_PORT=8502 python serve.py [streamlit run options, e.g. --server.port 8501]
+import os
+import sys
+
+from streamlit.web import cli
+
+from utils import get_warmup
+
+if __name__ == "__main__":
+    get_warmup()
+    sys.argv = ["streamlit", "run", os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py"), *sys.argv[1:]]
+    sys.exit(cli.main())
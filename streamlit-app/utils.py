@@ -1,217 +1,385 @@
 # utils.py
 import pandas as pd
 import numpy as np
+import pyarrow as pa
 import os
+import functools
 import streamlit as st
-import itertools
-from collections import Counter
-from kaggle.api.kaggle_api_extended import KaggleApi
 
 from constants.color_schemes import COLOR_SCHEMES
-
-# Unique Genre Getter
-@st.cache_data(show_spinner=False)
+from constants.data_configs import (
+    DATA_DIR, CACHE_DIR, PIPELINE_VERSION, STEAM_STORE_URL, IMAGE_CACHE_DIR, IMAGE_CACHE_MAX_BYTES, THUMBNAIL_WIDTH,
+    INGEST_MEMORY_BUDGET_MB, INGEST_WORKERS
+)
+from data_utils.dataset_cache import (
+    file_checksum, dataset_fingerprint, load_cached_frame, save_cached_frame, load_cached_index, save_cached_index,
+    previous_cached_fingerprint
+)
+from data_utils.incremental import DatasetRefresh, ROW_HASH_INDEX, row_keys
+from data_utils.ingest import read_in_chunks, read_in_parallel, table_to_frame, PARALLEL_MIN_BYTES
+from data_utils.genre_index import build_genre_masks, genre_counts
+from data_utils.cleaning import clean_chunk, INGEST_DTYPES, TEXT_COLUMN_DTYPES, INGEST_READ_OPTIONS
+from data_utils.search_index import NameSearchIndex
+from data_utils.sort_index import SortOrders
+from data_utils.facet_index import FacetIndex, FACET_COLUMNS
+from data_utils.leaderboards import Leaderboards
+from data_utils.range_topk import RangeTopK
+from data_utils.analytics_cube import AnalyticsCube, GENRE_CUBE_DIMENSIONS, PRICING_CUBE_DIMENSIONS
+from data_utils.image_cache import ImageCache
+from data_utils.sources import DatasetSourceError, source_from_spec, sync_dataset
+from data_utils.spans import span, timed
+from data_utils.warmup import Warmup, serve_readiness
+
+# Copy-on-write is the default from pandas 3, the shared dataset handed out by load_and_clean_data relies on it
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+
+# Genre names in bit order of the Genre Mask column
+def get_genre_vocabulary(df):
+    return df.attrs["genre_vocabulary"]
+
+# Unique Genre Getter, most common first
+@st.cache_resource(show_spinner=False)
+def build_unique_genres(_df, fingerprint):
+    counts = genre_counts(_df["Genre Mask"].to_numpy(), get_genre_vocabulary(_df))
+
+    sorted_genres = counts[counts > 0].sort_values(ascending=False, kind="stable").index.tolist()
+
+    return tuple(sorted_genres)
+
+@timed("unique_genres")
 def get_unique_genres(df):
-    all_genres = list(itertools.chain.from_iterable(df["Genre List"]))
-
-    genre_counts = Counter(all_genres)
-
-    sorted_genres = [genre for genre, count in genre_counts.most_common()]
+    return list(build_unique_genres(df, df.attrs["dataset_fingerprint"]))
+
+# -- Stored Indexes --
+# Indexes are saved as arrays next to the memory-mapped dataset. A process finding them there maps them instead
+# of building them, so every replica shares one copy.
+def load_or_build_index(name, fingerprint, build, from_arrays):
+    with span("index.load", index=name):
+        arrays = load_cached_index(CACHE_DIR, fingerprint, name)
+    if arrays is not None:
+        return from_arrays(arrays)
+
+    with span("index.build", index=name):
+        index = build()
+    try:
+        with span("index.save", index=name):
+            save_cached_index(CACHE_DIR, fingerprint, name, index.to_arrays())
+    except OSError:
+        pass
+
+    return index
+
+# -- Name Search Index --
+# Built once per dataset version and shared by every session, the fingerprint keys the cache
+@st.cache_resource(show_spinner=False)
+def build_name_search_index(_names, fingerprint):
+    return load_or_build_index(
+        "name_search", fingerprint,
+        lambda: NameSearchIndex.build(_names),
+        lambda arrays: NameSearchIndex.from_arrays(arrays, _names)
+    )
 
-    return sorted_genres
+@timed("name_search_index")
+def get_name_search_index(df):
+    return build_name_search_index(df["Name"], df.attrs["dataset_fingerprint"])
+
+# -- Sort Orders --
+# Argsort permutations of every sortable column in both directions, shared like the search index
+@st.cache_resource(show_spinner=False)
+def build_sort_orders(_df, fingerprint):
+    return load_or_build_index("sort_orders", fingerprint, lambda: SortOrders.build(_df), SortOrders.from_arrays)
+
+@timed("sort_orders")
+def get_sort_orders(df):
+    return build_sort_orders(df, df.attrs["dataset_fingerprint"])
+
+# -- Developer and Publisher Facets --
+# Names encoded as IDs with their postings, the explorer's facet counts are bincounts over them
+@st.cache_resource(show_spinner=False)
+def build_facet_index(_df, column, fingerprint):
+    return load_or_build_index(
+        f"facets-{column}", fingerprint, lambda: FacetIndex.build(_df[column]), FacetIndex.from_arrays
+    )
 
-# Helper function for Color Category
-def apply_categorical_order(df):
-    df['Price Category'] = pd.Categorical(
-        df['Price Category'],
-        categories=COLOR_SCHEMES["price_scale"]["order"],
-        ordered=True
+def get_facet_index(df, column):
+    with span("facet_index", column=column):
+        return build_facet_index(df, column, df.attrs["dataset_fingerprint"])
+
+# -- Leaderboards --
+# Per-year Peak CCU top lists the genre drill-downs are answered from
+@st.cache_resource(show_spinner=False)
+def build_leaderboards(_df, fingerprint):
+    return load_or_build_index("leaderboards", fingerprint, lambda: Leaderboards.build(_df), Leaderboards.from_arrays)
+
+@timed("leaderboards")
+def get_leaderboards(df):
+    return build_leaderboards(df, df.attrs["dataset_fingerprint"])
+
+# -- Range Top-K Indexes --
+# Per-year rank orders the showcase top 20 charts are answered from, one per (metric, tiebreak)
+RANGE_TOPK_METRICS = [("Peak CCU", None), ("Weighted Value", None), ("Peak CCU", "Reviews Percentage")]
+
+@st.cache_resource(show_spinner=False)
+def build_range_topk(_df, metric, tiebreak, fingerprint):
+    return load_or_build_index(
+        f"range_topk-{metric}-{tiebreak}", fingerprint,
+        lambda: RangeTopK.build(_df, metric, tiebreak),
+        RangeTopK.from_arrays
     )
 
-    return df
+def get_range_topk(df, metric, tiebreak=None):
+    with span("range_topk", metric=metric, tiebreak=tiebreak):
+        return build_range_topk(df, metric, tiebreak, df.attrs["dataset_fingerprint"])
 
-# Function to be used in load_and_clean_data for creating features used for filtering
-def feature_creation(df):
-    #  -- Reviews --
-    df["Reviews"] = df["Positive"] + df["Negative"]
-    df["Reviews Percentage"] = (df["Positive"] / df["Reviews"]) * 100
+# -- Analytics Cubes --
+# Pre-aggregated counts and Peak CCU sums the genre and pricing charts are answered from
+@st.cache_resource(show_spinner=False)
+def build_analytics_cube(_df, dimensions, fingerprint):
+    return AnalyticsCube.build(_df, list(dimensions))
 
-    df.loc[df["Reviews"] == 0, "Reviews Percentage"] = 0
+@timed("genre_cube")
+def get_genre_cube(df):
+    return build_analytics_cube(df, tuple(GENRE_CUBE_DIMENSIONS), df.attrs["dataset_fingerprint"])
 
-    df["Reviews Percentage"] = df["Reviews Percentage"].round(0).astype(int)
+@timed("pricing_cube")
+def get_pricing_cube(df):
+    return build_analytics_cube(df, tuple(PRICING_CUBE_DIMENSIONS), df.attrs["dataset_fingerprint"])
 
-    # -- Value / Weighted Value --
-    df.loc[df["Price"] > 0, "Value"] = df["Average playtime forever"] / df["Price"]
+# -- Header Image Cache --
+# One thumbnail store and prefetch pool per process, shared by every session
+@st.cache_resource(show_spinner=False)
+def get_image_cache():
+    return ImageCache(IMAGE_CACHE_DIR, IMAGE_CACHE_MAX_BYTES, THUMBNAIL_WIDTH)
 
-    valid_mask = (
-        (df["Price"] > 0) &
-        np.isfinite(df["Value"]) &
-        df["Metacritic score"].notna() &
-        (df["Metacritic score"] > 0)
-    )
+# Steam store URL of a game, derived when rendering instead of stored for every row
+def steam_url(app_id):
+    return f"{STEAM_STORE_URL}{app_id}/"
 
-    df.loc[valid_mask, "Weighted Value"] = df.loc[valid_mask, "Value"] * df.loc[valid_mask, "Metacritic score"]
-
-    # -- Release Year --
-    df["Release Year"] = df["Release date"].dt.year
-    
-    # -- Price Category --
-    price_conditions = [
-        (df['Price'] == 0),
-        (df['Price'] > 0) & (df['Price'] <= 4.99),
-        (df['Price'] > 4.99) & (df['Price'] <= 9.99),
-        (df['Price'] > 9.99) & (df['Price'] <= 19.99),
-        (df['Price'] > 19.99) & (df['Price'] <= 39.99),
-        (df['Price'] > 39.99) & (df['Price'] <= 59.99),
-        (df['Price'] > 59.99)
-    ]
-
-    choices = [
-        'Free',
-        '$0.01 - $4.99',
-        '$5.00 - $9.99',
-        '$10.00 - $19.99',
-        '$20.00 - $39.99',
-        '$40.00 - $59.99',
-        '$60.00+'
-    ]
-
-    df['Price Category'] = np.select(price_conditions, choices, default="Unknown")
-
-    # -- Indie Or Not --
-    df["Is_Indie"] = df["Genres"].fillna('').apply(
-        lambda x: 'Indie' if "Indie" in x else "Non-Indie"
-    )
+# -- Compact Columns --
+# Text columns with few distinct values become categoricals, the rest Arrow backed strings instead of Python objects
+CATEGORY_MAX_UNIQUE_RATIO = 0.5
 
-    # -- Genre List --
-    df["Genre List"] = df["Genres"].fillna('').apply(
-        lambda x: [
-            genre.strip() for genre in x.split(',') if genre.strip()
-        ]
-    )
+def is_text_column(series):
+    return series.dtype == object or isinstance(series.dtype, pd.StringDtype)
 
-    # -- Steam store URL --
-    df['Steam_URL'] = 'https://store.steampowered.com/app/' + df["AppID"].astype(str) + '/'
+def compact_columns(df):
+    for column in df.columns:
+        series = df[column]
+        if not is_text_column(series):
+            continue
+
+        if series.nunique(dropna=False) <= len(series) * CATEGORY_MAX_UNIQUE_RATIO:
+            df[column] = series.astype("category")
+        elif not (isinstance(series.dtype, pd.StringDtype) and series.dtype.storage == "pyarrow"):
+            df[column] = series.astype(pd.StringDtype("pyarrow"))
 
     return df
 
+# Memory per column, largest first, strings and lists counted in full
+def memory_report(df):
+    usage = df.memory_usage(deep=True, index=False)
+    report = pd.DataFrame({
+        "Column": usage.index,
+        "Dtype": [str(df[column].dtype) for column in usage.index],
+        "MB": (usage.to_numpy() / 2**20).round(2)
+    })
+    return report.sort_values("MB", ascending=False, kind="stable").reset_index(drop=True)
+
+# Settings come from environment variables first, then .streamlit/secrets.toml
+def get_setting(name, default=None):
+    if name in os.environ:
+        return os.environ[name]
+    try:
+        return st.secrets.get(name, default)
+    except FileNotFoundError:
+        # No secrets file at all
+        return default
+
 # -- Loading and Cleaning Data --
-@st.cache_data(show_spinner=False)
-def load_and_clean_data():
-    os.environ['KAGGLE_USERNAME'] = st.secrets["KAGGLE_USERNAME"]
-    os.environ["KAGGLE_KEY"] = st.secrets["KAGGLE_KEY"]
+# One cleaned frame per process shared by every session, st.cache_resource returns it without the pickle round
+# trip st.cache_data does on every call. It runs on the warm-up thread, so failures are raised for the pages to
+# show rather than drawn here; a failed load is not cached and the next call tries again. The frame's
+# "sync_status" attr is "offline" when the source could not be reached and the local copy was used.
+@st.cache_resource(show_spinner=False)
+def load_shared_dataset():
+    source = source_from_spec(get_setting("DATASET_SOURCE", "kaggle"))
+
+    if source.kind == "kaggle":
+        for credential in ("KAGGLE_USERNAME", "KAGGLE_KEY"):
+            value = get_setting(credential)
+            if value:
+                os.environ[credential] = value
+
+    # Only downloads when the remote snapshot differs from data/games.csv, falls back to the local copy offline
+    try:
+        with span("dataset.sync", source=source.kind):
+            csv_path, sync_status = sync_dataset(source, DATA_DIR)
+    except (DatasetSourceError, OSError) as e:
+        raise DatasetSourceError(f"The steam dataset is not available locally and could not be fetched ({e})") from e
 
-    api = KaggleApi()
-    api.authenticate()
-    api.dataset_download_files('fronkongames/steam-games-dataset', path='data', unzip=True)
+    df = load_synced_dataset(csv_path)
+    df.attrs["sync_status"] = sync_status
+    return df
+
+# The cleaned frame of the local games.csv, from its store when there is one
+def load_synced_dataset(csv_path):
+    # Compacting text columns is on unless COMPACT_COLUMNS is turned off
+    compact = str(get_setting("COMPACT_COLUMNS", "true")).lower() not in ("0", "false", "no")
+    with span("dataset.checksum"):
+        fingerprint = dataset_fingerprint(file_checksum(csv_path), PIPELINE_VERSION, "compact" if compact else None)
+
+    # Restarts and other server processes map the stored dataset as long as the raw CSV and the pipeline are unchanged
+    with span("dataset.map"):
+        df = load_cached_frame(CACHE_DIR, fingerprint)
+    if df is not None:
+        return df
+
+    # After an upstream update only the new and changed games are cleaned, everything else comes from the last store
+    refresh = None
+    previous = load_previous_store(fingerprint)
+    if previous is not None:
+        delta, row_hashes = ingest_games_csv(csv_path, row_keys(previous[2]))
+        refresh = refresh_stored_dataset(previous, delta, row_hashes)
+
+    if refresh is not None:
+        df = refresh.df
+    else:
+        df, row_hashes = ingest_games_csv(csv_path)
+        # Every chunk was cleaned with its own genres, the bit positions are assigned once over the whole dataset
+        with span("clean.genre_masks"):
+            df["Genre Mask"], df.attrs["genre_vocabulary"] = build_genre_masks(df["Genre List"])
+        if compact:
+            with span("dataset.compact"):
+                df = compact_columns(df)
+    df.attrs["dataset_fingerprint"] = fingerprint
 
     try:
-        df = pd.read_csv('data/games.csv')
-    except FileNotFoundError:
-        st.error(f"Error: Data file not found at {'data/games.csv'}")
-
-    # -- Working with columns --
-
-    # Renaming columns
-    df.columns = ['Name', 'Release date', 'Estimated owners', 'Peak CCU',
-                  'Required age', 'Price', 'Discount', 'DLC count', 'About the game',
-                  'Supported languages', 'Full audio languages', 'Reviews',
-                  'Header image', 'Website', 'Support url', 'Support email', 'Windows',
-                  'Mac', 'Linux', 'Metacritic score', 'Metacritic url', 'User score',
-                  'Positive', 'Negative', 'Score rank', 'Achievements', 'Recommendations',
-                  'Notes', 'Average playtime forever', 'Average playtime two weeks',
-                  'Median playtime forever', 'Median playtime two weeks', 'Developers',
-                  'Publishers', 'Categories', 'Genres', 'Tags', 'Screenshots', 'Movies']
-
-    # Dropping unneeded columns
-    cols_to_drop = [
-        "Screenshots", "Movies", "Tags", "Website", "Support email",
-        "About the game", "Metacritic url", "Support url",
-        "Score rank", "Notes", "Reviews"
-    ]
-    
-    cols_to_drop_existing = [col for col in cols_to_drop if col in df.columns]
-    df.drop(cols_to_drop_existing, axis=1, inplace=True)
-
-    # -- Is a Game or Not --
-    df["Is_Game"] = df["Categories"].fillna('').apply(
-        lambda x: "single-player" in x.lower() or "multi-player" in x.lower()
-    )
-    df = df[df["Is_Game"] == True].copy()
-    df = df.drop(columns=['Is_Game'])
-
-    # -- Index Reset --
-    df = df.reset_index(names=['AppID'])
-
-    # -- Type Conversions and Initial Cleaning --
-
-    # Date Conversion
-    df["Release date"] = pd.to_datetime(df["Release date"], errors='coerce')
-    df.dropna(subset=["Release date"], inplace=True)
-
-    # Cleaning Estimated Owners
-    df['Estimated owners_str'] = df['Estimated owners'].copy()
-    owners_split = df["Estimated owners"].astype(str).str.split(' - ', expand=True)
-    owners_split_numeric = owners_split.apply(pd.to_numeric, errors='coerce')
-    df["Estimated owners avg"] = owners_split_numeric.mean(axis=1)
-
-    number_to_reduced_number = {
-        '0 - 20000': '0 - 20K', '20000 - 50000': '20K - 50K',
-        '50000 - 100000': '50K - 100K', '100000 - 200000': '100K - 200K',
-        '200000 - 500000': '200K - 500K', '500000 - 1000000': '500K - 1M',
-        '1000000 - 2000000': '1M - 2M', '2000000 - 5000000': '2M - 5M',
-        '5000000 - 10000000': '5M - 10M', '10000000 - 20000000': '10M - 20M',
-        '20000000 - 50000000': '20M - 50M', '50000000 - 100000000': '50M - 100M',
-        '100000000 - 200000000': '100M - 200M'
+        with span("dataset.save"):
+            save_cached_frame(df, CACHE_DIR, fingerprint)
+            save_cached_index(CACHE_DIR, fingerprint, ROW_HASH_INDEX, row_hashes)
+            for name, arrays in (refresh.indexes if refresh is not None else {}).items():
+                save_cached_index(CACHE_DIR, fingerprint, name, arrays)
+    except OSError:
+        # A read-only data directory only costs the next cold start
+        return df
+
+    # The process that built the dataset maps the stored copy too, sharing its pages with the other processes
+    with span("dataset.map"):
+        mapped = load_cached_frame(CACHE_DIR, fingerprint)
+    return mapped if mapped is not None else df
+
+# -- Streaming Ingest --
+# Reads only the columns that are kept, in their declared dtypes, and cleans the CSV in chunks within the
+# INGEST_MEMORY_BUDGET_MB setting. Large files are split into row-aligned byte ranges cleaned by INGEST_WORKERS
+# processes (see read_in_parallel), smaller ones are read chunk by chunk in process (see read_in_chunks). With
+# known_keys, the row keys of the last store, only the new and changed rows are cleaned. Returns the cleaned rows
+# and the hashes of every raw row. Worker processes are spawned, so scripts calling this need the usual
+# if __name__ == "__main__" guard.
+def ingest_games_csv(csv_path, known_keys=None, workers=None):
+    budget_mb = float(get_setting("INGEST_MEMORY_BUDGET_MB", INGEST_MEMORY_BUDGET_MB))
+    workers = int(workers or get_setting("INGEST_WORKERS", INGEST_WORKERS))
+    process = functools.partial(clean_chunk, known_keys=known_keys)
+
+    if workers > 1 and os.path.getsize(csv_path) >= PARALLEL_MIN_BYTES:
+        def read(dtype):
+            return read_in_parallel(csv_path, process, budget_mb * 2**20, workers, dtype=dtype, **INGEST_READ_OPTIONS)
+    else:
+        def read(dtype):
+            return read_in_chunks(csv_path, process, budget_mb * 2**20, dtype=dtype, **INGEST_READ_OPTIONS)
+
+    with span("dataset.ingest", budget_mb=budget_mb) as ingest:
+        try:
+            results, stats = read(INGEST_DTYPES)
+        except (ValueError, TypeError):
+            # A value that does not parse as its declared dtype, the numbers are inferred and cast while cleaning
+            results, stats = read(TEXT_COLUMN_DTYPES)
+        ingest.update(stats)
+
+    with span("dataset.concat"):
+        df = table_to_frame(pa.concat_tables([cleaned for cleaned, _ in results]))
+    row_hashes = {key: np.concatenate([hashes[key] for _, hashes in results]) for key in ("app_ids", "hashes")}
+    return df, row_hashes
+
+# -- Incremental Refresh --
+# The newest store of the same pipeline as (fingerprint, frame, row hashes), None without one
+def load_previous_store(fingerprint):
+    previous = previous_cached_fingerprint(CACHE_DIR, fingerprint)
+    if previous is None:
+        return None
+
+    base = load_cached_frame(CACHE_DIR, previous)
+    base_hashes = load_cached_index(CACHE_DIR, previous, ROW_HASH_INDEX)
+    if base is None or base_hashes is None:
+        return None
+    return previous, base, base_hashes
+
+# Merges the cleaned new and changed rows into the previous store, see DatasetRefresh. The stored indexes of that
+# store are updated for the merged rows and saved with the new store, the others are built again on first use.
+def refresh_stored_dataset(previous_store, delta, row_hashes):
+    previous, base, base_hashes = previous_store
+    try:
+        with span("dataset.refresh", previous=previous):
+            refresh = DatasetRefresh.build(base, base_hashes, delta, row_hashes)
+    except ValueError:
+        # e.g. more genres than the bitmask holds, the full pipeline reports it
+        return None
+
+    updates = {
+        "name_search": lambda arrays: NameSearchIndex.from_arrays(arrays, base["Name"]).update(
+            refresh.df["Name"], refresh.remap
+        ),
+        "sort_orders": lambda arrays: SortOrders.from_arrays(arrays).update(refresh.df, refresh.remap),
+        "leaderboards": lambda arrays: Leaderboards.from_arrays(arrays).update(
+            refresh.df, refresh.remap, refresh.touched_years
+        ),
     }
-    df['Estimated owners_category'] = df['Estimated owners_str'].map(number_to_reduced_number)
-    df.drop('Estimated owners', axis=1, inplace=True)
-
-
-    # Convert other numerical columns
-    numerical_cols_to_convert = [
-        "Peak CCU", "Price", "Discount", "DLC count", "Metacritic score",
-        "User score", "Positive", "Negative", "Achievements", "Recommendations",
-        "Average playtime forever", "Average playtime two weeks",
-        "Median playtime forever", "Median playtime two weeks"
-    ]
-    for col in numerical_cols_to_convert:
-        if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors='coerce')
-
-
-    # -- Type optimization --
-    df["Required age"] = df["Required age"].astype('Int8')
-    df["Price"] = df["Price"].astype('float32')
-    df["DLC count"] = df["DLC count"].astype('Int16')
-    df["Metacritic score"] = df["Metacritic score"].astype('Int8')
-    df["Achievements"] = df["Achievements"].astype('Int16')
-    df["Recommendations"] = df["Recommendations"].astype('Int32')
-    df["Average playtime forever"] = df["Average playtime forever"].astype('Int32')
-    df["Average playtime two weeks"] = df["Average playtime two weeks"].astype('Int16')
-    df["Median playtime forever"] = df["Median playtime forever"].astype('Int32')
-    df["Median playtime two weeks"] = df["Median playtime two weeks"].astype('Int16')
-
-    # Floating point optimization
-    df['Price'] = df['Price'].round(2)
-
-    # -- Feature Creation for Filtering --
-    df = feature_creation(df)
-
-    # -- Category Order for Coloring --
-    df = apply_categorical_order(df)
-
-    # Cleaning Genre List
-    genres_to_exclude = ['Short', 'Movie', 'Accounting', 'Photo Editing', 'Web Publishing', 'Video Production', 'Software Training', 'Audio Production', 'Game Development', 'Design & Illustration', 'Animation & Modeling', 'Education', 'Utilities']
-    exclude_genre_set = set(genres_to_exclude)
-    df = df[df["Genre List"].apply(
-        lambda game_genres: set(game_genres).isdisjoint(exclude_genre_set)
-    )].copy()
-    df["Genre List"] = df["Genre List"].apply(
-        lambda genres: [
-            "Free To Play" if genre == "Free to Play" else genre
-            for genre in genres
-        ] if isinstance(genres, list) else genres
-    )
-
-    return df
+    for name, update in updates.items():
+        arrays = load_cached_index(CACHE_DIR, previous, name)
+        if arrays is not None:
+            with span("index.update", index=name):
+                refresh.indexes[name] = update(arrays).to_arrays()
+
+    return refresh
+
+# -- Background Warm-Up --
+# Everything a page needs, in the order the pages need it: the explorer's indexes first, then the showcase's and
+# the genre selector's. The stages run once per process on the warm-up thread, the getters then answer from cache.
+WARMUP_STAGES = [
+    ("dataset", "Loading the steam dataset", lambda results: load_shared_dataset()),
+    ("name_search", "Building the game name search index", lambda results: get_name_search_index(results["dataset"])),
+    ("sort_orders", "Precomputing the explorer sort orders", lambda results: get_sort_orders(results["dataset"])),
+    ("facets", "Indexing the developers and publishers", lambda results: [
+        get_facet_index(results["dataset"], column) for column in FACET_COLUMNS
+    ]),
+    ("range_topk", "Building the showcase top-k indexes", lambda results: [
+        get_range_topk(results["dataset"], metric, tiebreak) for metric, tiebreak in RANGE_TOPK_METRICS
+    ]),
+    ("pricing_cube", "Aggregating the pricing chart cube", lambda results: get_pricing_cube(results["dataset"])),
+    ("genres", "Collecting the genres", lambda results: get_unique_genres(results["dataset"])),
+    ("genre_cube", "Aggregating the genre chart cube", lambda results: get_genre_cube(results["dataset"])),
+    ("leaderboards", "Building the per-year leaderboards", lambda results: get_leaderboards(results["dataset"])),
+]
+
+# Started by the first caller, python serve.py starts it with the server process. READINESS_PORT serves the
+# readiness probe (see serve_readiness) on that port, pointed at the newest warm-up when a retry starts one.
+@st.cache_resource(show_spinner=False)
+def get_warmup():
+    warmup = Warmup(WARMUP_STAGES).start()
+    port = get_setting("READINESS_PORT")
+    if port:
+        probe = get_readiness_probe(int(port), warmup)
+        if probe is not None:
+            probe.warmup = warmup
+    return warmup
+
+# One probe server per process, it outlives the warm-ups a retry clears
+@st.cache_resource(show_spinner=False)
+def get_readiness_probe(port, _warmup):
+    return serve_readiness(_warmup, port)
+
+# Every caller gets a shallow view of the shared frame. Nothing is copied, and with copy-on-write whatever a
+# view changes is copied first so the shared frame and its arrays stay untouched.
+@timed("load_and_clean_data")
+def load_and_clean_data():
+    return load_shared_dataset().copy(deep=False)
@@ -0,0 +1,85 @@
+import contextlib
+import cProfile
+import io
+import pstats
+
+import pandas as pd
+import streamlit as st
+
+from utils import get_warmup
+from visualization_utils.chart_cache import get_chart_spec_cache
+
+# pyinstrument is optional, cProfile is used without it
+try:
+    import pyinstrument
+except ImportError:
+    pyinstrument = None
+
+PROFILE_TOP_FUNCTIONS = 40
+
+# -- Rerun Profile --
+# ?profile=1 profiles the rerun that sees it, with pyinstrument when installed and cProfile otherwise. The query
+# parameter is removed again, so exactly one rerun is captured, and the report is kept for the debug panel.
+@contextlib.contextmanager
+def profiled_rerun():
+    if st.query_params.get("profile") != "1":
+        yield
+        return
+
+    if pyinstrument is not None:
+        profiler = pyinstrument.Profiler()
+        profiler.start()
+        try:
+            yield
+        finally:
+            profiler.stop()
+            report = profiler.output_text(unicode=True, show_all=False)
+            st.session_state.perf_profile = {"tool": "pyinstrument", "report": report, "html": profiler.output_html()}
+            del st.query_params["profile"]
+        return
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        output = io.StringIO()
+        pstats.Stats(profiler, stream=output).sort_stats("cumulative").print_stats(PROFILE_TOP_FUNCTIONS)
+        st.session_state.perf_profile = {"tool": "cProfile", "report": output.getvalue()}
+        del st.query_params["profile"]
+
+# -- Debug Panel --
+# Shown in the sidebar with ?debug=1 or the PERF_PANEL setting: the spans of this rerun, the warm-up stages, the
+# chart spec cache and the last captured profile
+def perf_panel(records):
+    with st.sidebar.expander("Performance", expanded=True):
+        if records:
+            timings = pd.DataFrame(records)
+            timings["ms"] = (timings["seconds"] * 1000).round(2)
+            timings["span"] = [
+                "  " * depth + path.rsplit("/", 1)[-1] for depth, path in zip(timings["depth"], timings["span"])
+            ]
+            st.dataframe(timings[["span", "ms"]], hide_index=True, use_container_width=True)
+
+        warmup = get_warmup().status()
+        st.caption("Warm-up" + (f" failed: {warmup['error']}" if warmup["error"] else ""))
+        stages = pd.DataFrame.from_dict(warmup["stages"], orient="index")
+        stages["ms"] = (stages.pop("seconds") * 1000).round(2)
+        st.dataframe(stages, use_container_width=True)
+
+        chart_stats = get_chart_spec_cache().stats
+        if chart_stats:
+            st.caption("Chart spec cache")
+            charts = pd.DataFrame.from_dict(chart_stats, orient="index")
+            charts["build_ms"] = (charts.pop("build_seconds") * 1000).round(2)
+            st.dataframe(charts, use_container_width=True)
+
+        profile = st.session_state.get("perf_profile")
+        if profile:
+            st.caption(f"Last profiled rerun ({profile['tool']})")
+            st.code(profile["report"], language=None)
+            if "html" in profile:
+                st.download_button("Download profile", profile["html"], file_name="rerun-profile.html")
+        else:
+            st.caption("Add ?profile=1 to the URL to profile one rerun.")
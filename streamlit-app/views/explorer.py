@@ -1,8 +1,108 @@
 import streamlit as st
 import math
 import pandas as pd
+import numpy as np
+
+from utils import (
+    get_genre_vocabulary, get_unique_genres, get_name_search_index, get_sort_orders, get_facet_index, get_image_cache,
+    steam_url
+)
+from data_utils.facet_index import FACET_COLUMNS
+from data_utils.genre_index import genre_query_mask
+from data_utils.filters import compile_filter
+from data_utils.result_sets import ResultSet, result_key
+from data_utils.spans import span, timed
+
+# Names offered by a facet's list and shown with their counts
+FACET_OPTIONS = 1000
+FACET_TABLE_ROWS = 10
+
+# Rows passing the filters and name search as a mask, with the search matches in ranked order (None without a search)
+def filter_rows(df, game_name, selected_genres, min_rating, max_rating, min_reviews, min_price, max_price):
+    # Applying filters as one compiled mask over df, no intermediate frames
+    predicates = [
+        ("Reviews Percentage", "between", (min_rating, max_rating)),
+        ("Reviews", ">=", min_reviews),
+        ("Price", "between", (min_price, max_price))
+    ]
+    if selected_genres:
+        genre_query = genre_query_mask(get_genre_vocabulary(df), selected_genres)
+        predicates.append(("Genre Mask", "bits_all", genre_query))
+    with span("explorer.filter"):
+        mask = compile_filter(predicates).evaluate_mask(df)
+
+    with span("explorer.search"):
+        name_matches = get_name_search_index(df).search(game_name)
+
+    if name_matches is not None:
+        name_mask = np.zeros(len(df), dtype=bool)
+        name_mask[name_matches] = True
+        mask &= name_mask
+    return mask, name_matches
+
+# -- Developer and Publisher Facets --
+# Names are ORed within a facet and facets ANDed with each other and the filters. A facet's counts are taken over
+# the rows the other facets leave, so selecting a developer never hides the other developers one could add.
+@timed("explorer.facets")
+def apply_facets(df, mask, selections):
+    facets = {column: get_facet_index(df, column) for column in FACET_COLUMNS}
+    facet_masks = {
+        column: facets[column].rows_with_any(facets[column].ids_for(selections[column]), len(df))
+        for column in FACET_COLUMNS if selections.get(column)
+    }
+
+    counts = {}
+    for column, facet in facets.items():
+        rows = mask
+        for other, facet_mask in facet_masks.items():
+            if other != column:
+                rows = rows & facet_mask
+        counts[column] = facet.counts(rows)
+
+    for facet_mask in facet_masks.values():
+        mask = mask & facet_mask
+    return mask, counts
+
+# Orders the rows of mask into a ResultSet of row positions
+def order_results(df, mask, name_matches, sort_column, ascending):
+    # Name Relevance keeps the search ranking (best match first) and falls back to Reviews without a search
+    if sort_column is None and name_matches is not None:
+        return ResultSet(positions=name_matches[mask[name_matches]])
+    if sort_column is None:
+        sort_column = "Reviews"
+    return ResultSet(mask, get_sort_orders(df).permutation(sort_column, ascending))
+
+# Filters and orders the dataset into a ResultSet of row positions
+def build_results(df, sort_column, ascending, game_name, selected_genres,
+                  min_rating, max_rating, min_reviews, min_price, max_price, facet_selections=None):
+    mask, name_matches = filter_rows(
+        df, game_name, selected_genres, min_rating, max_rating, min_reviews, min_price, max_price
+    )
+    if facet_selections:
+        mask, _ = apply_facets(df, mask, facet_selections)
+    return order_results(df, mask, name_matches, sort_column, ascending)
+
+# A searchable list of the facet's names with the most games in the current results, and their counts. The
+# options are plain names: a label carrying its count would change with every filter and lose the selection.
+def facet_filter(column, facet, counts):
+    selected = st.session_state.get(f"facet_{column}", [])
+    query = st.text_input(f"Find {column.lower()}", key=f"facet_query_{column}", placeholder="Part of a name")
+    listed = np.where(facet.name_mask(query), counts, 0) if query else counts
+    options = list(dict.fromkeys(selected + facet.names_for(facet.top(listed, FACET_OPTIONS))))
+    st.multiselect(column, options=options, key=f"facet_{column}", placeholder=f"Any {column.lower()[:-1]}")
+
+    selected_ids = facet.ids_for(selected)
+    top_ids = facet.top(listed, FACET_TABLE_ROWS + len(selected_ids))
+    top_ids = top_ids[~np.isin(top_ids, selected_ids)]
+    shown = np.concatenate([selected_ids, top_ids])[:max(FACET_TABLE_ROWS, len(selected_ids))]
+    if len(shown):
+        st.dataframe(
+            pd.DataFrame({column[:-1]: facet.names_for(shown), "Games": counts[shown]}),
+            hide_index=True, height=min(len(shown), FACET_TABLE_ROWS) * 35 + 38
+        )
 
 @st.fragment
+@timed("explorer.game_explorer")
 def game_explorer(df):
     st.title("🎮 Game Explorer")
     
@@ -10,8 +110,6 @@ def game_explorer(df):
     if 'page' not in st.session_state:
         st.session_state.page = 1
 
-    filtered_df = df.copy()
-
     col1, col2 = st.columns([1, 4])
 
     with col1:
@@ -24,7 +122,8 @@ def game_explorer(df):
                 "Reviews": "Reviews",
                 "Reviews Percentage": "Reviews Percentage",
                 "Price": "Price",
-                "Peak CCU": "Peak CCU"
+                "Peak CCU": "Peak CCU",
+                "Name Relevance": None
             }
             sort_by = st.selectbox("Sort by", options=list(sort_options.keys()))
             sort_order = st.radio("Order", ["Descending", "Ascending"])
@@ -32,7 +131,8 @@ def game_explorer(df):
             # -- Filtering --
             game_name = st.text_input("Search by name", placeholder="e.g., Cyberpunk 2077")
             
-            all_genres = sorted(list(set([genre for sublist in df['Genre List'] for genre in sublist])))
+            # Only genres some game still has, a refresh keeps removed genres in the vocabulary so bits stay put
+            all_genres = sorted(get_unique_genres(df))
             selected_genres = st.multiselect("Select Genres", options=all_genres)
             
             min_rating, max_rating = st.slider("Reviews Percentage", min_value=0, max_value=100, value=(0, 100), step=1)
@@ -44,30 +144,59 @@ def game_explorer(df):
 
             st.form_submit_button("Apply Filters", type="primary")
             
-    # Applying filters
-    if game_name:
-        filtered_df = filtered_df[filtered_df['Name'].str.contains(game_name, case=False, na=False)]
-    if selected_genres:
-        filtered_df = filtered_df[filtered_df['Genre List'].apply(lambda x: all(genre in x for genre in selected_genres))]
-    filtered_df = filtered_df[(filtered_df['Reviews Percentage'] >= min_rating) & (filtered_df['Reviews Percentage'] <= max_rating)]
-    filtered_df = filtered_df[(filtered_df['Reviews'] >= min_reviews)]
-    filtered_df = filtered_df[(filtered_df['Price'] >= min_price) & (filtered_df['Price'] <= max_price)]
+    # The filtered rows only depend on the submitted form values, and the results on them, the sort and the facets.
+    # Page flips reuse the stored result set, a facet change reuses the filtered rows.
+    filter_key = result_key(
+        df.attrs["dataset_fingerprint"], game_name, selected_genres, min_rating, max_rating, min_reviews,
+        min_price, max_price
+    )
+    if st.session_state.get("explorer_filter_key") != filter_key:
+        st.session_state.explorer_filtered = filter_rows(
+            df, game_name, selected_genres, min_rating, max_rating, min_reviews, min_price, max_price
+        )
+        st.session_state.explorer_filter_key = filter_key
 
-    # Apply sorting after filtering
-    ascending = sort_order == "Ascending"
-    filtered_df = filtered_df.sort_values(by=sort_options[sort_by], ascending=ascending)
+    selections = {column: st.session_state.get(f"facet_{column}", []) for column in FACET_COLUMNS}
+    key = result_key(filter_key, sort_by, sort_order, selections)
+    if st.session_state.get("explorer_result_key") != key:
+        mask, name_matches = st.session_state.explorer_filtered
+        mask, st.session_state.explorer_facet_counts = apply_facets(df, mask, selections)
+        st.session_state.explorer_results = order_results(
+            df, mask, name_matches, sort_options[sort_by], sort_order == "Ascending"
+        )
+        st.session_state.explorer_result_key = key
+        st.session_state.page = 1
+    results = st.session_state.explorer_results
+
+    # Outside the form, so picking a name updates the results and the other facet's counts right away
+    with col1:
+        st.header("Developers & Publishers")
+        for column in FACET_COLUMNS:
+            facet_filter(column, get_facet_index(df, column), st.session_state.explorer_facet_counts[column])
 
     with col2:
         st.subheader("Results")
         
         # -- Page Logic --
         games_per_page = 20
-        total_games = len(filtered_df)
+        total_games = results.total
         total_pages = math.ceil(total_games / games_per_page)
 
         start_index = (st.session_state.page - 1) * games_per_page
         end_index = start_index + games_per_page
-        paginated_df = filtered_df.iloc[start_index:end_index]
+
+        # Only the 20 visible rows are taken out of the dataset. The next page's positions come from the same
+        # request, so on the first page both are found by one lazy walk instead of building every position.
+        with span("explorer.page"):
+            positions = results.page(start_index, end_index + games_per_page)
+            paginated_df = df.iloc[positions[:games_per_page]]
+            next_page_df = df.iloc[positions[games_per_page:]]
+
+        # This page's images download in parallel, the next page's follow in the background while this one is read
+        with span("explorer.image_prefetch"):
+            image_cache = get_image_cache()
+            image_cache.prefetch(paginated_df['Header image'].dropna())
+            image_cache.prefetch(next_page_df['Header image'].dropna())
         
         # Display page info
         st.markdown(f"**Found {total_games} games.**")
@@ -81,12 +210,14 @@ def game_explorer(df):
                     
                     with game_col1:
                         if pd.notna(row['Header image']) and row['Header image']:
-                            st.image(row['Header image'], use_container_width=True)
+                            # The original URL until the thumbnail is stored, or when it could not be fetched
+                            image = image_cache.get(row['Header image']) or row['Header image']
+                            st.image(image, use_container_width=True)
                         else:
                             st.write("No Image Available")
                     
                     with game_col2:
-                        st.markdown(f"**[{row['Name']}]({row['Steam_URL']})**")
+                        st.markdown(f"**[{row['Name']}]({steam_url(row['AppID'])})**")
                         st.markdown(f"**Reviews:** {row['Reviews Percentage']}% ({row['Reviews']})")
                         st.markdown(f"**Price:** ${row['Price']:.2f}")
 
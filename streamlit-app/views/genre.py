@@ -2,23 +2,72 @@ import streamlit as st
 import altair as alt
 import pandas as pd
 
-from utils import get_unique_genres
+from utils import get_unique_genres, get_genre_vocabulary, get_genre_cube, get_leaderboards
+from data_utils.genre_index import genre_query_mask
+from data_utils.filters import compile_filter, top_positions
+from data_utils.spans import timed
 from visualization_utils.altair_chart_helpers import *
+from visualization_utils.chart_cache import cached_chart
 from constants.color_schemes import COLOR_SCHEMES
 
-# Genre Filter
-def filter_by_genre(df, genre_selections):
-    return df[df["Genre List"].apply(
-        lambda game_genres_list: all(g in game_genres_list for g in genre_selections)
-    )].copy()
+# -- Cube Queries --
+# The charts sum cells of the genre cube, only the top 10 drill-downs look at individual games
+def genre_predicate(df, genre_selections):
+    return ("Genre Mask", "bits_all", genre_query_mask(get_genre_vocabulary(df), genre_selections))
+
+def yearly_peak_ccu(df, genre_selections):
+    yearly = get_genre_cube(df).query([
+        genre_predicate(df, genre_selections),
+        ("Release Year", ">=", 1997)
+    ], by=["Release Year"])
+
+    # Years where none of the games has a Peak CCU are left out
+    yearly = yearly[yearly["Peak CCU Count"] > 0]
+    return yearly[["Release Year", "Peak CCU Sum"]].rename(columns={"Peak CCU Sum": "Total Peak CCU"})
+
+def price_category_counts(df, genre_selections):
+    counts = get_genre_cube(df).query([genre_predicate(df, genre_selections)], by=["Price Category"])
+    counts = counts[counts["Count"] > 0].sort_values("Count", ascending=False, kind="stable")
+    return counts[["Price Category", "Count"]].reset_index(drop=True)
+
+# Genre counts of the games in one price category
+def price_category_genre_counts(df, genre_selections, price_category):
+    return get_genre_cube(df).genre_counts([
+        genre_predicate(df, genre_selections),
+        ("Price Category", "==", price_category)
+    ], get_genre_vocabulary(df))
+
+def indie_yearly_counts(df, genre_selections):
+    counts = get_genre_cube(df).query([
+        genre_predicate(df, genre_selections),
+        ("Is_Indie", "==", "Indie")
+    ], by=["Release Year"])
+    return counts[counts["Count"] > 0][["Release Year", "Count"]]
+
+def saturation_yearly_counts(df, genre_selections):
+    counts = get_genre_cube(df).query([
+        genre_predicate(df, genre_selections),
+        ("Review Bucket", ">=", 100)
+    ], by=["Release Year"])
+    return counts[counts["Count"] > 0][["Release Year", "Count"]]
+
+# Served from the leaderboards, the scan only runs when they cannot answer exactly
+def top_year_positions(df, genre_selections, year, indie_only=False):
+    genre_query = genre_query_mask(get_genre_vocabulary(df), genre_selections)
+    positions = get_leaderboards(df).top(df, year, genre_query, 10, indie_only=indie_only)
+    if positions is not None:
+        return positions
+
+    predicates = [genre_predicate(df, genre_selections), ("Release Year", "==", year), ("Peak CCU", "notna", None)]
+    if indie_only:
+        predicates.append(("Is_Indie", "==", "Indie"))
+    return top_positions(df, compile_filter(predicates).evaluate(df), ["Peak CCU"], 10)
 
 # Genre Yearly Picks Visualization
-def genre_yearly_picks(df):
-    df.dropna(subset=['Release Year', 'Peak CCU'], inplace=True)
-    df = df[df['Release Year'] >= 1997]
-
-    genre_growth_df = df.groupby('Release Year')['Peak CCU'].sum().reset_index()
-    genre_growth_df.rename(columns={'Peak CCU': 'Total Peak CCU'}, inplace=True)
+@timed("genre.yearly_picks")
+def genre_yearly_picks(df, genre_selections):
+    genre_growth_df = yearly_peak_ccu(df, genre_selections)
+    genre_params = tuple(sorted(genre_selections))
 
     chart_title = "Total Played Games for Selected Genres by Release Date"
 
@@ -26,18 +75,19 @@ def genre_yearly_picks(df):
 
     with col1:
         # Displays the line chart with points
-        line_chart = alt.Chart(genre_growth_df).mark_line(point=True).encode(
-            x = alt.X("Release Year:O", axis=alt.Axis(format='d', title="Year")),
-            y = alt.Y("Total Peak CCU:Q", title='Total Peak Concurrent Users'),
-            tooltip=[
-                alt.Tooltip('Release Year:O', title="Year"),
-                alt.Tooltip('Total Peak CCU:Q', title="Total Players", format=",")
-            ]
-        ).properties(
-            title = chart_title
-        )
-        
-        st.altair_chart(line_chart, use_container_width=True)
+        def build_line_chart():
+            return alt.Chart(genre_growth_df).mark_line(point=True).encode(
+                x = alt.X("Release Year:O", axis=alt.Axis(format='d', title="Year")),
+                y = alt.Y("Total Peak CCU:Q", title='Total Peak Concurrent Users'),
+                tooltip=[
+                    alt.Tooltip('Release Year:O', title="Year"),
+                    alt.Tooltip('Total Peak CCU:Q', title="Total Players", format=",")
+                ]
+            ).properties(
+                title = chart_title
+            )
+
+        cached_chart(df, "genre_yearly_picks", genre_params, build_line_chart)
 
     with col2:
         year_selection = st.selectbox(
@@ -47,29 +97,27 @@ def genre_yearly_picks(df):
             index= len(genre_growth_df) - 1
         )
 
-        filtered_year_df = df[
-            df["Release Year"] == year_selection
-        ]
-
-        filtered_year_df = filtered_year_df.sort_values(by="Peak CCU", ascending=False).head(10)
+        def build_top_10_chart():
+            filtered_year_df = game_chart_data(
+                df.iloc[top_year_positions(df, genre_selections, year_selection)], ["Peak CCU", "Price Category"]
+            )
 
-        top_10_chart = alt.Chart(filtered_year_df).mark_bar().encode(
-            x=alt.X('Peak CCU:Q', title="Peak Concurrent Players"),
-            y=alt.Y('Name:N', sort="-x", title="Game Name"),
-            href="Steam_URL:N",
-            tooltip=game_tooltip(),
-            color=price_color_getter()
-        ).properties(
-            title=f"Top 10 Games of the Selected Genres by Peak CCU ({year_selection})"
-        )
+            return alt.Chart(filtered_year_df).transform_calculate(**steam_url_calculation()).mark_bar().encode(
+                x=alt.X('Peak CCU:Q', title="Peak Concurrent Players"),
+                y=alt.Y('Name:N', sort="-x", title="Game Name"),
+                href="Steam_URL:N",
+                tooltip=game_tooltip(),
+                color=price_color_getter()
+            ).properties(
+                title=f"Top 10 Games of the Selected Genres by Peak CCU ({year_selection})"
+            )
 
-        st.altair_chart(top_10_chart, use_container_width=True)
+        cached_chart(df, "genre_yearly_top_10", (genre_params, year_selection), build_top_10_chart)
 
 # Genre Pricing Trend
-def genre_pricing(df):
-    # Pricing Counting
-    price_counts = df["Price Category"].value_counts().reset_index()
-    price_counts.columns = ["Price Category", "Count"]
+@timed("genre.pricing")
+def genre_pricing(df, genre_selections):
+    genre_params = tuple(sorted(genre_selections))
 
     chart_title = "Genre Pricing Trend"
 
@@ -83,18 +131,21 @@ def genre_pricing(df):
     col1, col2 = st.columns(2)
 
     with col1:
-        chart = alt.Chart(price_counts).mark_bar().encode(
-            x=alt.X('Price Category:N', sort=COLOR_SCHEMES['price_scale']['order'], title="Price Category"),
-            y=alt.Y("Count:Q", title="Count")
-        ).properties(
-            title=chart_title
-        ).add_params(
-            selection
-        )
+        def build_chart():
+            # Pricing Counting
+            price_counts = price_category_counts(df, genre_selections)
+
+            return alt.Chart(price_counts).mark_bar().encode(
+                x=alt.X('Price Category:N', sort=COLOR_SCHEMES['price_scale']['order'], title="Price Category"),
+                y=alt.Y("Count:Q", title="Count")
+            ).properties(
+                title=chart_title
+            ).add_params(
+                selection
+            )
 
-        selection_data = st.altair_chart(
-            chart,
-            use_container_width=True,
+        selection_data = cached_chart(
+            df, "genre_pricing", genre_params, build_chart,
             on_select="rerun",
             key="genre_pricing_chart"
         )
@@ -103,35 +154,29 @@ def genre_pricing(df):
         if selection_data.selection["price_category_selection"]:
             selected_price_category = selection_data.selection["price_category_selection"][0]["Price Category"]
 
-            filtered_df = df[df["Price Category"] == selected_price_category].copy()
-            
-            exploded_df = filtered_df.explode("Genre List")
+            def build_genre_chart():
+                price_genre_counts = price_category_genre_counts(df, genre_selections, selected_price_category)
+                price_genre_counts = price_genre_counts[price_genre_counts > 0].sort_values(ascending=False, kind="stable")
 
-            genre_counts = exploded_df["Genre List"].value_counts().reset_index().head(10)
-            genre_counts.columns = ["Genre", "Count"]
+                price_genre_counts = price_genre_counts.reset_index().head(10)
+                price_genre_counts.columns = ["Genre", "Count"]
 
-            chart2 = alt.Chart(genre_counts).mark_bar().encode(
-                x=alt.X("Count:Q", title="Number of Titles"),
-                y=alt.Y("Genre:N", sort="-x", title="Genre"),
-                tooltip=["Genre", "Count"]
-            ).properties(
-                title=f"Top 5 Genres in '{selected_price_category}' Category"
-            )
+                return alt.Chart(price_genre_counts).mark_bar().encode(
+                    x=alt.X("Count:Q", title="Number of Titles"),
+                    y=alt.Y("Genre:N", sort="-x", title="Genre"),
+                    tooltip=["Genre", "Count"]
+                ).properties(
+                    title=f"Top 5 Genres in '{selected_price_category}' Category"
+                )
 
-            st.altair_chart(chart2, use_container_width=True)
+            cached_chart(df, "genre_pricing_genres", (genre_params, selected_price_category), build_genre_chart)
         else:
             st.info("Select a price category from the chart on the left to see the genre breakdown.")
 
 # Genre Indie Number
-def genre_indie(df):
-    # Filter the DataFrame to include only indie games
-    indie_df = df[df['Is_Indie'] == 'Indie'].copy()
-    
-    # Count the number of indie games for each release year
-    indie_counts = indie_df['Release Year'].value_counts().reset_index()
-    indie_counts.columns = ['Release Year', 'Count']
-    
-    indie_counts = indie_counts.sort_values('Release Year')
+@timed("genre.indie")
+def genre_indie(df, genre_selections):
+    genre_params = tuple(sorted(genre_selections))
 
     chart_title = "Number of Indie Games Released Per Year"
 
@@ -145,22 +190,25 @@ def genre_indie(df):
 
     col1, col2 = st.columns(2)
     with col1:
-        chart1 = alt.Chart(indie_counts).mark_bar().encode(
-            x=alt.X('Release Year:O', axis=alt.Axis(format="d", title="Release Year")),
-            y=alt.Y("Count:Q", title="Number of Indie Games"),
-            tooltip=[
-                alt.Tooltip('Release Year', title='Year'), 
-                alt.Tooltip('Count', title='Number of Titles')
-            ]
-        ).properties(
-            title=chart_title
-        ).add_params(
-            selection
-        )
+        def build_chart():
+            # Count the number of indie games for each release year
+            indie_counts = indie_yearly_counts(df, genre_selections)
+
+            return alt.Chart(indie_counts).mark_bar().encode(
+                x=alt.X('Release Year:O', axis=alt.Axis(format="d", title="Release Year")),
+                y=alt.Y("Count:Q", title="Number of Indie Games"),
+                tooltip=[
+                    alt.Tooltip('Release Year', title='Year'), 
+                    alt.Tooltip('Count', title='Number of Titles')
+                ]
+            ).properties(
+                title=chart_title
+            ).add_params(
+                selection
+            )
         
-        selection_data = st.altair_chart(
-            chart1,
-            use_container_width=True,
+        selection_data = cached_chart(
+            df, "genre_indie", genre_params, build_chart,
             on_select="rerun",
             key="genre_indie_chart"
         )
@@ -171,55 +219,53 @@ def genre_indie(df):
             selected_year = selection_data.selection["year_selection"][0]["Release Year"]
             
             # Filter the df for the selected year and indie games
-            top_games_df = df[
-                (df["Release Year"] == selected_year) & 
-                (df["Is_Indie"] == "Indie")
-            ].copy()
+            indie_positions = top_year_positions(df, genre_selections, selected_year, indie_only=True)
             
-            top_games_df = top_games_df.sort_values(by="Peak CCU", ascending=False).head(10)
-            
-            if not top_games_df.empty:
-                chart2 = alt.Chart(top_games_df).mark_bar().encode(
-                    x=alt.X("Peak CCU:Q", title="Peak Concurrent Users (CCU)"),
-                    y=alt.Y("Name:N", sort="-x", title="Game Title"),
-                    href="Steam_URL:N",
-                    tooltip=game_tooltip()
-                ).properties(
-                    title=f"Top 10 Indie Games by Peak CCU"
-                )
+            if len(indie_positions):
+                def build_top_chart():
+                    top_games_df = game_chart_data(df.iloc[indie_positions], ["Peak CCU"])
+
+                    return alt.Chart(top_games_df).transform_calculate(**steam_url_calculation()).mark_bar().encode(
+                        x=alt.X("Peak CCU:Q", title="Peak Concurrent Users (CCU)"),
+                        y=alt.Y("Name:N", sort="-x", title="Game Title"),
+                        href="Steam_URL:N",
+                        tooltip=game_tooltip()
+                    ).properties(
+                        title=f"Top 10 Indie Games by Peak CCU"
+                    )
                 
-                st.altair_chart(chart2, use_container_width=True)
+                cached_chart(df, "genre_indie_top_10", (genre_params, selected_year), build_top_chart)
         else:
             st.info("Click on a bar in the chart on the left to see the top indie games for that year.")
 
 # Genre Saturation Chart
-def genre_saturation(df):
-    df = df[
-        (df["Reviews"] >= 100)
-    ]
-    saturation_counts = df.groupby('Release Year').size().reset_index(name='Count')
-    
+@timed("genre.saturation")
+def genre_saturation(df, genre_selections):
     chart_title = "Genre Saturation Over Time (100+ Reviews Games)"
     
     col1, col2 = st.columns(2)
     with col1:
-        chart = alt.Chart(saturation_counts).mark_line(point=True).encode(
-            x=alt.X('Release Year:O', axis=alt.Axis(title="Release Year", format="d")),
-            y=alt.Y("Count:Q", title="Number of Releases"),
-            tooltip=[
-                alt.Tooltip('Release Year', title='Year'),
-                alt.Tooltip('Count', title='Number of Titles')
-            ]
-        ).properties(
-            title=chart_title
-        )
+        def build_chart():
+            saturation_counts = saturation_yearly_counts(df, genre_selections)
+
+            return alt.Chart(saturation_counts).mark_line(point=True).encode(
+                x=alt.X('Release Year:O', axis=alt.Axis(title="Release Year", format="d")),
+                y=alt.Y("Count:Q", title="Number of Releases"),
+                tooltip=[
+                    alt.Tooltip('Release Year', title='Year'),
+                    alt.Tooltip('Count', title='Number of Titles')
+                ]
+            ).properties(
+                title=chart_title
+            )
 
-        st.altair_chart(chart, use_container_width=True)
+        cached_chart(df, "genre_saturation", tuple(sorted(genre_selections)), build_chart)
     with col2:
         st.info("2025 will show low saturation due to the dataset being last updated in April 2025.")
 
 # Builder for the Genre Selector Page
 @st.fragment
+@timed("genre.selector")
 def genre_selector_builder(steam_games):
     # Columns for Sidebar(Filters) and Main(Visualizations)
     sidebar, main = st.columns([1,5])
@@ -232,21 +278,18 @@ def genre_selector_builder(steam_games):
             width="stretch"
         )
 
-    # Filtering by selected genres
-    if genre_selections:
-        filtered_df = filter_by_genre(steam_games, genre_selections)
-
+    # Every tab answers from the genre cube of the full dataset, filtered by the selected genres
     with main:
         tab1, tab2, tab3, tab4 = st.tabs(["Yearly Genre Picks", "Genre Pricing" ,"Indie Number", "Genre Saturation"])
         with tab1:
             if genre_selections:
-                genre_yearly_picks(filtered_df)
+                genre_yearly_picks(steam_games, genre_selections)
         with tab2:
             if genre_selections:
-                genre_pricing(filtered_df)
+                genre_pricing(steam_games, genre_selections)
         with tab3:
             if genre_selections:
-                genre_indie(filtered_df)
+                genre_indie(steam_games, genre_selections)
         with tab4:
             if genre_selections:
-                genre_saturation(filtered_df)
\ No newline at end of file
+                genre_saturation(steam_games, genre_selections)
\ No newline at end of file
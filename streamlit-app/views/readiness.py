@@ -0,0 +1,42 @@
+import streamlit as st
+
+from utils import get_warmup
+
+READINESS_POLL_SECONDS = 1
+
+# -- Page Readiness --
+# Data pages call this first with the warm-up stages they need (see WARMUP_STAGES). Until those are done the page
+# shows how far the warm-up got and stops there; a fragment polls and reruns the page once they are.
+def require_stages(*names):
+    warmup = get_warmup()
+    if warmup.error is not None:
+        warmup_error(warmup)
+        st.stop()
+
+    if not warmup.ready(names):
+        readiness_progress(names)
+        st.stop()
+
+    if warmup.results["dataset"].attrs.get("sync_status") == "offline" and not st.session_state.get("offline_toast"):
+        st.session_state.offline_toast = True
+        st.toast("Dataset source unreachable, using the local copy of the dataset.")
+
+def warmup_error(warmup):
+    st.error(f"Error: {warmup.error}")
+    # A new warm-up starts on the rerun, whatever the failed one had finished comes from cache
+    if st.button("Retry"):
+        get_warmup.clear()
+        st.rerun()
+
+@st.fragment(run_every=READINESS_POLL_SECONDS)
+def readiness_progress(names):
+    warmup = get_warmup()
+    if warmup.error is not None or warmup.ready(names):
+        st.rerun()
+
+    done = sum(warmup.ready([name]) for name in names)
+    text = f"{warmup.label(warmup.current)}..." if warmup.current else "Preparing the dashboard..."
+    st.progress(done / len(names), text=text)
+    for name in names:
+        icon = "✅" if warmup.ready([name]) else ("⏳" if name == warmup.current else "▫️")
+        st.caption(f"{icon} {warmup.label(name)}")
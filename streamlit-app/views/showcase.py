@@ -6,9 +6,46 @@ import numpy as np
 from constants.color_schemes import COLOR_SCHEMES
 from constants.layout_configs import VISUALIZATION_INNER_COL_LAYOUT
 from visualization_utils.altair_chart_helpers import *
+from visualization_utils.chart_cache import cached_chart
+from utils import get_pricing_cube, get_range_topk
+from data_utils.spans import timed
+
+# -- Filter Specs --
+# Each fragment's filter as a declarative spec. The Release Year range and the ranking come from the range
+# top-k indexes, so only the best rows of each year are checked against the remaining predicates.
+def top_ccu_positions(steam_games, start_year, end_year, start_review_percent, end_review_percent):
+    return get_range_topk(steam_games, "Peak CCU").top(steam_games, start_year, end_year, [
+        ("Reviews Percentage", "between", (start_review_percent, end_review_percent))
+    ], 20)
+
+def top_value_positions(steam_games, start_year, end_year, review_count, start_price, end_price,
+                        start_review_percent, end_review_percent):
+    return get_range_topk(steam_games, "Weighted Value").top(steam_games, start_year, end_year, [
+        ("Reviews", ">=", review_count),
+        ("Price", "between", (start_price, end_price)),
+        ("Reviews Percentage", "between", (start_review_percent, end_review_percent))
+    ], 20)
+
+# Peak CCU <= 2000 is the index's value cap, the rest are residual predicates
+def sleeper_positions(steam_games, start_year, end_year):
+    return get_range_topk(steam_games, "Peak CCU", "Reviews Percentage").top(steam_games, start_year, end_year, [
+        ("Reviews Percentage", ">=", 90),
+        ("Reviews", "<=", 2000), ("Reviews", ">", 0),
+        ("Peak CCU", ">", 100),
+        ("Reviews", "notna", None)
+    ], 20, max_value=2000)
+
+# Game counts per Price Category and Is_Indie, summed from the pricing cube instead of scanning the games
+def pricing_counts(pricing_cube, start_year, end_year, start_review_percentage, end_review_percentage):
+    counts = pricing_cube.query([
+        ("Release Year", "between", (start_year, end_year)),
+        ("Reviews Percentage", "between", (start_review_percentage, end_review_percentage))
+    ], by=["Price Category", "Is_Indie"])
+    return counts[counts["Count"] > 0][["Price Category", "Is_Indie", "Count"]].reset_index(drop=True)
 
 # -- Top Games By Peak CCU --
 @st.fragment
+@timed("showcase.top_games_ccu")
 def top_games_ccu(steam_games):
     sidebar, spacer_col, main, buff_col = st.columns(VISUALIZATION_INNER_COL_LAYOUT)
 
@@ -33,31 +70,30 @@ def top_games_ccu(steam_games):
             step=1
         )
 
-    # Release Year Filter
-    year_filter = steam_games[
-        (steam_games["Release Year"] >= start_year) & (steam_games["Release Year"] <= end_year) &
-        (steam_games["Reviews Percentage"] >= start_review_percent) & (steam_games["Reviews Percentage"] <= end_review_percent)
-    ]
+    # Altair Horizontal Bar Chart with Tooltip Features, only built when the sliders move to new values
+    def build_chart():
+        # Creation of dataframe for charting, only the 20 charted rows are taken out of the dataset
+        top_ccu_games = game_chart_data(steam_games.iloc[
+            top_ccu_positions(steam_games, start_year, end_year, start_review_percent, end_review_percent)
+        ], ["Peak CCU", "Price Category"])
 
-    # Creation of dataframe for charting
-    top_ccu_games = year_filter.dropna(subset=['Peak CCU']).sort_values(by="Peak CCU", ascending=False).head(20)
+        return alt.Chart(top_ccu_games).transform_calculate(**steam_url_calculation()).mark_bar().encode(
+            x = alt.X("Peak CCU:Q", title="Peak Concurrent Users"),
+            y = alt.Y('Name:N', sort='-x', title="Game Name"),
+            href="Steam_URL:N",
+            color=price_color_getter(),
+            tooltip=game_tooltip()
+        ).properties(
+            title=f"Top 20 Games by Peak CCU ({start_year}-{end_year})"
+        )
 
-    # Altair Horizontal Bar Chart with Tooltip Features
-    chart = alt.Chart(top_ccu_games).mark_bar().encode(
-        x = alt.X("Peak CCU:Q", title="Peak Concurrent Users"),
-        y = alt.Y('Name:N', sort='-x', title="Game Name"),
-        href="Steam_URL:N",
-        color=price_color_getter(),
-        tooltip=game_tooltip()
-    ).properties(
-        title=f"Top 20 Games by Peak CCU ({start_year}-{end_year})"
-    )
     # Main Column
     with main:
-        st.altair_chart(chart, use_container_width=True)
+        cached_chart(steam_games, "top_games_ccu", (start_year, end_year, start_review_percent, end_review_percent), build_chart)
 
 # -- Top Games by Value --
 @st.fragment
+@timed("showcase.top_value_games")
 def top_value_games(steam_games):
     sidebar, spacer_col, main, buff_col = st.columns(VISUALIZATION_INNER_COL_LAYOUT)
 
@@ -117,33 +153,29 @@ def top_value_games(steam_games):
                 key="value_max_price_input"
             )
 
-    # Release Year and Reviews Filter
-    value_filter = steam_games[
-        (steam_games["Release Year"] >= start_year) & (steam_games["Release Year"] <= end_year) &
-        (steam_games["Reviews"] >= review_count) &
-        (steam_games["Price"] >= start_price) & (steam_games["Price"] <= end_price) &
-        (steam_games["Reviews Percentage"] >= start_review_percent) & (steam_games["Reviews Percentage"] <= end_review_percent)
-    ]
-
     # Creation of dataframe for charting
-    top_value = value_filter.dropna(subset=['Weighted Value']).sort_values(by="Weighted Value", ascending=False).head(20)
+    params = (start_year, end_year, review_count, start_price, end_price, start_review_percent, end_review_percent)
 
     # Altair Horizontal Bar Chart with Tooltip Features
-    chart = alt.Chart(top_value).mark_bar().encode(
-        x = alt.X("Weighted Value:Q", title="Value"),
-        y = alt.Y('Name:N', sort='-x', title="Game Name"),
-        href="Steam_URL:N",
-        color=price_color_getter(),
-        tooltip=game_tooltip()
-    ).properties(
-        title=f"Top 20 Games by Value ({start_year}-{end_year})"
-    )
+    def build_chart():
+        top_value = game_chart_data(steam_games.iloc[top_value_positions(steam_games, *params)], ["Weighted Value", "Price Category"])
+
+        return alt.Chart(top_value).transform_calculate(**steam_url_calculation()).mark_bar().encode(
+            x = alt.X("Weighted Value:Q", title="Value"),
+            y = alt.Y('Name:N', sort='-x', title="Game Name"),
+            href="Steam_URL:N",
+            color=price_color_getter(),
+            tooltip=game_tooltip()
+        ).properties(
+            title=f"Top 20 Games by Value ({start_year}-{end_year})"
+        )
 
     with main:
-        st.altair_chart(chart, use_container_width=True)
+        cached_chart(steam_games, "top_value_games", params, build_chart)
 
 # -- Sleeper Hit --
 @st.fragment
+@timed("showcase.sleeper_games")
 def sleeper_games(steam_games):
     sidebar, spacer_col, main, buff_col = st.columns(VISUALIZATION_INNER_COL_LAYOUT)
 
@@ -162,32 +194,29 @@ def sleeper_games(steam_games):
             key="sleeper_year"
         )
 
-    sleeper_filter = steam_games[
-        (steam_games["Reviews Percentage"] >= 90) &
-        (steam_games["Release Year"] >= start_year) & (steam_games["Release Year"] <= end_year) &
-        (steam_games["Reviews"] <= 2000) & (steam_games["Reviews"] > 0) &
-        (steam_games["Peak CCU"] <= 2000) & (steam_games["Peak CCU"] > 100)
-    ]
-
-    # Creation of dataframe for charting
-    top_sleeper_games = sleeper_filter.dropna(subset=["Reviews"]).sort_values(by=["Peak CCU", "Reviews Percentage"], ascending=False).head(20)
-
     # Altair Bar Chart with Tooltip Features
-    chart = alt.Chart(top_sleeper_games).mark_bar().encode(
-        x=alt.X("Reviews:Q", title="Reviews"),
-        y=alt.Y("Name:N", sort='-x', title="Game Name"),
-        href="Steam_URL:N",
-        color=price_color_getter(),
-        tooltip=game_tooltip()
-    ).properties(
-        title=f"Top 20 Sleeper Hit Games ({start_year}-{end_year})"
-    )
+    def build_chart():
+        # Creation of dataframe for charting
+        top_sleeper_games = game_chart_data(
+            steam_games.iloc[sleeper_positions(steam_games, start_year, end_year)], ["Reviews", "Price Category"]
+        )
+
+        return alt.Chart(top_sleeper_games).transform_calculate(**steam_url_calculation()).mark_bar().encode(
+            x=alt.X("Reviews:Q", title="Reviews"),
+            y=alt.Y("Name:N", sort='-x', title="Game Name"),
+            href="Steam_URL:N",
+            color=price_color_getter(),
+            tooltip=game_tooltip()
+        ).properties(
+            title=f"Top 20 Sleeper Hit Games ({start_year}-{end_year})"
+        )
 
     with main:
-        st.altair_chart(chart, use_container_width=True)
+        cached_chart(steam_games, "sleeper_games", (start_year, end_year), build_chart)
 
 # -- Game Pricing --
 @st.fragment
+@timed("showcase.games_pricing")
 def games_pricing(steam_games):
     sidebar, spacer_col, main, buff_col = st.columns(VISUALIZATION_INNER_COL_LAYOUT)
 
@@ -214,45 +243,36 @@ def games_pricing(steam_games):
             step=1
         )
 
-    # Release Year and Reviews Filter
-    pricing_filter = steam_games[
-        (steam_games["Release Year"] >= start_year) & (steam_games["Release Year"] <= end_year) &
-        (steam_games["Reviews Percentage"] >= start_review_percentage) & (steam_games["Reviews Percentage"] <= end_review_percentage)
-    ]
-
-    # Creation of dataframe for charting
-    pricing_distribution = pricing_filter.dropna(subset=["Price Category", "Is_Indie"])[
-        ["Price Category", "Is_Indie"]
-    ]
+    # Chart built only for new slider values
+    def build_chart():
+        # Release Year and Reviews Filter, aggregated from the pricing cube
+        aggregated_data = pricing_counts(get_pricing_cube(steam_games), start_year, end_year, start_review_percentage, end_review_percentage)
+        total_counts_per_category = aggregated_data.groupby('Price Category')['Count'].transform('sum')
+        aggregated_data['Proportion'] = (aggregated_data['Count'] / total_counts_per_category).fillna(0)
 
-    # Aggregation for Faster visualization
-    aggregated_data = pricing_distribution.groupby(['Price Category', 'Is_Indie']).size().reset_index(name="Count")
-    total_counts_per_category = aggregated_data.groupby('Price Category')['Count'].transform('sum')
-    aggregated_data['Proportion'] = (aggregated_data['Count'] / total_counts_per_category).fillna(0)
-
-    # Stacked Bar Chart with Altair
-    chart = alt.Chart(aggregated_data).mark_bar().encode(
-        x=alt.X(
-            "Price Category:O",
-            title="Price Range",
-            sort=COLOR_SCHEMES["price_scale"]["order"],
-            axis=alt.Axis(labelAngle=-60, labelOverlap="greedy")
-        ),
-        y=alt.Y(
-            "Count:Q",
-            stack="normalize",
-            axis=alt.Axis(format=".0%", title="Proportion of Games")
-        ),
-        color=indie_color_getter(),
-        tooltip=[
-            "Price Category:O",
-            "Is_Indie:N",
-            alt.Tooltip("Count:Q", title="Number of Games", format=",d"),
-            alt.Tooltip("Proportion:Q", format=".1%", title="Proportion in Category")
-        ]
-    ).properties(
-        title="Proportion of Indies vs Non Indies games by Price Range"
-    )
+        # Stacked Bar Chart with Altair
+        return alt.Chart(aggregated_data).mark_bar().encode(
+            x=alt.X(
+                "Price Category:O",
+                title="Price Range",
+                sort=COLOR_SCHEMES["price_scale"]["order"],
+                axis=alt.Axis(labelAngle=-60, labelOverlap="greedy")
+            ),
+            y=alt.Y(
+                "Count:Q",
+                stack="normalize",
+                axis=alt.Axis(format=".0%", title="Proportion of Games")
+            ),
+            color=indie_color_getter(),
+            tooltip=[
+                "Price Category:O",
+                "Is_Indie:N",
+                alt.Tooltip("Count:Q", title="Number of Games", format=",d"),
+                alt.Tooltip("Proportion:Q", format=".1%", title="Proportion in Category")
+            ]
+        ).properties(
+            title="Proportion of Indies vs Non Indies games by Price Range"
+        )
 
     with main:
-        st.altair_chart(chart, use_container_width=True)
+        cached_chart(steam_games, "games_pricing", (start_year, end_year, start_review_percentage, end_review_percentage), build_chart)
@@ -1,4 +1,5 @@
 from constants.color_schemes import COLOR_SCHEMES
+from constants.data_configs import STEAM_STORE_URL
 import altair as alt
 
 def price_color_getter():
@@ -34,4 +35,15 @@ def game_tooltip():
         alt.Tooltip("Reviews Percentage:Q", title="Review Percentage"),
         alt.Tooltip("Price:Q", title="Price", format="$.2f"),
         alt.Tooltip("Genres:N", title="Genres")
-    ]
\ No newline at end of file
+    ]
+
+# Steam_URL is computed in the browser from AppID, for charts linking to the store with href="Steam_URL:N"
+def steam_url_calculation():
+    return {"Steam_URL": f"'{STEAM_STORE_URL}' + datum.AppID + '/'"}
+
+# Fields read by game_tooltip(), charts of individual games also need these next to their own encodings
+GAME_TOOLTIP_FIELDS = ["Name", "Release date", "AppID", "Reviews Percentage", "Price", "Genres"]
+
+# Game charts only carry the columns their encodings and tooltips use into the spec
+def game_chart_data(df, fields):
+    return df[list(dict.fromkeys(GAME_TOOLTIP_FIELDS + fields))]
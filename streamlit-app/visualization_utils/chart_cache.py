@@ -0,0 +1,68 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+
+import streamlit as st
+
+from data_utils.result_sets import result_key
+from data_utils.spans import span
+
+# Finished chart specs kept across reruns and sessions
+CHART_CACHE_SIZE = 256
+
+# -- Vega-Lite Spec Cache --
+# Specs are keyed by chart name, chart parameters and dataset version. A hit skips building the Altair chart,
+# its data query and the to_dict() validation. Payload size and build time of the last build of every chart
+# are kept in self.stats.
+class ChartSpecCache:
+    def __init__(self, max_entries=CHART_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.specs = OrderedDict()
+        self.stats = {}
+        self.lock = threading.Lock()
+
+    def spec(self, name, params, build_chart):
+        key = result_key(name, params)
+        with self.lock:
+            if key in self.specs:
+                self.specs.move_to_end(key)
+                self.stats[name]["hits"] += 1
+                return self.specs[key]
+
+        start = time.perf_counter()
+        with span("chart.build", chart=name):
+            spec = build_chart().to_dict()
+
+        # The default Altair theme fixes the view size, streamlit sizes the chart itself
+        config = spec.get("config", {})
+        config.pop("view", None)
+        if not config:
+            spec.pop("config", None)
+
+        build_seconds = time.perf_counter() - start
+
+        with self.lock:
+            self.specs[key] = spec
+            if len(self.specs) > self.max_entries:
+                self.specs.popitem(last=False)
+            self.stats[name] = {
+                "payload_bytes": len(json.dumps(spec, default=str)),
+                "build_seconds": build_seconds,
+                "hits": 0
+            }
+
+        return spec
+
+@st.cache_resource(show_spinner=False)
+def get_chart_spec_cache():
+    return ChartSpecCache()
+
+# Renders a chart from the spec cache, build_chart is only called on a miss.
+# params must cover everything the chart depends on besides the dataset.
+def cached_chart(df, name, params, build_chart, on_select="ignore", key=None):
+    with span("chart.spec", chart=name):
+        spec = get_chart_spec_cache().spec(name, (params, df.attrs["dataset_fingerprint"]), build_chart)
+    # Serializing the spec into the delta sent to the browser
+    with span("chart.render", chart=name):
+        return st.vega_lite_chart(spec, use_container_width=True, on_select=on_select, key=key)